@@ -3,6 +3,28 @@ import pandas as pd
 import plotly.express as px
 from pathlib import Path
 
+from factor_store import MATERIALS, ORE_AUTOFILLS, default_store
+from job_runner import get_job, job_progress, jobs_table, submit_task
+from lca_engine import DEFAULT_SEED, IMPACT_NAMES
+from scenario_compare import APPLICATIONS, ROUTES, compare_scenarios
+from scenario_sweep import (
+    DIMENSIONS,
+    END_OF_LIFE,
+    PRODUCTION_PROCESSES,
+    SECONDARY_CONTENTS,
+    VALUES,
+    cube_pivot,
+    load_manifest,
+    run_sweep,
+    scenario_count,
+    sweep_key,
+    sweep_spec,
+)
+
+COMPARE_IMPACTS = ["Global Warming Potential", "Energy Demand", "Water Consumption", "Acidification Potential"]
+CONTENT_LEVELS = [float(c) for c in range(0, 101, 5)]    # secondary content options (%)
+AVERAGE = "All (average)"
+
 
 def load_theme():
     theme_path = Path("theme.css")
@@ -18,35 +40,165 @@ def compare_scenarios_page():
 
     c1, c2, c3 = st.columns([2, 2, 2])
     with c1:
-        application = st.selectbox("Application", ["Automotive", "Building", "Aerospace"])
+        applications = st.multiselect("Application", list(APPLICATIONS), default=["Automotive"])
     with c2:
-        scenario = st.selectbox("Route / Scenario", ["Primary Route", "Recycled Route", "Alternative Route"])
+        routes = st.multiselect("Route / Scenario", list(ROUTES), default=["Primary Route"])
     with c3:
         funit = st.text_input("Functional Unit", "1 unit of product")
 
-    metal_options = ["Steel", "Aluminium", "Copper", "Cement", "Polymers (PET)", "Composites (CFRP)"]
-    metals = st.multiselect("Metals to Compare", metal_options, default=["Steel", "Aluminium"])
-
-    if st.button(f"Run Comparison ({len(metals)} materials)"):
-        st.markdown("<div class='ai-card fade-in'><b>🤖 AI Suggestion:</b> Steel appears to be the most sustainable for automotive use.</div>", unsafe_allow_html=True)
-
-        impact_names = ["Global Warming Potential", "Energy Demand", "Water Consumption", "Acidification Potential"]
-        metal_impact = {
-            "Aluminium": [2300, 28000, 5, 4.4],
-            "Steel": [1900, 26500, 4, 4.1]
-        }
-        chart_data = []
-        for m in metals:
-            for i, name in enumerate(impact_names):
-                chart_data.append({"Impact": name, "Material": m, "Value": metal_impact.get(m, [None]*4)[i]})
-        df_chart = pd.DataFrame(chart_data)
-        fig = px.bar(df_chart, x="Impact", y="Value", color="Material", barmode="group", text_auto=True)
-        fig.update_layout(
-            legend_title_text="Material",
-            font=dict(color="#FFFFFF"),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        st.dataframe(df_chart.pivot(index="Impact", columns="Material", values="Value"), use_container_width=True)
+    metals = st.multiselect("Metals to Compare", MATERIALS, default=["Steel", "Aluminium"])
+
+    n_scenarios = len(metals) * len(routes) * len(applications)
+    if st.button(f"Run Comparison ({n_scenarios} scenarios)"):
+        if not n_scenarios:
+            st.warning("Select at least one application, route and metal.")
+        else:
+            _show_comparison(metals, routes, applications, funit)
+
+    _sweep_explorer()
+
+
+def _generic_warning(materials):
+    """Flag materials the factor store has no factors of their own for."""
+    generic = [m for m in materials if not default_store().has_material(m)]
+    if generic:
+        st.warning(f"No material-specific factors for {', '.join(generic)}: "
+                   "these use the generic (steel) production processes.")
+
+
+def _show_comparison(metals, routes, applications, funit):
+    # every scenario in one batched run, sharing the Monte Carlo draws
+    comparison = compare_scenarios(metals, routes, applications, seed=DEFAULT_SEED)
+    _generic_warning(metals)
+    scenarios = comparison["scenarios"]
+    gwp = scenarios[(scenarios["Impact"] == "Global Warming Potential")
+                    & (scenarios["Route"] == routes[0]) & (scenarios["Application"] == applications[0])]
+    best = gwp.loc[gwp["Mean"].idxmin(), "Material"]
+    st.markdown(f"<div class='ai-card fade-in'><b>🤖 AI Suggestion:</b> {best} appears to be the most sustainable "
+                f"for {applications[0].lower()} use on the {routes[0].lower()}.</div>", unsafe_allow_html=True)
+
+    df_chart = scenarios[scenarios["Impact"].isin(COMPARE_IMPACTS)]
+    fig = px.bar(df_chart, x="Impact", y="Mean", color="Material", barmode="group", text_auto=".3s",
+                 error_y=df_chart["CI Upper"] - df_chart["Mean"],
+                 error_y_minus=df_chart["Mean"] - df_chart["CI Lower"],
+                 facet_col="Route" if len(routes) > 1 else None,
+                 facet_row="Application" if len(applications) > 1 else None)
+    fig.update_layout(
+        legend_title_text="Material",
+        font=dict(color="#FFFFFF"),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Mean per {funit} with 95% confidence intervals from {comparison['num_runs']:,} "
+               "Monte Carlo runs shared by every scenario.")
+
+    index = [f for f in ("Route", "Application") if scenarios[f].nunique() > 1] + ["Impact"]
+    st.dataframe(df_chart.pivot_table(index=index, columns="Material", values="Mean", sort=False),
+                 use_container_width=True)
+
+    differences = comparison["differences"]
+    differences = differences[differences["Impact"].isin(COMPARE_IMPACTS)]
+    if len(differences):
+        st.markdown("#### Pairwise Differences (A − B)")
+        st.caption("Computed run by run on common random numbers; an interval that excludes 0 "
+                   "means the difference is significant at 95%.")
+        st.dataframe(differences.style.format({
+            "Mean Difference": "{:,.2f}", "CI Lower": "{:,.2f}", "CI Upper": "{:,.2f}", "P(A < B)": "{:.0%}",
+        }), use_container_width=True, hide_index=True)
+
+
+def _option_label(value):
+    return f"{value:g}%" if isinstance(value, float) else value
+
+
+def _sweep_status():
+    """Progress of the running sweep; once done its cube becomes the explored one."""
+    job_id = st.session_state.get("sweep_job")
+    job = get_job(job_id) if job_id else None
+    if job is None:
+        return
+    if not job.done:
+        job_progress(job_id, label="Sweeping scenario grid...")
+        return
+    if job.error:
+        st.error(f"Sweep failed: {job.error}")
+    else:
+        manifest = job.results
+        st.session_state["sweep_key"] = manifest["key"]
+        st.success(f"{manifest['scenarios']:,} scenarios in {manifest['seconds']:.1f}s "
+                   f"on {manifest['workers']} worker(s)")
+    del jobs_table()[job_id]
+    del st.session_state["sweep_job"]
+
+
+def _sweep_explorer():
+    st.markdown("### 🧮 Scenario Matrix Explorer")
+    st.caption("Sweep material × region × production process × end-of-life × secondary content on a "
+               "process pool; heatmaps and pivots are sliced from the stored result cube.")
+
+    s1, s2 = st.columns(2)
+    with s1:
+        materials = st.multiselect("Materials", MATERIALS, default=["Steel", "Aluminium"], key="sweep_materials")
+        regions = st.multiselect("Regions", list(ORE_AUTOFILLS), default=list(ORE_AUTOFILLS), key="sweep_regions")
+        contents = st.multiselect("Secondary Content (%)", CONTENT_LEVELS, default=list(SECONDARY_CONTENTS),
+                                  format_func=_option_label, key="sweep_contents")
+    with s2:
+        processes = st.multiselect("Production Process", list(PRODUCTION_PROCESSES),
+                                   default=list(PRODUCTION_PROCESSES), key="sweep_processes")
+        end_of_life = st.multiselect("End-of-Life Scenario", list(END_OF_LIFE), default=list(END_OF_LIFE),
+                                     key="sweep_end_of_life")
+
+    try:
+        spec = sweep_spec(materials, regions, processes, end_of_life, contents)
+    except ValueError as e:
+        spec = None
+        st.info(f"{e} to run a sweep.")
+    n_scenarios = scenario_count(spec) if spec else 0
+    if st.button(f"Run Sweep ({n_scenarios:,} scenarios)", key="sweep_run", disabled=spec is None):
+        key = sweep_key(spec)
+        if load_manifest(key):
+            st.session_state["sweep_key"] = key  # already swept: reuse the cube
+        else:
+            st.session_state["sweep_job"] = submit_task(run_sweep, spec, label=f"sweep {n_scenarios} scenarios")
+    _sweep_status()
+
+    key = st.session_state.get("sweep_key")
+    manifest = load_manifest(key) if key else None
+    if manifest is None:
+        return
+    sweep = manifest["spec"]
+    _generic_warning(sweep["materials"])
+    st.caption(f"Result cube {key[:8]}: {manifest['scenarios']:,} scenarios, {manifest['rows']:,} rows "
+               f"in {manifest['parts']} Parquet parts, built in {manifest['seconds']:.1f}s.")
+
+    # ======= SLICE CONTROLS (read from the cube, never recomputed) =======
+    v1, v2, v3, v4 = st.columns(4)
+    with v1:
+        impact = st.selectbox("Impact", IMPACT_NAMES, key="sweep_impact")
+    with v2:
+        rows = st.selectbox("Rows", DIMENSIONS, index=DIMENSIONS.index("Region"), key="sweep_rows")
+    with v3:
+        cols = st.selectbox("Columns", [d for d in DIMENSIONS if d != rows], key="sweep_cols")
+    with v4:
+        value = st.selectbox("Value", VALUES, key="sweep_value")
+    axes = dict(zip(DIMENSIONS, (sweep["materials"], sweep["regions"], sweep["processes"],
+                                 sweep["end_of_life"], sweep["secondary_contents"])))
+    rest = [d for d in DIMENSIONS if d not in (rows, cols)]
+    filters = {}
+    for col, dim in zip(st.columns(len(rest)), rest):
+        with col:
+            choice = st.selectbox(dim, [AVERAGE] + axes[dim], format_func=_option_label, key=f"sweep_filter_{dim}")
+        if choice != AVERAGE:
+            filters[dim] = choice
+
+    table = cube_pivot(key, rows, cols, impact, value, filters)
+    fig = px.imshow(table, aspect="auto", color_continuous_scale="Tealgrn",
+                    labels=dict(x=cols, y=rows, color=value))
+    fig.update_layout(
+        font=dict(color="#FFFFFF"),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(table.style.format("{:,.2f}"), use_container_width=True)
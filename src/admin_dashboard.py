@@ -3,6 +3,9 @@ import pandas as pd
 import plotly.express as px
 from pathlib import Path
 
+from dataset_ingest import ingest_dataset, registry_frame
+from job_runner import get_job, job_progress, jobs_table, submit_task
+
 
 # Load global theme
 def load_theme():
@@ -56,6 +59,27 @@ ai_models_df = pd.DataFrame([
 
 
 # --- Function ---
+def _ingest_status():
+    """Progress of the running dataset ingestion, then its outcome once."""
+    job_id = st.session_state.get("ingest_job")
+    job = get_job(job_id) if job_id else None
+    if job is None:
+        return
+    if not job.done:
+        job_progress(job_id, label="Ingesting dataset...")
+        return
+    if job.error:
+        st.error(f"Ingestion failed: {job.error}")
+    else:
+        entry = job.results
+        message = f"{entry['name']}: {entry['rows']:,} rows ({entry['rejected']:,} rejected) in {entry['seconds']:.1f}s"
+        (st.success if entry["status"] == "ingested" else st.warning)(f"{message} — {entry['status']}")
+        for error in entry["errors"][:5]:
+            st.caption(error)
+    del jobs_table()[job_id]
+    del st.session_state["ingest_job"]
+
+
 def show_admin_dashboard(user_info, users_df, datasets_df, ai_models_df):
     load_theme()
     st.markdown("<h2 style='color:#00FFFF;font-weight:800;letter-spacing:-0.5px;'>🧠 MetalliQ Admin Dashboard</h2>", unsafe_allow_html=True)
@@ -105,8 +129,14 @@ def show_admin_dashboard(user_info, users_df, datasets_df, ai_models_df):
         st.dataframe(users_df, use_container_width=True)
 
     elif admin_nav == "Dataset Management":
-        st.file_uploader("Upload New Dataset (CSV or JSON)", type=['csv', 'json'], key="uploader")
-        st.dataframe(datasets_df, use_container_width=True)
+        uploaded = st.file_uploader("Upload New Dataset (CSV or JSON)", type=['csv', 'json', 'jsonl'], key="uploader")
+        st.caption("One factor per row: material, region, process, category, value, unit. "
+                   "Larger files: `python dataset_ingest.py <file>` on the server.")
+        if uploaded is not None and st.button("Ingest Dataset", key="ingest_dataset"):
+            st.session_state["ingest_job"] = submit_task(ingest_dataset, uploaded, label=f"ingest {uploaded.name}")
+        _ingest_status()
+        registry = registry_frame()
+        st.dataframe(datasets_df if registry.empty else registry, use_container_width=True)
 
     elif admin_nav == "AI Model Hub":
         st.dataframe(ai_models_df, use_container_width=True)
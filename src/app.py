@@ -2,10 +2,8 @@ import streamlit as st
 from welcome_page import show_welcome_page
 from login_page import login_page
 from lca_study_form import full_lca_study_form
-from lca_simulation import run_simulation
 from dashboard import dashboard_page
 from ai_recommendation import display_ai_recommendations, ai_data_example
-from results_page import results_page
 from admin_dashboard import show_admin_dashboard, users_df, datasets_df, ai_models_df
 from Compare_Scenarios import compare_scenarios_page
 from view_reports import view_reports_page
@@ -127,19 +125,10 @@ def main_app():
             display_ai_recommendations(st.session_state["ai_recommendations"])
 
     elif page == "➕ New Study":
+        # the form submits, stores and renders the study exactly once
         full_lca_study_form()
-        if st.session_state.get("lca_form_submitted"):
-            inputs = st.session_state["lca_form_data"]
-            with st.spinner("Performing LCA analysis..."):
-                results = run_simulation(inputs)
-            st.session_state["simulation_results"] = results
-            st.session_state["ai_recommendations"] = ai_data_example
-            st.session_state["lca_form_submitted"] = False
-            st.success("Analysis Completed!")
-            results_page(
-                st.session_state["simulation_results"],
-                st.session_state["ai_recommendations"]
-            )
+        if st.session_state.get("simulation_results"):
+            st.session_state.setdefault("ai_recommendations", ai_data_example)
 
     elif page == "📊 Reports":
         view_reports_page()
@@ -0,0 +1,162 @@
+"""
+Headless batch runner for screening many LCA studies at once.
+
+Reads a CSV or Parquet table whose columns are the study form fields
+(material, region, ore_conc, reliability, ...), runs every row through
+simulate_study on a process pool and writes one row of results per study.
+Transport chains can come from a separate legs table with a `study` column
+(0-based row number in the studies table) plus mode, fuel, distance_km and
+payload_t. Never imports Streamlit.
+
+    python batch_runner.py studies.csv -o results.parquet --workers 8 --runs 10000 --legs legs.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from lca_engine import DEFAULT_SAMPLING, DEFAULT_SEED, SAMPLING_METHODS, simulate_study
+from transport import LEG_FIELDS, normalize_legs
+
+STAT_FIELDS = ("mean", "median", "std_dev", "ci_95_lower", "ci_95_upper")
+OUTPUT_FIELDS = ("seed", "runs", "error")  # added to every result row, so reserved in the input
+
+
+def load_studies(path):
+    """Study inputs from a .csv or .parquet file, one study per row."""
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def write_results(df, path):
+    """Write batch results; Parquet unless the path ends in .csv."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def attach_legs(records, legs):
+    """Give each study record its transport chain from a legs table keyed by `study` row number."""
+    study = pd.to_numeric(legs["study"], errors="coerce")
+    bad = ~study.between(0, len(records) - 1) | (study % 1 != 0)
+    if bad.any():
+        row = int(np.flatnonzero(bad.to_numpy())[0])
+        raise ValueError(f"Legs row {row}: study {legs['study'].iloc[row]} is not a row number "
+                         f"of the {len(records)}-study table (rows are 0-based)")
+    legs = legs.sort_values("study", kind="stable")
+    for study, group in legs.groupby("study", sort=False):
+        try:
+            records[int(study)]["transport_legs"] = normalize_legs(group[list(LEG_FIELDS)])
+        except ValueError as e:
+            raise ValueError(f"Legs of study {int(study)}: {e}") from None
+    return records
+
+
+def study_seeds(n, seed=DEFAULT_SEED):
+    """Independent, reproducible integer seeds for n studies."""
+    return [int(s.generate_state(1, np.uint64)[0]) for s in np.random.SeedSequence(seed).spawn(n)]
+
+
+def flatten_results(results):
+    """One flat row of headline numbers from a results dict."""
+    row = {}
+    for impact, stats in results["impact_statistics"].items():
+        for field in STAT_FIELDS:
+            row[f"{impact} {field}"] = stats[field]
+    row["Circularity Score"] = results["executive_summary"]["Circularity Score"]
+    row["Generic Factors"] = results["generic_factors"]
+    return row
+
+
+def _run_one(args):
+    """Process-pool entry point: simulate one study row."""
+    inputs, num_runs, seed, options = args
+    try:
+        results = simulate_study(inputs, num_runs=num_runs, seed=seed, **options)
+        row = flatten_results(results)
+        row["runs"] = results["num_runs"]
+        row["error"] = None
+    except Exception as e:
+        row = {"error": f"{type(e).__name__}: {e}"}
+    return row
+
+
+def run_batch(studies, num_runs=1000, seed=DEFAULT_SEED, workers=None,
+              sampling=DEFAULT_SAMPLING, tolerance=None, legs=None):
+    """
+    Simulate every row of `studies` (a DataFrame) and return the input columns
+    joined with per-impact statistics. Row i always gets the same seed for a
+    given master seed, so results do not depend on the worker count.
+    With a tolerance, num_runs is a per-study budget (see simulate_study).
+    `legs`, if given, is a DataFrame of transport legs (see attach_legs).
+    """
+    clash = [c for c in studies.columns if c in OUTPUT_FIELDS]
+    if clash:
+        raise ValueError(f"Studies table has reserved column(s) {clash}; rename them")
+    records = [
+        {k: (None if pd.isna(v) else v) for k, v in rec.items()}
+        for rec in studies.to_dict("records")
+    ]
+    if legs is not None:
+        attach_legs(records, legs)
+    seeds = study_seeds(len(records), seed)
+    options = {"sampling": sampling, "tolerance": tolerance}
+    jobs = [(rec, num_runs, s, options) for rec, s in zip(records, seeds)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        rows = [_run_one(job) for job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_run_one, jobs, chunksize=chunksize))
+
+    out = studies.reset_index(drop=True).copy()
+    out["seed"] = seeds
+    results = pd.DataFrame(rows)
+    for field in ("runs", "error"):
+        if field not in results:
+            results[field] = None  # empty studies table: no rows to take the columns from
+    return pd.concat([out, results], axis=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MetalliQ LCA simulations for a table of studies.")
+    parser.add_argument("studies", help="CSV or Parquet file with one study per row")
+    parser.add_argument("-o", "--output", default="batch_results.parquet", help="output .parquet or .csv")
+    parser.add_argument("--runs", type=int, default=1000, help="Monte Carlo runs per study")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--sampling", choices=SAMPLING_METHODS, default=DEFAULT_SAMPLING, help="sampling method")
+    parser.add_argument("--legs", default=None, help="CSV or Parquet transport legs with a `study` row column")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="stop each study once its 95%% CI widths change less than this (relative)")
+    args = parser.parse_args(argv)
+
+    studies = load_studies(args.studies)
+    legs = load_studies(args.legs) if args.legs else None
+    start = time.perf_counter()
+    try:
+        results = run_batch(studies, num_runs=args.runs, seed=args.seed, workers=args.workers,
+                            sampling=args.sampling, tolerance=args.tolerance, legs=legs)
+    except ValueError as e:
+        parser.error(str(e))
+    write_results(results, args.output)
+    failed = int(results["error"].notna().sum())
+    print(f"{len(results)} studies in {time.perf_counter() - start:.1f}s -> {args.output}"
+          + (f" ({failed} failed)" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
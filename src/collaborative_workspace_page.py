@@ -1,5 +1,16 @@
 import streamlit as st
 import datetime
+import html
+
+import study_store
+
+WORKSPACE_LIMIT = 50
+# Shown, never saved, while the store has no studies
+WORKSPACE_EXAMPLES = [
+    {"name": "Steel for Automotive Chassis", "owner": "Roshani Lagad", "status": "In Review"},
+    {"name": "Aluminium for Building Frame", "owner": "Priya Patel", "status": "Active"},
+    {"name": "Copper Cable Life-Cycle Study", "owner": "David Kumar", "status": "Completed"},
+]
 
 def collaborative_workspace_page():
     # ---------- PAGE STYLE ----------
@@ -115,15 +126,6 @@ def collaborative_workspace_page():
     st.markdown("<h2 style='color:#006D77;font-weight:800;letter-spacing:-0.4px;'>🤝 Collaborative Workspace</h2>", unsafe_allow_html=True)
     st.caption("Work together on shared LCA studies — view, discuss, and manage progress in real time.")
 
-    # ---------- Session Initialization ----------
-    if "workspace_studies" not in st.session_state:
-        st.session_state.workspace_studies = [
-            {"name": "Steel for Automotive Chassis", "owner": "Roshani Lagad", "updated": "2025-10-04", "status": "In Review"},
-            {"name": "Aluminium for Building Frame", "owner": "Priya Patel", "updated": "2025-10-03", "status": "Active"},
-            {"name": "Copper Cable Life-Cycle Study", "owner": "David Kumar", "updated": "2025-09-29", "status": "Completed"},
-        ]
-    if "workspace_comments" not in st.session_state:
-        st.session_state.workspace_comments = {s["name"]: [] for s in st.session_state.workspace_studies}
     if "show_new_study" not in st.session_state:
         st.session_state.show_new_study = False
 
@@ -131,7 +133,7 @@ def collaborative_workspace_page():
     if not st.session_state.show_new_study:
         if st.button("➕ New Study", key="add_new", help="Add a new collaborative study"):
             st.session_state.show_new_study = True
-            st.experimental_rerun()
+            st.rerun()
 
     # ---------- NEW STUDY MODAL ----------
     if st.session_state.show_new_study:
@@ -144,61 +146,68 @@ def collaborative_workspace_page():
         with col1:
             if st.button("✅ Add Study"):
                 if new_name and new_owner:
-                    st.session_state.workspace_studies.append({
-                        "name": new_name.strip(),
-                        "owner": new_owner.strip(),
-                        "updated": datetime.datetime.now().strftime("%Y-%m-%d"),
-                        "status": new_status
-                    })
-                    st.session_state.workspace_comments[new_name.strip()] = []
+                    study_store.create_study(new_name.strip(), new_owner.strip(), new_status)
                     st.session_state.show_new_study = False
-                    st.experimental_rerun()
+                    st.rerun()
         with col2:
             if st.button("❌ Cancel"):
                 st.session_state.show_new_study = False
-                st.experimental_rerun()
+                st.rerun()
         st.markdown("</div>", unsafe_allow_html=True)
 
     # ---------- STUDY DASHBOARD ----------
     st.markdown("<div class='section-title'>📁 Shared Studies Dashboard</div>", unsafe_allow_html=True)
-    for study in st.session_state.workspace_studies:
+    if not study_store.count_studies():
+        _example_studies()
+    for study in study_store.list_studies(limit=WORKSPACE_LIMIT):
+        sid = study["study_id"]
+        name = html.escape(study["title"])
+        updated = datetime.datetime.fromtimestamp(study["updated_at"]).strftime("%Y-%m-%d")
         col1, col2, col3 = st.columns([5,2,3])
         with col1:
-            st.markdown(f"<div class='study-card'><div class='study-header'>{study['name']}</div>"
-                        f"<div class='meta'>Owner: <b>{study['owner']}</b> | Last Updated: {study['updated']}</div>"
+            st.markdown(f"<div class='study-card'><div class='study-header'>{name}</div>"
+                        f"<div class='meta'>Owner: <b>{html.escape(study['author'])}</b> | Last Updated: {updated}</div>"
                         f"<div style='margin-top:6px;'>"
                         f"<span class='status' style='background:#e0faf4;color:#006D77;'>{study['status']}</span></div>", 
                         unsafe_allow_html=True)
         with col2:
             st.markdown(f"<button class='open-btn'>Open</button>", unsafe_allow_html=True)
         with col3:
-            if st.button("💬 Comments", key=f"toggle_{study['name']}"):
-                st.session_state[f"show_comments_{study['name']}"] = not st.session_state.get(f"show_comments_{study['name']}", False)
+            if st.button("💬 Comments", key=f"toggle_{sid}"):
+                st.session_state[f"show_comments_{sid}"] = not st.session_state.get(f"show_comments_{sid}", False)
         st.markdown("</div>", unsafe_allow_html=True)
 
         # ---------- DISCUSSION THREAD ----------
-        if st.session_state.get(f"show_comments_{study['name']}", False):
+        if st.session_state.get(f"show_comments_{sid}", False):
             st.markdown("<div class='section-title' style='margin-top:8px;'>💭 Discussion Thread</div>", unsafe_allow_html=True)
-            comments = st.session_state.workspace_comments.get(study["name"], [])
+            comments = study_store.list_comments(sid)
             if comments:
                 for c in comments:
-                    st.markdown(f"<div class='comment-card'><div class='comment-meta'>{c['user']} • {c['time']}</div>"
-                                f"<div class='comment-text'>{c['text']}</div></div>", unsafe_allow_html=True)
+                    posted = datetime.datetime.fromtimestamp(c["created_at"]).strftime("%d %b %Y, %H:%M")
+                    st.markdown(f"<div class='comment-card'><div class='comment-meta'>{html.escape(c['author'])} • {posted}</div>"
+                                f"<div class='comment-text'>{html.escape(c['body'])}</div></div>", unsafe_allow_html=True)
             else:
                 st.info("No comments yet. Start the discussion below!")
 
-            new_comment = st.text_input(f"Add a comment for '{study['name']}'", key=f"input_{study['name']}")
-            if st.button(f"Post Comment ({study['name']})"):
+            new_comment = st.text_input(f"Add a comment for '{study['title']}'", key=f"input_{sid}")
+            if st.button(f"Post Comment ({study['title']})", key=f"post_{sid}"):
                 if new_comment.strip():
-                    st.session_state.workspace_comments[study["name"]].append({
-                        "user": "You",
-                        "text": new_comment.strip(),
-                        "time": datetime.datetime.now().strftime("%d %b %Y, %H:%M")
-                    })
-                    st.experimental_rerun()
+                    study_store.add_comment(sid, st.session_state.get("username", "You"), new_comment.strip())
+                    st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+def _example_studies():
+    """Unsaved placeholder cards for an empty store; they never reach Reports or search."""
+    st.info("No shared studies yet. Add one with ➕ New Study; the cards below are examples and are not saved.")
+    for study in WORKSPACE_EXAMPLES:
+        st.markdown(f"<div class='study-card' style='opacity:0.6;'><div class='study-header'>{study['name']}</div>"
+                    f"<div class='meta'>Owner: <b>{study['owner']}</b> | Example</div>"
+                    f"<div style='margin-top:6px;'>"
+                    f"<span class='status' style='background:#e0faf4;color:#006D77;'>{study['status']}</span></div></div>",
+                    unsafe_allow_html=True)
+
+
 # ---------- Local Testing ----------
 if __name__ == "__main__":
     collaborative_workspace_page()
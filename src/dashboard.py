@@ -132,7 +132,7 @@ def dashboard_page(workspace=None):
         "metrics": {"avg_recycling_rate": 85.0, "total_recycled_material": 66.7, "avg_circularity_score": 68.8},
         "recycling_rate_trend": recycling_rate_data,
         "pie_share": [68, 32],
-        "hotspots_materials": [("Steel", 65.6), ("Aluminum", 56.0), ("Copper", 53.5)],
+        "hotspots_materials": [("Steel", 65.6), ("Aluminium", 56.0), ("Copper", 53.5)],
         "reuse_projects": [("New Building Frame", "Steel", 90),
                            ("Residential Building", "Steel", 85),
                            ("Project Gamma", "Copper", 85)],
@@ -0,0 +1,359 @@
+"""
+Streaming ingestion of admin-uploaded factor datasets into the factor store.
+
+An upload is a CSV or JSON Lines table with one factor per row:
+
+    material, region, process, category, value, unit
+
+(material and region default to "*"; materials must be in
+factor_store.MATERIALS; see factor_store for the key conventions). The
+file is read CHUNK_ROWS rows at a time, never whole: each chunk is
+schema- and unit-checked, converted to the store's units and
+written as a Parquet part under DATASET_DIR/<dataset id>.partial while a
+SHA-256 of the raw bytes is computed on the fly. On success the directory
+is renamed into place and only its parts are merged into the factor store,
+overriding earlier datasets and the seed data. The datasets.json registry
+records row counts, rejects, checksums and status for the admin page.
+Never imports Streamlit.
+
+    python dataset_ingest.py factors.csv --name "Steel Europe 2025"
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from factor_store import (CATEGORY_UNITS, DATASET_DIR, FLOWS, KEY_FIELDS, MATERIAL_ALIASES, MATERIALS,
+                          RECORD_FIELDS, WILDCARD, build_store, reload_store)
+
+CHUNK_ROWS = 100_000
+MAX_REPORTED_ERRORS = 20
+REGISTRY_PATH = DATASET_DIR / "datasets.json"
+SUPPORTED_TYPES = ("csv", "json", "jsonl")
+
+# Accepted column spellings (after lower-casing, spaces -> underscores)
+COLUMN_ALIASES = {
+    "flow": "category",
+    "impact_category": "category",
+    "unit_process": "process",
+    "amount": "value",
+    "factor": "value",
+    "country": "region",
+}
+# (uploaded unit, store unit) -> multiplier
+UNIT_CONVERSIONS = {
+    ("g", "kg"): 0.001,
+    ("t", "kg"): 1000.0,
+    ("GJ", "MJ"): 1000.0,
+    ("kWh", "MJ"): 3.6,
+    ("L", "m³"): 0.001,
+    ("m3", "m³"): 1.0,
+    ("m2a", "m²·year"): 1.0,
+    ("g CO2-eq", "kg CO₂-eq"): 0.001,
+    ("kg CO2-eq", "kg CO₂-eq"): 1.0,
+    ("t CO2-eq", "kg CO₂-eq"): 1000.0,
+    ("t CO₂-eq", "kg CO₂-eq"): 1000.0,
+    ("kg SO2-eq", "kg SO₂-eq"): 1.0,
+    ("kg PO4-eq", "kg PO₄-eq"): 1.0,
+}
+
+
+class IngestError(ValueError):
+    """The upload cannot be ingested (bad schema, no valid rows, unsupported type)."""
+
+
+# --- Checksumming reader ---
+class _HashingReader(io.RawIOBase):
+    """Raw stream over a binary file object that hashes and counts every byte read."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        self.sha256.update(data)
+        self.bytes_read += n
+        return n
+
+
+def _source_kind(name, kind=None):
+    kind = (kind or Path(str(name)).suffix.lstrip(".")).lower()
+    if kind not in SUPPORTED_TYPES:
+        raise IngestError(f"Unsupported dataset type {kind!r}; expected one of {SUPPORTED_TYPES}")
+    return "json" if kind == "jsonl" else kind
+
+
+def _read_chunks(stream, kind, malformed):
+    """
+    DataFrame chunks of a buffered binary stream. CSV lines with more fields
+    than the header (e.g. an unquoted comma in a flow name) are skipped and
+    appended to `malformed` as field lists, so they count as rejects instead
+    of aborting the upload; a chunk's lines are appended before it is yielded.
+    """
+    if kind == "csv":
+        # explicit names (peeked, pandas still skips the header row): otherwise pandas
+        # would turn an over-long first data row into an index column
+        first_line = stream.peek(1 << 16).split(b"\n", 1)[0]
+        header = next(csv.reader([first_line.decode("utf-8-sig")]), [])
+        if not header:
+            raise IngestError("Empty CSV file: no header row")
+
+        def skip(fields):
+            malformed.append(fields)
+            return None
+
+        yield from pd.read_csv(stream, names=[h.strip() for h in header], header=0, chunksize=CHUNK_ROWS,
+                               dtype=str, keep_default_na=False, skipinitialspace=True,
+                               engine="python", on_bad_lines=skip)   # callables need the python engine
+        return
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    try:
+        if stream.peek(64).lstrip().startswith(b"["):
+            # a JSON array cannot be split without a streaming parser; read it whole
+            records = json.load(text)
+            for start in range(0, len(records), CHUNK_ROWS):
+                yield pd.DataFrame(records[start:start + CHUNK_ROWS])
+        else:
+            yield from pd.read_json(text, lines=True, chunksize=CHUNK_ROWS, dtype=False)
+    finally:
+        text.detach()  # leave the byte stream open for the checksum
+
+
+# --- Schema and unit validation ---
+def expected_unit(process, category):
+    """Store unit of a (process, category) factor, or None when the name is new to the store."""
+    if category in FLOWS:
+        return FLOWS[category]
+    if category in CATEGORY_UNITS:
+        if process in FLOWS:
+            return f"{CATEGORY_UNITS[category]}/{FLOWS[process]}"
+        return CATEGORY_UNITS[category]
+    return None
+
+
+def _normalize_columns(frame):
+    columns = {}
+    for column in frame.columns:
+        name = str(column).strip().lower().replace(" ", "_")
+        columns[column] = COLUMN_ALIASES.get(name, name)
+    frame = frame.rename(columns=columns)
+    missing = [c for c in ("process", "category", "value", "unit") if c not in frame.columns]
+    if missing:
+        raise IngestError(f"Missing required column(s) {missing}; found {list(frame.columns)}")
+    for field in ("material", "region"):
+        if field not in frame.columns:
+            frame[field] = WILDCARD
+    return frame
+
+
+def validate_chunk(frame, first_row=0):
+    """
+    Validated chunk in store units as (records DataFrame, rejected row count,
+    error messages). Rows are numbered from first_row for the messages.
+    """
+    frame = _normalize_columns(frame)
+    keys = {}
+    for field in KEY_FIELDS + ("unit",):
+        column = frame[field].fillna("").astype(str).str.strip()   # short CSV lines leave NaN
+        if field in ("material", "region"):
+            column = column.replace({"": WILDCARD, "nan": WILDCARD, "None": WILDCARD})
+        if field == "material":
+            column = column.replace(MATERIAL_ALIASES)
+        keys[field] = column.to_numpy(dtype=object)
+    values = pd.to_numeric(frame["value"], errors="coerce").to_numpy(dtype=float)
+    reasons = np.full(len(frame), "", dtype=object)   # "" = row is valid
+    bad_key = np.zeros(len(frame), dtype=bool)
+    for field in ("process", "category", "unit"):
+        bad_key |= np.isin(keys[field], ["", "nan", "None"])
+    reasons[bad_key] = "empty process, category or unit"
+    unknown = ~np.isin(keys["material"], list(MATERIALS) + [WILDCARD])
+    reasons[(reasons == "") & unknown] = "unknown material"
+    reasons[(reasons == "") & ~np.isfinite(values)] = "value is not a finite number"
+
+    # one unit check per distinct (process, category, unit), not per row
+    combos = pd.DataFrame({field: keys[field] for field in ("process", "category", "unit")})
+    group = combos.groupby(list(combos.columns), sort=False).ngroup().to_numpy(dtype=np.int64)
+    distinct = combos.drop_duplicates().itertuples(index=False)   # same order as ngroup(sort=False)
+    units, scales, unit_errors = [], [], []
+    for process, category, unit in distinct:
+        target = expected_unit(process, category)
+        factor = 1.0 if target in (None, unit) else UNIT_CONVERSIONS.get((unit, target))
+        units.append(unit if target is None else target)
+        scales.append(1.0 if factor is None else factor)
+        unit_errors.append("" if factor is not None else f"unit {unit!r} for {category!r}, expected {target!r}")
+    scale = np.asarray(scales)[group]
+    unit_error = np.asarray(unit_errors, dtype=object)[group]
+    reasons[reasons == ""] = unit_error[reasons == ""]
+    keys["unit"] = np.asarray(units, dtype=object)[group]
+
+    ok = reasons == ""
+    errors = [f"row {first_row + i + 1}: {reasons[i]}" for i in np.flatnonzero(~ok)[:MAX_REPORTED_ERRORS]]
+    records = pd.DataFrame({field: keys[field][ok] for field in KEY_FIELDS})
+    records["value"] = values[ok] * scale[ok]
+    records["unit"] = keys["unit"][ok]
+    return records[list(RECORD_FIELDS)], int((~ok).sum()), errors
+
+
+# --- Registry ---
+_registry_lock = threading.Lock()
+_build_lock = threading.Lock()
+
+
+def load_registry():
+    """Registered datasets, oldest first."""
+    try:
+        return json.loads(REGISTRY_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def _record(entry):
+    with _registry_lock:
+        registry = [e for e in load_registry() if e["dataset_id"] != entry["dataset_id"]] + [entry]
+        REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = REGISTRY_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(registry, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, REGISTRY_PATH)
+    return entry
+
+
+def registry_frame():
+    """The registry as a table for the admin Dataset Management page."""
+    rows = [{
+        "Dataset": e["name"],
+        "Type": e["type"].upper(),
+        "Uploaded": e["uploaded"],
+        "Rows": e["rows"],
+        "Rejected": e["rejected"],
+        "Size (MB)": round(e["bytes"] / 1e6, 2),
+        "SHA-256": e["sha256"][:12],
+        "Status": e["status"],
+    } for e in reversed(load_registry())]
+    return pd.DataFrame(rows)
+
+
+# --- Ingestion ---
+def ingest_dataset(source, name=None, kind=None, progress=None):
+    """
+    Stream `source` (a path or binary file object, e.g. a Streamlit upload)
+    into the factor store and return its registry entry. Safe to run on a
+    background thread; progress(fraction) is called as bytes are consumed.
+    """
+    start = time.time()
+    name = name or Path(str(getattr(source, "name", source))).name
+    kind = _source_kind(getattr(source, "name", source), kind)
+    dataset_id = f"ds-{time.time_ns()}"
+    entry = {
+        "dataset_id": dataset_id, "name": name, "type": kind,
+        "uploaded": datetime.date.today().isoformat(), "bytes": 0, "sha256": "",
+        "rows": 0, "rejected": 0, "status": "ingesting", "errors": [], "seconds": 0.0,
+    }
+    staging = DATASET_DIR / f"{dataset_id}.partial"
+    own_file = isinstance(source, (str, Path))
+    raw = open(source, "rb") if own_file else source
+    try:
+        total = _size(raw)
+        reader = _HashingReader(raw)
+        stream = io.BufferedReader(reader, buffer_size=1 << 20)
+        staging.mkdir(parents=True)
+        first_row = 0
+        malformed = []
+        for i, chunk in enumerate(_read_chunks(stream, kind, malformed)):
+            records, rejected, errors = validate_chunk(chunk, first_row)
+            first_row += len(chunk)
+            entry["rows"] += len(records)
+            entry["rejected"] += rejected
+            entry["errors"] += errors[:MAX_REPORTED_ERRORS - len(entry["errors"])]
+            _count_malformed(entry, malformed)
+            if len(records):
+                records.to_parquet(staging / f"part-{i:05d}.parquet", index=False)
+            if progress and total:
+                progress(0.9 * reader.bytes_read / total)
+        _count_malformed(entry, malformed)   # lines after the last full chunk
+        stream.read()  # hash any trailing bytes the parser did not need
+        entry["bytes"], entry["sha256"] = reader.bytes_read, reader.sha256.hexdigest()
+        if not entry["rows"]:
+            raise IngestError(f"No valid rows in {name!r}" + (f": {entry['errors'][0]}" if entry["errors"] else ""))
+        duplicate = next((e for e in load_registry()
+                          if e["sha256"] == entry["sha256"] and e["status"] == "ingested"), None)
+        if duplicate:
+            shutil.rmtree(staging, ignore_errors=True)
+            entry["status"] = f"duplicate of {duplicate['name']}"
+        else:
+            with _build_lock:
+                staging.rename(DATASET_DIR / dataset_id)
+                build_store()
+                reload_store()
+            entry["status"] = "ingested"
+    except Exception as e:
+        shutil.rmtree(staging, ignore_errors=True)
+        entry["status"] = "failed"
+        entry["errors"] = [f"{type(e).__name__}: {e}"] + entry["errors"]
+        entry["seconds"] = round(time.time() - start, 2)
+        _record(entry)
+        raise
+    finally:
+        if own_file:
+            raw.close()
+    entry["seconds"] = round(time.time() - start, 2)
+    if progress:
+        progress(1.0)
+    return _record(entry)
+
+
+def _count_malformed(entry, malformed):
+    """Fold malformed CSV lines into the entry's rejects and errors, then clear them."""
+    entry["rejected"] += len(malformed)
+    entry["errors"] += [f"malformed line ({len(fields)} fields): {','.join(fields)[:80]}"
+                        for fields in malformed[:MAX_REPORTED_ERRORS - len(entry["errors"])]]
+    malformed.clear()
+
+
+def _size(raw):
+    """Total byte size of a file object, or None if it cannot be determined."""
+    size = getattr(raw, "size", None)
+    if size is not None:
+        return size
+    try:
+        return os.fstat(raw.fileno()).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest a factor dataset into the MetalliQ factor store.")
+    parser.add_argument("path", help="CSV or JSON Lines file, one factor per row")
+    parser.add_argument("--name", default=None, help="dataset name in the registry (default: file name)")
+    parser.add_argument("--type", default=None, choices=SUPPORTED_TYPES, help="override the type from the suffix")
+    args = parser.parse_args(argv)
+    try:
+        entry = ingest_dataset(args.path, name=args.name, kind=args.type)
+    except (IngestError, OSError) as e:
+        print(f"failed: {e}", file=sys.stderr)
+        return 1
+    print(f"{entry['name']}: {entry['rows']} rows ({entry['rejected']} rejected), "
+          f"sha256 {entry['sha256'][:12]}, {entry['status']} in {entry['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,659 @@
+"""
+Indexed store of emission, characterization and reference factors.
+
+Every factor is keyed on (material, region, process, category):
+- unit-process exchanges: (material, region, process, elementary flow)
+- characterization factors: ("*", "*", elementary flow, impact category)
+- reference results: (material, region, REFERENCE_PROCESS, impact category)
+"*" is a wildcard; lookups fall back from (material, region) to
+(material, "*"), ("*", region) and ("*", "*").
+
+On disk the store is a directory of .npy columns (dictionary-encoded key
+codes, values, units) plus an open-addressing hash index over the packed
+keys, all opened with mmap_mode="r": worker processes share the same page
+cache instead of each loading a copy, and a lookup is a hash plus a short
+probe. Only building a store imports pandas; opening and reading one needs
+NumPy alone. Each build writes a new generation directory and atomically
+swaps the CURRENT pointer, so open readers keep a consistent view.
+
+A build merges the seed dataset below with every dataset ingested into
+DATASET_DIR (see dataset_ingest.py); later datasets override earlier ones.
+When the current generation already holds the older datasets only the new
+ones are read and merged into it. The store and uploads live under
+DATA_DIR (METALLIQ_DATA_DIR, default ~/.metalliq), never in the source tree.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+DATA_DIR = Path(os.environ.get("METALLIQ_DATA_DIR", Path.home() / ".metalliq"))
+FACTOR_DIR = Path(os.environ.get("METALLIQ_FACTOR_DIR", DATA_DIR / "factors"))
+DATASET_DIR = Path(os.environ.get("METALLIQ_DATASET_DIR", DATA_DIR / "datasets"))
+KEEP_GENERATIONS = 2
+WILDCARD = "*"
+REFERENCE_PROCESS = "Reference result (cradle-to-gate)"
+KEY_FIELDS = ("material", "region", "process", "category")
+RECORD_FIELDS = KEY_FIELDS + ("value", "unit")
+STORE_FORMAT = 1        # bump when the on-disk layout changes
+CODE_BITS = 15          # per key field; four fields pack into a non-negative int64
+EMPTY = np.uint64(2 ** 64 - 1)
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# --- Seed data: the default dataset, previously literals across the app ---
+FLOWS = {
+    "Carbon dioxide, fossil": "kg",
+    "Methane, fossil": "kg",
+    "Dinitrogen monoxide": "kg",
+    "Sulfur dioxide": "kg",
+    "Nitrogen oxides": "kg",
+    "Particulates, < 2.5 um": "kg",
+    "NMVOC": "kg",
+    "Phosphate, to water": "kg",
+    "Water, consumed": "m³",
+    "Energy, fossil": "MJ",
+    "Energy, renewable": "MJ",
+    "Metals, to water": "kg",
+    "Metals, to air": "kg",
+    "Radionuclides": "kBq",
+    "Halogenated organics": "kg",
+    "Mineral resources": "kg Sb-eq",
+    "Land occupation": "m²·year",
+}
+# Elementary flows per unit of process output (see inventory.PROCESSES for units)
+BIOSPHERE = {
+    "primary": {
+        "Carbon dioxide, fossil": 1107.0,  # reduction / calcination process CO₂
+        "Sulfur dioxide": 1.94,
+        "Nitrogen oxides": 0.35,
+        "Particulates, < 2.5 um": 0.48,
+        "NMVOC": 0.65,
+        "Phosphate, to water": 0.76,
+        "Water, consumed": 4.0,
+        "Energy, fossil": 4000.0,          # reductant feedstock energy
+        "Metals, to water": 0.000195,
+        "Metals, to air": 0.0025,
+        "Halogenated organics": 0.000055,
+        "Land occupation": 20.0,
+    },
+    "secondary": {
+        "Carbon dioxide, fossil": 60.0,
+        "Particulates, < 2.5 um": 0.1,
+        "Water, consumed": 1.5,
+        "Metals, to air": 0.001,
+        "Land occupation": 5.0,
+    },
+    "ore": {
+        "Particulates, < 2.5 um": 0.01,
+        "Water, consumed": 0.05,
+        "Mineral resources": 0.00066,
+        "Land occupation": 101.0,
+    },
+    "electricity": {
+        "Carbon dioxide, fossil": 0.82,
+        "Methane, fossil": 0.002,
+        "Dinitrogen monoxide": 0.00001,
+        "Sulfur dioxide": 0.0025,
+        "Nitrogen oxides": 0.001,
+        "Particulates, < 2.5 um": 0.0004,
+        "Phosphate, to water": 0.0005,
+        "Water, consumed": 0.0015,
+        "Energy, fossil": 9.4,
+        "Energy, renewable": 0.9,
+        "Metals, to water": 0.0000001,
+        "Radionuclides": 0.00000063,
+        "Land occupation": 0.05,
+    },
+    "heat": {
+        "Carbon dioxide, fossil": 0.05,
+        "Methane, fossil": 0.00002,
+        "Nitrogen oxides": 0.00003,
+        "Particulates, < 2.5 um": 0.000005,
+        "NMVOC": 0.00002,
+        "Energy, fossil": 1.1,
+    },
+    "transport": {   # per t·km, road diesel; replaced per study by the transport leg mix
+        "Carbon dioxide, fossil": 0.105,
+        "Nitrogen oxides": 0.0007,
+        "Particulates, < 2.5 um": 0.00002,
+        "Energy, fossil": 1.45,
+    },
+}
+# --- Materials: one vocabulary for the study form, comparisons, sweeps and this store ---
+GENERIC_MATERIAL = "Steel"    # the generic processes above describe steel
+MATERIALS = (
+    "Steel", "Stainless Steel", "Aluminium", "Copper", "Zinc", "Lead", "Chromium", "Nickel",
+    "Magnesium", "Tin", "Titanium", "Cement", "Polymers (PET)", "Composites (CFRP)",
+)
+MATERIAL_ALIASES = {"Aluminum": "Aluminium"}   # other spellings found in saved studies
+# Material-specific production exchanges (per t); flows not listed fall back
+# to the generic processes above
+MATERIAL_BIOSPHERE = {
+    "Aluminium": {
+        "primary": {   # alumina refining + Hall-Héroult smelting (anode CO₂, PFCs as CO₂-eq)
+            "Carbon dioxide, fossil": 8400.0,
+            "Sulfur dioxide": 7.5,
+            "Nitrogen oxides": 0.9,
+            "Particulates, < 2.5 um": 1.1,
+            "Phosphate, to water": 0.9,
+            "Water, consumed": 9.0,
+            "Energy, fossil": 42000.0,
+            "Land occupation": 48.0,
+        },
+        "secondary": {
+            "Carbon dioxide, fossil": 310.0,
+            "Water, consumed": 2.0,
+        },
+    },
+    "Copper": {
+        "primary": {   # sulfide concentrate smelting and electrorefining
+            "Carbon dioxide, fossil": 2700.0,
+            "Sulfur dioxide": 28.0,
+            "Particulates, < 2.5 um": 2.4,
+            "Water, consumed": 38.0,
+            "Energy, fossil": 16000.0,
+            "Metals, to water": 0.0021,
+            "Metals, to air": 0.03,
+            "Land occupation": 160.0,
+        },
+    },
+    "Cement": {
+        "primary": {   # clinker calcination
+            "Carbon dioxide, fossil": 520.0,
+            "Sulfur dioxide": 0.35,
+            "Nitrogen oxides": 1.6,
+            "Particulates, < 2.5 um": 0.15,
+            "Phosphate, to water": 0.01,
+            "Water, consumed": 0.6,
+            "Energy, fossil": 900.0,
+            "Land occupation": 4.0,
+        },
+    },
+    "Polymers (PET)": {
+        "primary": {   # incl. fossil feedstock energy
+            "Carbon dioxide, fossil": 1350.0,
+            "Sulfur dioxide": 2.9,
+            "Nitrogen oxides": 2.4,
+            "NMVOC": 3.8,
+            "Phosphate, to water": 0.05,
+            "Water, consumed": 11.0,
+            "Energy, fossil": 70000.0,
+            "Land occupation": 1.2,
+        },
+        "secondary": {
+            "Carbon dioxide, fossil": 420.0,
+            "Water, consumed": 3.0,
+        },
+    },
+    "Composites (CFRP)": {
+        "primary": {   # PAN precursor, carbonization and epoxy matrix
+            "Carbon dioxide, fossil": 21000.0,
+            "Sulfur dioxide": 18.0,
+            "Nitrogen oxides": 14.0,
+            "Particulates, < 2.5 um": 1.6,
+            "NMVOC": 5.0,
+            "Phosphate, to water": 0.4,
+            "Water, consumed": 60.0,
+            "Energy, fossil": 180000.0,
+            "Land occupation": 12.0,
+        },
+        "secondary": {   # fibre recovery by pyrolysis
+            "Carbon dioxide, fossil": 3200.0,
+            "Energy, fossil": 30000.0,
+        },
+    },
+}
+# Impact per unit of elementary flow
+CHARACTERIZATION = {
+    "Global Warming Potential": {"Carbon dioxide, fossil": 1.0, "Methane, fossil": 29.8, "Dinitrogen monoxide": 273.0},
+    "Acidification Potential": {"Sulfur dioxide": 1.0, "Nitrogen oxides": 0.7},
+    "Photochemical Ozone Creation": {"Nitrogen oxides": 1.0, "NMVOC": 1.0},
+    "Abiotic Depletion (Fossil)": {"Energy, fossil": 1.1},
+    "Fresh Water Ecotoxicity": {"Metals, to water": 100000.0},
+    "Energy Demand": {"Energy, fossil": 1.0, "Energy, renewable": 1.0},
+    "Eutrophication Demand": {"Phosphate, to water": 1.0, "Nitrogen oxides": 0.13},
+    "Particulate Matter Formation": {"Particulates, < 2.5 um": 1.0},
+    "Human Toxicity (Cancer)": {"Metals, to air": 5.0},
+    "Ionizing Radiation": {"Radionuclides": 1.0},
+    "Water Consumption": {"Water, consumed": 1.0},
+    "Ozone Depletion Potential": {"Halogenated organics": 1.0},
+    "Abiotic Depletion (Elements)": {"Mineral resources": 1.0},
+    "Human Toxicity (Non-Cancer)": {"Metals, to air": 875.0, "Metals, to water": 1000.0},
+    "Land Use": {"Land occupation": 1.0},
+}
+CATEGORY_UNITS = {
+    "Global Warming Potential": "kg CO₂-eq",
+    "Acidification Potential": "kg SO₂-eq",
+    "Photochemical Ozone Creation": "kg NMVOC-eq",
+    "Abiotic Depletion (Fossil)": "MJ",
+    "Fresh Water Ecotoxicity": "CTUe",
+    "Energy Demand": "MJ",
+    "Eutrophication Demand": "kg PO₄-eq",
+    "Particulate Matter Formation": "kg PM2.5-eq",
+    "Human Toxicity (Cancer)": "CTUh",
+    "Ionizing Radiation": "kBq U235-eq",
+    "Water Consumption": "m³",
+    "Ozone Depletion Potential": "kg CFC-11-eq",
+    "Abiotic Depletion (Elements)": "kg Sb-eq",
+    "Human Toxicity (Non-Cancer)": "CTUh",
+    "Land Use": "m²·year",
+}
+# Published per-ton results used as report fallbacks and scenario comparisons
+REFERENCE_RESULTS = {
+    ("Steel", "India"): {
+        "Global Warming Potential": 2288.0,
+        "Acidification Potential": 4.11,
+        "Photochemical Ozone Creation": 2.29,
+        "Abiotic Depletion (Fossil)": 29288.0,
+        "Fresh Water Ecotoxicity": 22.88,
+        "Energy Demand": 26626.0,
+        "Eutrophication Demand": 1.14,
+        "Particulate Matter Formation": 0.763,
+        "Human Toxicity (Cancer)": 0.012,
+        "Ionizing Radiation": 0.00035,
+        "Water Consumption": 4.7,
+        "Ozone Depletion Potential": 0.00005,
+        "Abiotic Depletion (Elements)": 0.0012,
+        "Human Toxicity (Non-Cancer)": 2.29,
+        "Land Use": 228.77,
+    },
+    ("Steel", WILDCARD): {
+        "Global Warming Potential": 1900, "Energy Demand": 26500, "Water Consumption": 4, "Acidification Potential": 4.1,
+    },
+    # the inventory's default study (inventory.study_impacts) with MATERIAL_BIOSPHERE["Aluminium"]
+    ("Aluminium", WILDCARD): {
+        "Global Warming Potential": 8877.0, "Energy Demand": 60772.0, "Water Consumption": 9.22,
+        "Acidification Potential": 9.46,
+    },
+}
+
+# --- Regions: typical ore grade (%) and ore type, for the study form autofill and sweep axis ---
+ORE_AUTOFILLS = {
+    "Odisha": {"concentration": 55, "type": "Hematite"},
+    "Maharashtra": {"concentration": 46, "type": "Magnetite"},
+    "Jharkhand": {"concentration": 60, "type": "Hematite"},
+    "Chhattisgarh": {"concentration": 62, "type": "Hematite"},
+    "Gujarat": {"concentration": 50, "type": "Magnetite"},
+    "Tamil Nadu": {"concentration": 48, "type": "Hematite"},
+    "Karnataka": {"concentration": 52, "type": "Magnetite"},
+    "West Bengal": {"concentration": 54, "type": "Goethite"},
+    "Andhra Pradesh": {"concentration": 49, "type": "Hematite"},
+    "Rajasthan": {"concentration": 45, "type": "Magnetite"},
+    "Punjab": {"concentration": 47, "type": "Hematite"},
+    "Uttar Pradesh": {"concentration": 44, "type": "Goethite"},
+    "Telangana": {"concentration": 53, "type": "Hematite"},
+    "North India": {"concentration": 41, "type": "Magnetite"},
+    "South India": {"concentration": 50, "type": "Hematite"},
+    "East India": {"concentration": 55, "type": "Hematite"},
+    "West India": {"concentration": 47, "type": "Magnetite"},
+    "Central India": {"concentration": 53, "type": "Hematite"},
+    "North-East India": {"concentration": 40, "type": "Goethite"},
+}
+
+def canonical_material(name):
+    """The MATERIALS spelling of a material name; unknown names are returned stripped."""
+    name = str(name).strip()
+    return MATERIAL_ALIASES.get(name, name)
+
+
+def seed_records():
+    """(material, region, process, category, value, unit) rows of the default dataset."""
+    rows = []
+    for process, flows in BIOSPHERE.items():
+        rows += [(WILDCARD, WILDCARD, process, flow, value, FLOWS[flow]) for flow, value in flows.items()]
+    for material, processes in MATERIAL_BIOSPHERE.items():
+        for process, flows in processes.items():
+            rows += [(material, WILDCARD, process, flow, value, FLOWS[flow]) for flow, value in flows.items()]
+    for category, factors in CHARACTERIZATION.items():
+        rows += [(WILDCARD, WILDCARD, flow, category, value, f"{CATEGORY_UNITS[category]}/{FLOWS[flow]}")
+                 for flow, value in factors.items()]
+    for (material, region), results in REFERENCE_RESULTS.items():
+        rows += [(material, region, REFERENCE_PROCESS, category, float(value), CATEGORY_UNITS[category])
+                 for category, value in results.items()]
+    return rows
+
+
+def _hash(keys, bits):
+    return ((keys.astype(np.uint64) * HASH_MULTIPLIER) >> np.uint64(64 - bits)).astype(np.int64)
+
+
+def _build_index(keys):
+    """Open-addressing (linear probing) table over unique uint64 keys, built in vectorized rounds."""
+    bits = max(4, int(np.ceil(np.log2(max(len(keys), 1) * 2))))
+    size = 1 << bits
+    slot_keys = np.full(size, EMPTY, dtype=np.uint64)
+    slot_rows = np.full(size, -1, dtype=np.int32)
+    pending = np.arange(len(keys))
+    slot = _hash(keys, bits)
+    max_probe = 0
+    probe = 0
+    while pending.size:
+        target = slot[pending]
+        free = slot_keys[target] == EMPTY
+        # among pending keys hitting the same free slot, the first one wins this round
+        _, first = np.unique(target[free], return_index=True)
+        winners = pending[free][first]
+        slot_keys[slot[winners]] = keys[winners]
+        slot_rows[slot[winners]] = winners
+        if winners.size:
+            max_probe = probe
+        placed = np.zeros(len(keys), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed[pending]]
+        slot[pending] = (slot[pending] + 1) & (size - 1)
+        probe += 1
+    return slot_keys, slot_rows, bits, max_probe
+
+
+class FactorStore:
+    """Columnar factor table with a hash index; see the module docstring."""
+
+    def __init__(self, columns, vocab, index, meta=None):
+        self.columns = columns                    # field -> code array, plus "value" and "unit"
+        self.vocab = vocab                        # field -> list of strings
+        self.slot_keys, self.slot_rows = index
+        self.meta = meta or {}
+        self.bits = self.meta["bits"]
+        self.max_probe = self.meta["max_probe"]
+        self._codes = {field: {name: i for i, name in enumerate(names)} for field, names in vocab.items()}
+
+    # --- construction / persistence ---
+    @classmethod
+    def from_records(cls, records, **meta):
+        """Build in memory from (material, region, process, category, value, unit) rows; later rows win."""
+        import pandas as pd  # lazy: only building needs pandas
+        return cls.from_frame(pd.DataFrame(list(records), columns=RECORD_FIELDS), **meta)
+
+    @classmethod
+    def from_frame(cls, frame, **meta):
+        """Build in memory from a DataFrame with RECORD_FIELDS columns; later rows win."""
+        vocab = {field: [] for field in KEY_FIELDS + ("unit",)}
+        codes = _encode(frame, vocab, {field: {} for field in vocab})
+        return cls.from_codes(codes, frame["value"].to_numpy(dtype=float), vocab, **meta)
+
+    @classmethod
+    def from_codes(cls, codes, values, vocab, **meta):
+        """Build in memory from per-field code arrays into `vocab` plus values; later rows win."""
+        keys = cls._pack(*(codes[field] for field in KEY_FIELDS))
+        # keep the last occurrence of every key so later records override earlier ones
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = np.sort(len(keys) - 1 - last)
+        columns = {field: np.asarray(codes[field])[keep].astype(np.uint16) for field in KEY_FIELDS + ("unit",)}
+        columns["value"] = np.asarray(values, dtype=float)[keep]
+        slot_keys, slot_rows, bits, max_probe = _build_index(keys[keep])
+        digest = hashlib.sha256()
+        for array in (keys[keep], columns["value"], columns["unit"]):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(json.dumps(vocab, ensure_ascii=False).encode("utf-8"))
+        meta = dict(meta, format=STORE_FORMAT, rows=int(keep.size), bits=bits, max_probe=max_probe,
+                    digest=digest.hexdigest(), built_at=time.time())
+        return cls(columns, vocab, (slot_keys, slot_rows), meta)
+
+    def save(self, directory=FACTOR_DIR):
+        """Write a new generation under `directory` and point CURRENT at it."""
+        directory = Path(directory)
+        generation = f"gen-{time.time_ns()}-{os.getpid()}"
+        target = directory / generation
+        target.mkdir(parents=True)
+        for name, array in self.columns.items():
+            np.save(target / f"{name}.npy", array)
+        np.save(target / "index_keys.npy", self.slot_keys)
+        np.save(target / "index_rows.npy", self.slot_rows)
+        (target / "vocab.json").write_text(json.dumps({"vocab": self.vocab, "meta": self.meta}, ensure_ascii=False))
+        tmp = directory / f"CURRENT.{os.getpid()}.tmp"
+        tmp.write_text(generation)
+        os.replace(tmp, directory / "CURRENT")
+        # keep the previous generation for processes that are still opening it
+        for old in sorted(directory.glob("gen-*"), key=lambda p: p.stat().st_mtime)[:-KEEP_GENERATIONS]:
+            _remove_generation(old)
+        return target
+
+    @classmethod
+    def open(cls, directory=FACTOR_DIR):
+        """Memory-map the current generation under `directory`."""
+        directory = Path(directory)
+        target = directory / (directory / "CURRENT").read_text().strip()
+        payload = json.loads((target / "vocab.json").read_text())
+        columns = {name: np.load(target / f"{name}.npy", mmap_mode="r")
+                   for name in KEY_FIELDS + ("unit", "value")}
+        index = (np.load(target / "index_keys.npy", mmap_mode="r"), np.load(target / "index_rows.npy", mmap_mode="r"))
+        return cls(columns, payload["vocab"], index, payload["meta"])
+
+    # --- lookups ---
+    @staticmethod
+    def _pack(material, region, process, category):
+        return ((np.asarray(material, dtype=np.int64) << (3 * CODE_BITS))
+                | (np.asarray(region, dtype=np.int64) << (2 * CODE_BITS))
+                | (np.asarray(process, dtype=np.int64) << CODE_BITS)
+                | np.asarray(category, dtype=np.int64)).astype(np.uint64)
+
+    def __len__(self):
+        return int(self.meta["rows"])
+
+    def _row(self, material, region, process, category):
+        codes = [self._codes[f].get(v) for f, v in zip(KEY_FIELDS, (material, region, process, category))]
+        if None in codes:
+            return -1
+        key = int(self._pack(*codes))
+        mask = (1 << self.bits) - 1
+        slot = int(_hash(np.array([key], dtype=np.uint64), self.bits)[0])
+        for _ in range(self.max_probe + 1):
+            found = int(self.slot_keys[slot])
+            if found == key:
+                return int(self.slot_rows[slot])
+            if found == int(EMPTY):
+                return -1
+            slot = (slot + 1) & mask
+        return -1
+
+    def has_material(self, material):
+        """
+        True if the store has factors of the material's own. Other materials
+        are computed with the generic (steel) processes and must be flagged.
+        """
+        return material == GENERIC_MATERIAL or material in self._codes["material"]
+
+    def _fallbacks(self, material, region):
+        return [(material, region), (material, WILDCARD), (WILDCARD, region), (WILDCARD, WILDCARD)]
+
+    def get(self, material, region, process, category, default=None):
+        """Value for a key, falling back to wildcard material / region."""
+        for m, r in self._fallbacks(material, region):
+            row = self._row(m, r, process, category)
+            if row >= 0:
+                return float(self.columns["value"][row])
+        return default
+
+    def unit(self, material, region, process, category):
+        for m, r in self._fallbacks(material, region):
+            row = self._row(m, r, process, category)
+            if row >= 0:
+                return self.vocab["unit"][int(self.columns["unit"][row])]
+        return None
+
+    def lookup_rows(self, material, region, processes, categories):
+        """Vectorized exact lookup of many (process, category) pairs; -1 where absent."""
+        codes = []
+        for field, values in (("process", processes), ("category", categories)):
+            table = self._codes[field]
+            codes.append(np.fromiter((table.get(v, -1) for v in values), dtype=np.int64, count=len(values)))
+        m, r = self._codes["material"].get(material, -1), self._codes["region"].get(region, -1)
+        rows = np.full(len(codes[0]), -1, dtype=np.int64)
+        valid = (codes[0] >= 0) & (codes[1] >= 0) & (m >= 0) & (r >= 0)
+        if not valid.any():
+            return rows
+        keys = self._pack(m, r, codes[0][valid], codes[1][valid])
+        slot = _hash(keys, self.bits)
+        found = np.full(keys.size, -1, dtype=np.int64)
+        pending = np.arange(keys.size)
+        for _ in range(self.max_probe + 1):
+            stored = self.slot_keys[slot[pending]]
+            hit = stored == keys[pending]
+            found[pending[hit]] = self.slot_rows[slot[pending[hit]]]
+            pending = pending[~hit & (stored != EMPTY)]
+            if not pending.size:
+                break
+            slot[pending] = (slot[pending] + 1) & ((1 << self.bits) - 1)
+        rows[valid] = found
+        return rows
+
+    def table(self, processes, categories, material=WILDCARD, region=WILDCARD):
+        """
+        Dense (len(processes), len(categories)) matrix of factors with
+        wildcard fallback per cell; absent factors are 0.
+        """
+        p = np.repeat(list(processes), len(categories))
+        c = np.tile(list(categories), len(processes))
+        out = np.zeros(p.size)
+        filled = np.zeros(p.size, dtype=bool)
+        values = self.columns["value"]
+        for m, r in self._fallbacks(material, region):
+            rows = self.lookup_rows(m, r, p, c)
+            take = (rows >= 0) & ~filled
+            out[take] = values[rows[take]]
+            filled |= take
+        return out.reshape(len(processes), len(categories))
+
+    def records(self):
+        """All rows as a list of (material, region, process, category, value, unit) tuples."""
+        cols = [np.asarray(self.columns[f]) for f in KEY_FIELDS + ("unit",)]
+        values = np.asarray(self.columns["value"])
+        return [
+            tuple(self.vocab[f][int(cols[j][i])] for j, f in enumerate(KEY_FIELDS))
+            + (float(values[i]), self.vocab["unit"][int(cols[4][i])])
+            for i in range(len(values))
+        ]
+
+
+def _remove_generation(path):
+    try:
+        for child in path.glob("*"):
+            child.unlink(missing_ok=True)
+        path.rmdir()
+    except OSError:
+        pass  # still mapped elsewhere (Windows) or already removed
+
+
+def _seed_digest():
+    blob = json.dumps(seed_records(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def dataset_parts():
+    """Parquet parts of every committed ingested dataset, oldest dataset first."""
+    if not DATASET_DIR.is_dir():
+        return []
+    return [part for dataset in sorted(DATASET_DIR.glob("ds-*")) if dataset.is_dir()
+            for part in sorted(dataset.glob("part-*.parquet"))]
+
+
+def _dataset_signature(parts=None):
+    return [str(part.relative_to(DATASET_DIR)) for part in (dataset_parts() if parts is None else parts)]
+
+
+def _encode(frame, vocab, lookup):
+    """
+    Code arrays for a frame's key and unit columns, numbered in `vocab`
+    (field -> list of names). Names not seen yet are appended to vocab and
+    to `lookup` (field -> {name: code}).
+    """
+    import pandas as pd  # lazy: only building needs pandas
+    codes = {}
+    for field in KEY_FIELDS + ("unit",):
+        column = frame[field]
+        if not isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(str)
+        local, uniques = pd.factorize(column, sort=False)
+        table, names = lookup[field], vocab[field]
+        for name in map(str, uniques):
+            if name not in table:
+                table[name] = len(names)
+                names.append(name)
+        if len(names) >= 1 << CODE_BITS:
+            raise ValueError(f"Factor store supports at most {1 << CODE_BITS} distinct values per key field")
+        mapping = np.fromiter((table[str(name)] for name in uniques), dtype=np.int64, count=len(uniques))
+        codes[field] = mapping[local]
+    return codes
+
+
+def _current_store(directory):
+    """The current generation under `directory` if it matches this seed and format, else None."""
+    try:
+        store = FactorStore.open(directory)
+    except (OSError, ValueError, KeyError):
+        return None
+    if store.meta.get("format") != STORE_FORMAT or store.meta.get("seed") != _seed_digest():
+        return None
+    return store
+
+
+def build_store(directory=FACTOR_DIR):
+    """
+    Bring the on-disk store up to date with the seed dataset plus every
+    ingested dataset (later datasets override earlier ones and the seed),
+    then open it. If the current generation already holds the older
+    datasets only the new Parquet parts are read and merged into it;
+    otherwise the store is rebuilt from the seed. Parts are read one at a
+    time and kept as code arrays, so memory never holds the ingested text.
+    """
+    import pandas as pd
+    parts = dataset_parts()
+    signature = _dataset_signature(parts)
+    base = _current_store(directory)
+    merged = base.meta.get("datasets", []) if base is not None else []
+    if base is None or signature[:len(merged)] != merged:
+        base, merged = FactorStore.from_records(seed_records()), []
+    elif merged == signature:
+        return base
+    vocab = {field: list(names) for field, names in base.vocab.items()}
+    lookup = {field: dict(table) for field, table in base._codes.items()}
+    codes = {field: [np.asarray(base.columns[field])] for field in KEY_FIELDS + ("unit",)}
+    values = [np.asarray(base.columns["value"])]
+    for part in parts[len(merged):]:
+        frame = pd.read_parquet(part, columns=list(RECORD_FIELDS))
+        for field, column in _encode(frame, vocab, lookup).items():
+            codes[field].append(column)
+        values.append(frame["value"].to_numpy(dtype=float))
+    store = FactorStore.from_codes({field: np.concatenate(arrays) for field, arrays in codes.items()},
+                                   np.concatenate(values), vocab, seed=_seed_digest(), datasets=signature)
+    store.save(directory)
+    return FactorStore.open(directory)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def default_store():
+    """
+    The process-wide store, memory-mapped from FACTOR_DIR. Built on first
+    use, or when the seed, format or set of ingested datasets changed; kept
+    in memory if the directory is not writable.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                store = FactorStore.open(FACTOR_DIR)
+                if (store.meta.get("format") != STORE_FORMAT or store.meta.get("seed") != _seed_digest()
+                        or store.meta.get("datasets", []) != _dataset_signature()):
+                    store = build_store(FACTOR_DIR)
+            except (OSError, ValueError, KeyError):
+                try:
+                    store = build_store(FACTOR_DIR)
+                except OSError:
+                    store = FactorStore.from_records(seed_records(), seed=_seed_digest())  # read-only install
+            _store = store
+        return _store
+
+
+def reload_store():
+    """Drop the cached store so the next default_store() maps the current generation."""
+    global _store
+    with _store_lock:
+        _store = None
@@ -0,0 +1,234 @@
+"""
+Process-based life cycle inventory for one ton of metal at the factory gate.
+
+The study's lifecycle and transport stages become unit processes. Each
+process makes one product, which gives a square technosphere matrix A,
+a biosphere matrix B of elementary flows per unit of process output and a
+characterization matrix C:
+
+    A · s = f      scaling vector s for the final demand f
+    g = B · s      life cycle inventory (elementary flows)
+    h = C · g      characterized impact results
+
+B and C are read from the factor store (factor_store.py), specific to the
+study's material and region where the store has such factors.
+A depends only on the study parameters, so its sparse LU factorization is
+cached per parameter set. Scenario variants that change only the demand
+vector (primary vs. recycled routes, contribution analysis) just redo the
+triangular solves. batch_impacts solves many small dense systems in one
+call for the vectorized impact model used by sensitivity analysis.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+from factor_store import CHARACTERIZATION, FLOWS, WILDCARD, default_store
+from transport import chain_totals
+
+# --- Unit processes (one product each, in matrix order) ---
+PROCESSES = {
+    "metal": ("Metal at gate (production mix)", "t"),
+    "primary": ("Primary production (ore route)", "t"),
+    "secondary": ("Secondary production (scrap route)", "t"),
+    "ore": ("Mining & beneficiation", "t ore"),
+    "electricity": ("Grid electricity", "kWh"),
+    "heat": ("Process heat (fossil fuels)", "MJ"),
+    "transport": ("Road freight", "t·km"),
+}
+PROCESS_INDEX = {name: i for i, name in enumerate(PROCESSES)}
+
+# --- Reference study and technosphere coefficients ---
+REFERENCE_ORE_CONC = 50.0      # %
+REFERENCE_EFFICIENCY = 85.0    # %
+ORE_GRADE_EXPONENT = 0.35      # primary energy ∝ (reference grade / grade) ** exponent
+GRID_LOSS = 0.08               # kWh lost per kWh delivered
+
+PRIMARY_ELECTRICITY = 450.0    # kWh per t primary metal
+PRIMARY_HEAT = 17000.0         # MJ per t primary metal
+SECONDARY_ELECTRICITY = 600.0  # kWh per t secondary metal
+SECONDARY_HEAT = 1500.0        # MJ per t secondary metal
+MINING_ELECTRICITY = 25.0      # kWh per t ore
+MINING_HEAT = 80.0             # MJ (diesel) per t ore
+
+GRID_INTENSITY = {             # electricity burdens relative to the Indian grid average
+    "India - Grid Average": 1.0,
+    "India - Southern": 0.87,
+    "India - Western": 0.95,
+}
+
+CATEGORIES = list(CHARACTERIZATION)
+
+
+@lru_cache(maxsize=256)
+def _factor_matrices(material, region, digest):
+    store = default_store()
+    b = store.table(PROCESSES, FLOWS, material, region).T
+    c = store.table(FLOWS, CATEGORIES, material, region).T
+    matrices = (b, c, c @ b)
+    for m in matrices:
+        m.setflags(write=False)
+    return matrices
+
+
+def factor_matrices(material=WILDCARD, region=WILDCARD):
+    """
+    Biosphere (flows × processes) and characterization (categories × flows)
+    matrices from the factor store, with material / region specific factors
+    where the store has them, plus their product: impacts per unit of each
+    process. Read-only; cached per (material, region) and store contents.
+    """
+    return _factor_matrices(material, region, default_store().meta["digest"])
+
+
+ELECTRICITY = PROCESS_INDEX["electricity"]
+TRANSPORT = PROCESS_INDEX["transport"]
+
+
+def _technosphere_inputs(ore_conc, sec_material_content, proceff, transport_dist, transport_kwh=0.0):
+    """
+    Off-diagonal technosphere inputs as (product, process, amount) triples.
+    Arguments are scalars or equal-length arrays; amounts broadcast alike.
+    transport_dist is t·km per t metal, transport_kwh the grid power per t·km
+    of the leg mix (electric legs).
+    """
+    ore = np.clip(ore_conc, 1.0, 100.0)
+    sec = np.clip(sec_material_content / 100.0, 0.0, 1.0)
+    eff = REFERENCE_EFFICIENCY / np.clip(proceff, 10.0, 100.0)
+    grade = (REFERENCE_ORE_CONC / ore) ** ORE_GRADE_EXPONENT
+    return [
+        ("primary", "metal", 1.0 - sec),
+        ("secondary", "metal", sec),
+        ("transport", "metal", transport_dist),
+        ("ore", "primary", 100.0 / ore),
+        ("electricity", "primary", PRIMARY_ELECTRICITY * eff * grade),
+        ("heat", "primary", PRIMARY_HEAT * eff * grade),
+        ("electricity", "secondary", SECONDARY_ELECTRICITY * eff),
+        ("heat", "secondary", SECONDARY_HEAT * eff),
+        ("electricity", "ore", MINING_ELECTRICITY),
+        ("heat", "ore", MINING_HEAT),
+        ("electricity", "transport", transport_kwh),
+        ("electricity", "electricity", GRID_LOSS),
+    ]
+
+
+def technosphere(ore_conc, sec_material_content, proceff, transport_dist, transport_kwh=0.0):
+    """Sparse technosphere matrix A (products × processes) for one study."""
+    n = len(PROCESSES)
+    rows, cols, vals = list(range(n)), list(range(n)), [1.0] * n
+    for product, process, amount in _technosphere_inputs(ore_conc, sec_material_content, proceff,
+                                                         transport_dist, transport_kwh):
+        rows.append(PROCESS_INDEX[product])
+        cols.append(PROCESS_INDEX[process])
+        vals.append(-float(amount))
+    return csc_matrix((vals, (rows, cols)), shape=(n, n))  # duplicate entries are summed
+
+
+@lru_cache(maxsize=1024)
+def factorized(ore_conc, sec_material_content, proceff, transport_dist, transport_kwh=0.0):
+    """Cached sparse LU factorization of A; call with plain floats."""
+    return splu(technosphere(ore_conc, sec_material_content, proceff, transport_dist, transport_kwh))
+
+
+def demand(**amounts):
+    """Final demand vector f, e.g. demand(metal=1.0)."""
+    f = np.zeros(len(PROCESSES))
+    for product, amount in amounts.items():
+        f[PROCESS_INDEX[product]] = amount
+    return f
+
+
+def _params(inputs):
+    tkm, kwh, _ = chain_totals(inputs["transport_legs"])
+    return (float(inputs["ore_conc"]), float(inputs["sec_material_content"]),
+            float(inputs["proceff"]), tkm, kwh)
+
+
+def transport_tkm(inputs):
+    """Total t·km per t metal over the study's transport legs."""
+    return chain_totals(inputs["transport_legs"])[0]
+
+
+def transport_column(inputs):
+    """Biosphere column of the transport process (flows per t·km) for the study's leg mix."""
+    column = np.zeros(len(FLOWS))
+    for flow, amount in chain_totals(inputs["transport_legs"])[2].items():
+        column[list(FLOWS).index(flow)] = amount
+    return column
+
+
+def scaling_vector(inputs, f):
+    """Solve A · s = f for one normalized study (LU reused across calls)."""
+    return factorized(*_params(inputs)).solve(np.asarray(f, dtype=float))
+
+
+def characterized(s, grid_intensity=1.0, transport=None, matrices=None):
+    """
+    Impacts (CATEGORIES order) of a scaling vector, grid burdens scaled by
+    grid_intensity; transport, if given, replaces the transport biosphere column.
+    matrices is a factor_matrices() triple (default: generic factors).
+    """
+    _, c, characterized_matrix = matrices or factor_matrices()
+    per_process = characterized_matrix * s
+    per_process[:, ELECTRICITY] *= grid_intensity
+    if transport is not None:
+        per_process[:, TRANSPORT] = (c @ transport) * s[TRANSPORT]
+    return per_process.sum(axis=1)
+
+
+def _study_matrices(inputs):
+    return factor_matrices(inputs.get("material", WILDCARD), inputs.get("region", WILDCARD))
+
+
+def study_characterized_matrix(inputs):
+    """Impacts per unit of each process for the study's material / region, transport column from its leg mix."""
+    _, c, characterized_matrix = _study_matrices(inputs)
+    matrix = characterized_matrix.copy()
+    matrix[:, TRANSPORT] = c @ transport_column(inputs)
+    return matrix
+
+
+def study_impacts(inputs, f=None):
+    """Characterized impacts of demand f (default: 1 t metal at gate) as {category: value}."""
+    s = scaling_vector(inputs, demand(metal=1.0) if f is None else f)
+    h = characterized(s, GRID_INTENSITY.get(inputs["grid_elec_mix"], 1.0), transport_column(inputs),
+                      _study_matrices(inputs))
+    return dict(zip(CATEGORIES, h.tolist()))
+
+
+def life_cycle_inventory(inputs, f=None):
+    """Elementary flows g = B · s of demand f as {flow: amount}."""
+    s = scaling_vector(inputs, demand(metal=1.0) if f is None else f)
+    b = _study_matrices(inputs)[0].copy()
+    b[:, TRANSPORT] = transport_column(inputs)
+    return dict(zip(FLOWS, (b @ s).tolist()))
+
+
+def batch_impacts(ore_conc, sec_material_content, proceff, transport_dist, grid_intensity,
+                  characterized_matrix=None, transport_kwh=0.0):
+    """
+    Vectorized impacts of 1 t metal for many parameter sets at once.
+    Builds an (n, p, p) stack of dense A matrices and solves them in one
+    np.linalg.solve call; returns an (n, len(CATEGORIES)) array.
+    characterized_matrix is one (categories × processes) matrix for every
+    row (default: generic factors) or an (n, categories, processes) stack,
+    e.g. per-row material factors. transport_kwh is the grid power per t·km
+    of the leg mix (see study_characterized_matrix for its direct flows).
+    """
+    ore, sec, eff, dist, grid, kwh = (np.asarray(a, dtype=float).ravel() for a in np.broadcast_arrays(
+        ore_conc, sec_material_content, proceff, transport_dist, grid_intensity, transport_kwh))
+    n, p = ore.size, len(PROCESSES)
+    a = np.broadcast_to(np.eye(p), (n, p, p)).copy()
+    for product, process, amount in _technosphere_inputs(ore, sec, eff, dist, kwh):
+        a[:, PROCESS_INDEX[product], PROCESS_INDEX[process]] -= amount
+    s = np.linalg.solve(a, np.broadcast_to(demand(metal=1.0), (n, p))[..., None])[..., 0]
+    if characterized_matrix is None:
+        characterized_matrix = factor_matrices()[2]
+    if characterized_matrix.ndim == 2:
+        h = s @ characterized_matrix.T
+    else:
+        h = np.einsum("np,ncp->nc", s, characterized_matrix)
+    h += ((grid - 1.0) * s[:, ELECTRICITY])[:, None] * characterized_matrix[..., ELECTRICITY]
+    return h
@@ -0,0 +1,189 @@
+"""
+Background job runner for LCA simulations.
+
+Simulations run on a process-wide thread pool instead of the Streamlit
+script thread. Each session keeps its own job table in
+st.session_state["lca_jobs"]; pages submit a study, get a study id back
+immediately and poll the job on later reruns. When a job finishes its
+results are moved, once, into st.session_state["studies"] under the same
+id, and every page reads them from there; they are also saved to the
+persistent study store (study_store.py) for the Reports and Workspace pages.
+
+Each session also keeps one StudyGraph per set of run options, so a
+resubmitted form only recomputes the blocks whose inputs changed. When
+that is expected to take under INLINE_SECONDS the job is finished on the
+script thread and its results show up on the same rerun. A graph still
+busy with an earlier job counts as slow, so the new job is queued rather
+than blocking the script thread.
+
+Other long-running work (dataset ingestion) goes through submit_task and
+the same pool.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import uuid
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+import study_store
+from lca_engine import DEFAULT_SEED, StudyGraph
+from simulation_cache import cached_simulation
+
+MAX_WORKERS = int(os.environ.get("METALLIQ_JOB_WORKERS", "4"))
+POLL_INTERVAL = 0.5  # seconds between status checks while a job is running
+INLINE_SECONDS = 0.05  # incremental re-evaluations cheaper than this skip the pool
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="lca-job")
+
+
+class Job:
+    """One submitted simulation: inputs, progress and the underlying future."""
+
+    def __init__(self, job_id, inputs):
+        self.job_id = job_id
+        self.inputs = inputs
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.progress = 0.0
+        self.future = None
+
+    @property
+    def status(self):
+        if self.future is None or (not self.future.running() and not self.future.done()):
+            return "queued"
+        if not self.future.done():
+            return "running"
+        return "failed" if self.future.exception() else "done"
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    @property
+    def error(self):
+        return self.future.exception() if self.done else None
+
+    @property
+    def results(self):
+        return self.future.result() if self.status == "done" else None
+
+    def _set_progress(self, fraction):
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+
+
+def _run(job, options, graph=None):
+    try:
+        return cached_simulation(job.inputs, progress=job._set_progress, graph=graph, **options)
+    finally:
+        job.finished_at = time.time()
+
+
+def _run_task(job, fn, args, kwargs):
+    try:
+        return fn(*args, progress=job._set_progress, **kwargs)
+    finally:
+        job.finished_at = time.time()
+
+
+def jobs_table():
+    """This session's job table, keyed by job id."""
+    if "lca_jobs" not in st.session_state:
+        st.session_state["lca_jobs"] = {}
+    return st.session_state["lca_jobs"]
+
+
+def session_graph(**options):
+    """This session's StudyGraph for a set of simulate_study options."""
+    graphs = st.session_state.setdefault("study_graphs", {})
+    key = json.dumps(options, sort_keys=True, default=str)
+    if key not in graphs:
+        opts = dict(options)
+        graphs[key] = StudyGraph(opts.pop("num_runs", 1000), opts.pop("seed", DEFAULT_SEED), **opts)
+    return graphs[key]
+
+
+def submit_simulation(inputs, **options):
+    """
+    Queue a simulation and return its job (= study) id without waiting for it.
+    Cheap incremental updates are evaluated immediately instead.
+    """
+    job = Job(uuid.uuid4().hex[:12], dict(inputs))
+    graph = session_graph(**options)
+    if graph.estimated_seconds(job.inputs) < INLINE_SECONDS:
+        job.future = Future()
+        job.future.set_running_or_notify_cancel()
+        try:
+            job.future.set_result(_run(job, options, graph))
+        except Exception as e:
+            job.future.set_exception(e)
+    else:
+        job.future = _executor.submit(_run, job, options, graph)
+    jobs_table()[job.job_id] = job
+    return job.job_id
+
+
+def submit_task(fn, *args, label=None, **kwargs):
+    """
+    Run fn(*args, progress=callback, **kwargs) on the job pool, e.g. a dataset
+    ingestion. Returns a job id that get_job / job_progress track like a study.
+    """
+    job = Job(uuid.uuid4().hex[:12], {"task": label or fn.__name__})
+    job.future = _executor.submit(_run_task, job, fn, args, kwargs)
+    jobs_table()[job.job_id] = job
+    return job.job_id
+
+
+def get_job(job_id):
+    return jobs_table().get(job_id)
+
+
+def studies_table():
+    """This session's completed studies, keyed by study id."""
+    if "studies" not in st.session_state:
+        st.session_state["studies"] = {}
+    return st.session_state["studies"]
+
+
+def get_study(study_id):
+    """
+    Stored record of a finished study, or None while it is still running
+    (or failed). The first call after completion collects the job's results
+    and persists them to the study store.
+    """
+    table = studies_table()
+    if study_id in table:
+        return table[study_id]
+    job = get_job(study_id)
+    if job is None or job.status != "done":
+        return None
+    table[study_id] = {
+        "study_id": study_id,
+        "inputs": job.inputs,
+        "results": job.results,
+        "completed_at": job.finished_at,
+    }
+    st.session_state["simulation_results"] = job.results
+    del jobs_table()[study_id]
+    try:
+        study_store.save_study(study_id, job.inputs, job.results, author=st.session_state.get("username", ""))
+    except (sqlite3.Error, OSError) as e:
+        warnings.warn(f"Study {study_id} not persisted: {e}")  # the session copy still works
+    return table[study_id]
+
+
+@st.fragment(run_every=POLL_INTERVAL)
+def job_progress(job_id, label="Running LCA simulation..."):
+    """
+    Self-refreshing progress widget. Only this fragment reruns while the job
+    is in flight; once it finishes the whole page is rerun to show results.
+    """
+    job = get_job(job_id)
+    if job is None or job.done:
+        st.rerun()
+    elapsed = time.time() - job.submitted_at
+    st.progress(job.progress, text=f"{label} ({job.status}, {elapsed:.0f}s)")
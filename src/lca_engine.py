@@ -0,0 +1,834 @@
+"""
+Pure Monte Carlo LCA engine: no Streamlit or other UI imports, so worker
+processes, batch jobs and benchmarks load only NumPy and SciPy. Mean
+impacts come from the process-based inventory in inventory.py; the
+Streamlit entry point lives in lca_simulation.run_simulation.
+"""
+
+import copy
+import warnings
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from eval_graph import EvalGraph, Node
+from factor_store import GENERIC_MATERIAL, MATERIAL_BIOSPHERE, canonical_material, default_store
+from inventory import CATEGORIES, GRID_INTENSITY, batch_impacts, demand, study_impacts, transport_tkm
+from transport import normalize_legs
+
+# --- Impact categories carried through the Monte Carlo -> inventory category ---
+MONTE_CARLO_CATEGORIES = {
+    "Global Warming Potential": "Global Warming Potential",    # kg CO₂-eq
+    "Energy Demand": "Energy Demand",                          # MJ
+    "Water Consumption": "Water Consumption",                  # m³
+    "Particulate Matter": "Particulate Matter Formation",      # kg PM2.5-eq
+    "Acidification Potential": "Acidification Potential",      # kg SO₂-eq
+    "Eutrophication Demand": "Eutrophication Demand",          # kg PO4-eq
+}
+IMPACT_NAMES = list(MONTE_CARLO_CATEGORIES)
+_CATEGORY_COLUMNS = [CATEGORIES.index(c) for c in MONTE_CARLO_CATEGORIES.values()]
+
+# --- Default uncertainty range (10% of mean) ---
+UNCERTAINTY_FRACTION = 0.1
+
+# --- Study inputs read by simulate_study, with their defaults ---
+STUDY_DEFAULTS = {
+    "material": "Steel",
+    "region": "India",
+    "ore_conc": 50.0,
+    "intended_app": "Internal R&D material comparison study.",
+    "intended_audience": "Engineering & sustainability team",
+    "system_boundary": "Cradle-to-Gate",
+    "study_limitations": "Assumes industry-average data.",
+    "comparative_assertion": "No",
+    "reliability": 4,
+    "completeness": 4,
+    "temporal": 4,
+    "geographical": 4,
+    "technological": 4,
+    "sec_material_content": 10.0,
+    "proceff": 85.0,
+    "transport1_mode": "Truck",
+    "transport1_fuel": "Diesel",
+    "transport1_dist": 75.0,
+    "transport_legs": (),   # (mode, fuel, distance_km, payload_t) legs; see transport.normalize_legs
+    "grid_elec_mix": "India - Grid Average",
+}
+
+DEFAULT_SEED = 42
+
+# --- Percentiles reported for every impact (CI lower, median, CI upper) ---
+PERCENTILES = (2.5, 50.0, 97.5)
+
+
+def normalize_inputs(inputs):
+    """
+    Keep only the fields simulate_study reads, fill defaults and coerce each
+    value to its default's type, so equal studies compare (and hash) equal.
+    """
+    params = {}
+    for key, default in STUDY_DEFAULTS.items():
+        value = inputs.get(key, default)
+        if value is None:
+            value = default
+        if key == "transport_legs":
+            value = normalize_legs(value)
+        elif key == "material":
+            value = canonical_material(value)
+        elif isinstance(default, str):
+            value = str(value).strip()
+        else:
+            value = type(default)(value)
+        params[key] = value
+    if not params["transport_legs"]:
+        # no leg list: the single transport1_* stage from the original form
+        params["transport_legs"] = normalize_legs(
+            [(params["transport1_mode"], params["transport1_fuel"], params["transport1_dist"], 1.0)])
+    return params
+
+
+# --- Mean impacts per ton from the process inventory (A · s = f, h = C · B · s) ---
+def impact_model(ore_conc, sec_material_content, proceff, transport_dist, grid_intensity,
+                 characterized_matrix=None, transport_kwh=0.0):
+    """
+    Vectorized mean impacts per ton. Arguments are scalars or equal-length
+    1-D arrays; returns an (n, n_impacts) array in IMPACT_NAMES order.
+    characterized_matrix and transport_kwh as in inventory.batch_impacts.
+    """
+    return batch_impacts(ore_conc, sec_material_content, proceff, transport_dist,
+                         grid_intensity, characterized_matrix, transport_kwh)[:, _CATEGORY_COLUMNS]
+
+
+def study_means(inputs):
+    """Mean impacts (IMPACT_NAMES order) for one normalized study."""
+    impacts = study_impacts(inputs)
+    return np.array([impacts[c] for c in MONTE_CARLO_CATEGORIES.values()])
+
+
+# --- Primary vs. recycled route rows: (label, category, display divisor) ---
+ROUTE_METRICS = [
+    ("GWP (kg CO₂-eq)", "Global Warming Potential", 1.0),
+    ("Energy (GJ)", "Energy Demand", 1000.0),
+    ("Water (m³)", "Water Consumption", 1.0),
+    ("Acidification (kg SO₂-eq)", "Acidification Potential", 1.0),
+    ("Eutrophication (kg PO₄-eq)", "Eutrophication Demand", 1.0),
+]
+
+
+def route_comparison(inputs):
+    """1 t metal via the primary vs. the secondary route, same transport; reuses the study's LU factors."""
+    primary = study_impacts(inputs, demand(primary=1.0, transport=transport_tkm(inputs)))
+    recycled = study_impacts(inputs, demand(secondary=1.0, transport=transport_tkm(inputs)))
+    return [
+        {"Metric": label, "Primary": round(primary[cat] / div, 2), "Recycled": round(recycled[cat] / div, 2)}
+        for label, cat, div in ROUTE_METRICS
+    ]
+
+
+# --- Correlation between impact categories (IMPACT_NAMES order) ---
+# Pairwise correlations of the default study; anything not listed is 0.
+DEFAULT_CORRELATIONS = {
+    ("Global Warming Potential", "Energy Demand"): 0.90,
+    ("Global Warming Potential", "Water Consumption"): 0.20,
+    ("Global Warming Potential", "Particulate Matter"): 0.50,
+    ("Global Warming Potential", "Acidification Potential"): 0.60,
+    ("Global Warming Potential", "Eutrophication Demand"): 0.25,
+    ("Energy Demand", "Water Consumption"): 0.20,
+    ("Energy Demand", "Particulate Matter"): 0.45,
+    ("Energy Demand", "Acidification Potential"): 0.55,
+    ("Energy Demand", "Eutrophication Demand"): 0.20,
+    ("Water Consumption", "Particulate Matter"): 0.10,
+    ("Water Consumption", "Acidification Potential"): 0.15,
+    ("Water Consumption", "Eutrophication Demand"): 0.40,
+    ("Particulate Matter", "Acidification Potential"): 0.60,
+    ("Particulate Matter", "Eutrophication Demand"): 0.20,
+    ("Acidification Potential", "Eutrophication Demand"): 0.30,
+}
+# (material, region) -> pairs that differ from the default; region None matches any region.
+# Materials use the factor_store.MATERIALS spelling.
+CORRELATION_OVERRIDES = {
+    ("Aluminium", None): {  # smelting is electricity-bound: GWP follows energy almost exactly
+        ("Global Warming Potential", "Energy Demand"): 0.95,
+        ("Energy Demand", "Acidification Potential"): 0.65,
+    },
+    ("Copper", None): {    # sulfide smelting: SO₂ drives acidification and particulates together
+        ("Global Warming Potential", "Acidification Potential"): 0.40,
+        ("Particulate Matter", "Acidification Potential"): 0.75,
+    },
+    ("Steel", "India"): {  # coal-based BF-BOF route and a coal-heavy grid
+        ("Global Warming Potential", "Energy Demand"): 0.92,
+        ("Global Warming Potential", "Particulate Matter"): 0.60,
+    },
+}
+# an override for a material the factor store has no factors for would never be used
+_unfactored = sorted({m for m, _ in CORRELATION_OVERRIDES} - {GENERIC_MATERIAL, *MATERIAL_BIOSPHERE})
+if _unfactored:
+    raise ValueError(f"Correlation overrides for materials without factors: {_unfactored}")
+
+
+def _correlation_from_pairs(pairs):
+    index = {name: i for i, name in enumerate(IMPACT_NAMES)}
+    corr = np.eye(len(IMPACT_NAMES))
+    for (a, b), rho in pairs.items():
+        corr[index[a], index[b]] = corr[index[b], index[a]] = rho
+    return corr
+
+
+def correlation_matrix(material, region):
+    """Impact correlation matrix for a material/region, most specific match first."""
+    material = canonical_material(material)
+    pairs = dict(DEFAULT_CORRELATIONS)
+    pairs.update(CORRELATION_OVERRIDES.get((material, None), {}))
+    pairs.update(CORRELATION_OVERRIDES.get((material, region), {}))
+    return _correlation_from_pairs(pairs)
+
+
+@lru_cache(maxsize=256)
+def cholesky_factor(material, region):
+    """
+    Lower-triangular L with L @ L.T == correlation_matrix(material, region).
+    Cached per process and returned read-only, since every run shares it.
+    """
+    factor = np.linalg.cholesky(correlation_matrix(material, region))
+    factor.setflags(write=False)
+    return factor
+
+
+def register_correlation(material, region, matrix):
+    """
+    Supply a full correlation matrix (IMPACT_NAMES order) for a material and
+    region (None = every region). Raises ValueError unless it is a valid
+    correlation matrix for a material the factor store has factors for.
+    """
+    material = canonical_material(material)
+    if not default_store().has_material(material):
+        raise ValueError(f"No factors for material {material!r} in the factor store")
+    corr = np.asarray(matrix, dtype=float)
+    n = len(IMPACT_NAMES)
+    if corr.shape != (n, n) or not np.allclose(corr, corr.T) or not np.allclose(np.diag(corr), 1.0):
+        raise ValueError(f"Correlation matrix must be symmetric {n}x{n} with a unit diagonal")
+    try:
+        np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlation matrix is not positive definite") from None
+    CORRELATION_OVERRIDES[(material, region)] = {
+        (IMPACT_NAMES[i], IMPACT_NAMES[j]): float(corr[i, j]) for i in range(n) for j in range(i + 1, n)
+    }
+    cholesky_factor.cache_clear()
+
+
+# --- Sampling strategies for the standard-normal draws ---
+SAMPLING_METHODS = ("random", "lhs", "sobol", "antithetic")
+DEFAULT_SAMPLING = "random"
+
+
+def standard_normal(rng, shape, sampling=DEFAULT_SAMPLING):
+    """
+    (n, d) standard-normal draws. "random" is plain pseudo-random sampling;
+    "lhs" stratifies every column into n equal-probability strata; "sobol"
+    maps a scrambled Sobol set through the inverse normal CDF; "antithetic"
+    pairs each draw z with -z. Each call is an independent randomization,
+    so chunks of a streamed run can be combined like plain Monte Carlo.
+    """
+    n, d = shape
+    if sampling == "random":
+        return rng.standard_normal(shape)
+    if sampling == "antithetic":
+        half = rng.standard_normal(((n + 1) // 2, d))
+        return np.vstack([half, -half])[:n]
+    from scipy.special import ndtri  # lazy: only the stratified / QMC modes need SciPy
+    if sampling == "lhs":
+        u = (rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T + rng.random(shape)) / n
+    elif sampling == "sobol":
+        from scipy.stats import qmc
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # balance warning when n is not a power of two
+            u = qmc.Sobol(d=d, scramble=True, seed=rng).random(n)
+        u = np.clip(u, 0.5 / n, 1.0 - 0.5 / n)  # keep ndtri finite
+    else:
+        raise ValueError(f"Unknown sampling method {sampling!r}; expected one of {SAMPLING_METHODS}")
+    return ndtri(u)
+
+
+def draw_samples(rng, means, scales, num_runs, sampling=DEFAULT_SAMPLING, factor=None):
+    """
+    Draw every impact category in one go as a (num_runs, n_impacts) array.
+    With a Cholesky factor the draws are correlated by a single z @ L.T;
+    scaling is then done in place.
+    """
+    samples = standard_normal(rng, (num_runs, means.size), sampling)
+    if factor is not None:
+        samples = samples @ factor.T
+    samples *= scales
+    samples += means
+    return samples
+
+
+# --- Stored uncertainty samples: fixed-size, typed preview ---
+PREVIEW_SIZE = 1000
+SAMPLE_DTYPE = np.float32
+
+# --- Precomputed histogram resolution for the Uncertainty Dashboard ---
+HIST_BINS = 30
+
+# --- Chunked (streaming) mode for very large run counts ---
+MAX_IN_MEMORY_RUNS = 1_000_000   # above this, simulate_study switches to chunks
+DEFAULT_CHUNK_SIZE = 65_536
+SKETCH_BINS = 4096               # histogram resolution of the quantile sketch
+SKETCH_SIGMAS = 8.0              # sketch range: mean ± SKETCH_SIGMAS * |scale|
+SKETCH_MIN_SCALE = 1e-9          # scale floor, relative to max(|mean|, 1), so the range never collapses
+
+# --- Convergence monitor: stop once every 95% CI width is stable ---
+CONVERGENCE_CHUNK_SIZE = 4096    # runs between convergence checks
+CONVERGENCE_PATIENCE = 2         # consecutive stable checks required to stop
+
+
+class RunningMoments:
+    """
+    Running mean / variance per impact column (Welford, combined block-wise
+    with Chan's update so whole chunks are folded in at once).
+    """
+
+    def __init__(self, n_impacts):
+        self.count = 0
+        self.mean = np.zeros(n_impacts)
+        self.m2 = np.zeros(n_impacts)
+
+    def update(self, block):
+        n = block.shape[0]
+        if n == 0:
+            return
+        block_mean = block.mean(axis=0)
+        block_m2 = ((block - block_mean) ** 2).sum(axis=0)
+        self._combine(n, block_mean, block_m2)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, n, mean, m2):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def std_dev(self):
+        # population std, same as np.std(samples)
+        return np.sqrt(self.m2 / max(self.count, 1))
+
+
+class QuantileSketch:
+    """
+    Fixed-range histogram sketch per impact column.
+    Constant memory, mergeable, and accurate to a fraction of a bin width.
+    """
+
+    def __init__(self, lo, hi, bins=SKETCH_BINS):
+        self.lo = np.asarray(lo, dtype=float)
+        self.bins = bins
+        self.width = (np.asarray(hi, dtype=float) - self.lo) / bins
+        self.counts = np.zeros((self.lo.size, bins), dtype=np.int64)
+
+    @classmethod
+    def for_normal(cls, means, scales, bins=SKETCH_BINS):
+        """
+        Sketch over mean ± SKETCH_SIGMAS * |scale|. Zero or negative means
+        (e.g. net recycling credits) give zero or negative scales, so the
+        half-width uses |scale| with a floor and lo < hi always holds.
+        """
+        means = np.asarray(means, dtype=float)
+        floor = SKETCH_MIN_SCALE * np.maximum(np.abs(means), 1.0)
+        half = SKETCH_SIGMAS * np.maximum(np.abs(np.asarray(scales, dtype=float)), floor)
+        return cls(means - half, means + half, bins)
+
+    def update(self, block):
+        idx = ((block - self.lo) / self.width).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        idx += np.arange(self.lo.size) * self.bins
+        self.counts += np.bincount(idx.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def quantiles(self, percentiles):
+        """Return a (len(percentiles), n_impacts) array, interpolated inside bins."""
+        cdf = np.cumsum(self.counts, axis=1)
+        out = np.empty((len(percentiles), self.lo.size))
+        for j in range(self.lo.size):
+            targets = np.asarray(percentiles, dtype=float) / 100.0 * cdf[j, -1]
+            k = np.minimum(np.searchsorted(cdf[j], targets, side="left"), self.bins - 1)
+            below = np.where(k > 0, cdf[j, k - 1], 0)
+            in_bin = np.maximum(self.counts[j, k], 1)
+            frac = np.clip((targets - below) / in_bin, 0.0, 1.0)
+            out[:, j] = self.lo[j] + (k + frac) * self.width[j]
+        return out
+
+    def histograms(self, bins=HIST_BINS):
+        """Re-bin the sketch into `bins` display bins over each column's occupied range."""
+        out = []
+        for j in range(self.lo.size):
+            occupied = np.flatnonzero(self.counts[j])
+            if occupied.size == 0:
+                out.append((np.zeros(bins + 1), np.zeros(bins, dtype=np.int64)))
+                continue
+            first, last = occupied[0], occupied[-1] + 1
+            lo = self.lo[j] + first * self.width[j]
+            hi = self.lo[j] + last * self.width[j]
+            centers = self.lo[j] + (np.arange(first, last) + 0.5) * self.width[j]
+            idx = np.minimum(((centers - lo) / (hi - lo) * bins).astype(np.int64), bins - 1)
+            counts = np.bincount(idx, weights=self.counts[j, first:last], minlength=bins)
+            out.append((np.linspace(lo, hi, bins + 1), counts.astype(np.int64)))
+        return out
+
+
+def histogram_summary(values, bins=HIST_BINS):
+    """Bin edges, counts, mean and 95% CI of one sample array, ready to chart."""
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return {"edges": np.zeros(bins + 1), "counts": np.zeros(bins, dtype=np.int64),
+                "mean": 0.0, "ci_95_lower": 0.0, "ci_95_upper": 0.0}
+    counts, edges = np.histogram(values, bins=bins)
+    lower, upper = np.percentile(values, [2.5, 97.5])
+    return {"edges": edges, "counts": counts, "mean": float(values.mean()),
+            "ci_95_lower": float(lower), "ci_95_upper": float(upper)}
+
+
+def chart_summary(impact_summary):
+    """Histogram plus mean/CI of one impact, as stored in results['uncertainty_summary']."""
+    return {
+        "edges": impact_summary["histogram"][0],
+        "counts": impact_summary["histogram"][1],
+        "mean": impact_summary["mean"],
+        "ci_95_lower": impact_summary["ci_95_lower"],
+        "ci_95_upper": impact_summary["ci_95_upper"],
+    }
+
+
+def _summary_dict(names, mean, median, std_dev, lower, upper, preview, histograms):
+    # one contiguous float32 row per impact; summaries hold views into it
+    columns = np.ascontiguousarray(preview.T, dtype=SAMPLE_DTYPE)
+    summary = {}
+    for j, impact in enumerate(names):
+        summary[impact] = {
+            "mean": float(mean[j]),
+            "median": float(median[j]),
+            "std_dev": float(std_dev[j]),
+            "ci_95_lower": float(lower[j]),
+            "ci_95_upper": float(upper[j]),
+            "samples": columns[j],  # fixed-size float32 preview for Streamlit charts
+            "histogram": histograms[j],  # (edges, counts) over every run
+        }
+    return summary
+
+
+def summarize_samples(samples, names, preview_size=PREVIEW_SIZE):
+    """
+    Axis-wise reductions over a (num_runs, n_impacts) sample matrix.
+    Returns the per-impact summary dict consumed by simulate_study.
+    """
+    mean = samples.mean(axis=0)
+    std_dev = samples.std(axis=0)
+    lower, median, upper = np.percentile(samples, PERCENTILES, axis=0)
+    histograms = [np.histogram(samples[:, j], bins=HIST_BINS)[::-1] for j in range(samples.shape[1])]
+    return _summary_dict(names, mean, median, std_dev, lower, upper, samples[:preview_size], histograms)
+
+
+def ci_width(sketch):
+    """Width of the 95% CI of every impact column in a quantile sketch."""
+    lower, upper = sketch.quantiles((PERCENTILES[0], PERCENTILES[-1]))
+    return upper - lower
+
+
+def simulate_chunked(rng, means, scales, num_runs, chunk_size=DEFAULT_CHUNK_SIZE, preview_size=PREVIEW_SIZE,
+                     progress=None, sampling=DEFAULT_SAMPLING, tolerance=None, factor=None):
+    """
+    Generate samples block by block, folding each block into running moments
+    and a quantile sketch. Only the first preview_size rows are retained.
+    With a tolerance, num_runs becomes a budget: sampling stops early once
+    every impact's 95% CI width has changed by less than tolerance (relative)
+    for CONVERGENCE_PATIENCE consecutive blocks.
+    """
+    moments = RunningMoments(means.size)
+    sketch = QuantileSketch.for_normal(means, scales)
+    preview = np.empty((0, means.size))
+    remaining = num_runs
+    previous, stable = None, 0
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        block = draw_samples(rng, means, scales, n, sampling, factor)
+        moments.update(block)
+        sketch.update(block)
+        if preview.shape[0] < preview_size:
+            preview = np.vstack([preview, block[:preview_size - preview.shape[0]]])
+        remaining -= n
+        if progress:
+            progress(1.0 - remaining / num_runs)
+        if tolerance:
+            width = ci_width(sketch)
+            if previous is not None and np.all(np.abs(width - previous) <= tolerance * np.abs(width)):
+                stable += 1
+                if stable >= CONVERGENCE_PATIENCE:
+                    if progress:
+                        progress(1.0)
+                    break
+            else:
+                stable = 0
+            previous = width
+    return moments, sketch, preview
+
+
+def _simulate_partition(args):
+    """Process-pool entry point: one worker's share of the runs."""
+    seed_seq, means, scales, num_runs, chunk_size, preview_size, sampling, tolerance, factor = args
+    rng = np.random.default_rng(seed_seq)
+    return simulate_chunked(rng, means, scales, num_runs, chunk_size, preview_size,
+                            sampling=sampling, tolerance=tolerance, factor=factor)
+
+
+def simulate_parallel(means, scales, num_runs, workers, seed=None,
+                      chunk_size=DEFAULT_CHUNK_SIZE, preview_size=PREVIEW_SIZE, progress=None,
+                      sampling=DEFAULT_SAMPLING, tolerance=None, factor=None):
+    """
+    Split num_runs across a process pool. Each worker gets its own stream from
+    SeedSequence(seed).spawn(workers) and partials are merged in worker order,
+    so results are bit-reproducible for a given seed and worker count.
+    With a tolerance each worker stops on its own share once converged.
+    """
+    children = np.random.SeedSequence(seed).spawn(workers)
+    shares = [num_runs // workers + (1 if i < num_runs % workers else 0) for i in range(workers)]
+    jobs = [(children[i], means, scales, shares[i], chunk_size, preview_size, sampling, tolerance, factor)
+            for i in range(workers)]
+    parts = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_simulate_partition, jobs):
+            parts.append(part)
+            if progress:
+                progress(len(parts) / workers)
+
+    moments = RunningMoments(means.size)
+    sketch = QuantileSketch.for_normal(means, scales)
+    for part_moments, part_sketch, _ in parts:
+        moments.merge(part_moments)
+        sketch.merge(part_sketch)
+    preview = np.vstack([p for _, _, p in parts])[:preview_size]
+    return moments, sketch, preview
+
+
+def summarize_streaming(moments, sketch, preview, names):
+    lower, median, upper = sketch.quantiles(PERCENTILES)
+    return _summary_dict(names, moments.mean, median, moments.std_dev, lower, upper, preview,
+                         sketch.histograms())
+
+
+# --- Study evaluation graph: each block declares the input fields it reads ---
+STUDY_BLOCKS = []
+
+
+def study_block(name, fields=(), deps=()):
+    """Register a derived results block as a node of the study graph."""
+    def register(fn):
+        STUDY_BLOCKS.append(Node(name, fn, fields, deps))
+        return fn
+    return register
+
+
+class StudyContext:
+    """Run options shared by every block of one StudyGraph."""
+
+    def __init__(self, num_runs=1000, seed=None, chunk_size=None, workers=None, sensitivity=None,
+                 sampling=DEFAULT_SAMPLING, tolerance=None, correlated=True):
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method {sampling!r}; expected one of {SAMPLING_METHODS}")
+        self.num_runs = num_runs
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.sensitivity = sensitivity
+        self.sampling = sampling
+        self.tolerance = tolerance
+        self.correlated = correlated
+        self.progress = None
+
+    def rng(self, block):
+        """Independent stream per block, so recomputing one block never shifts another's draws."""
+        if self.seed is None:
+            return np.random.default_rng()
+        return np.random.default_rng([self.seed, zlib.crc32(block.encode("utf-8"))])
+
+
+@study_block("goal_scope", fields=("intended_app", "intended_audience", "system_boundary",
+                                   "study_limitations", "comparative_assertion"))
+def _goal_scope(inputs, ctx):
+    # ISO 14044 goal & scope
+    return {
+        "Intended Application": inputs["intended_app"],
+        "Intended Audience": inputs["intended_audience"],
+        "System Boundary": inputs["system_boundary"],
+        "Study Limitations": inputs["study_limitations"],
+        "Comparative Assertion": inputs["comparative_assertion"],
+    }
+
+
+@study_block("data_quality", fields=("reliability", "completeness", "temporal", "geographical", "technological"))
+def _data_quality(inputs, ctx):
+    # Pedigree matrix
+    return {
+        "Reliability": f"{inputs['reliability']}/5",
+        "Completeness": f"{inputs['completeness']}/5",
+        "Temporal": f"{inputs['temporal']}/5",
+        "Geographical": f"{inputs['geographical']}/5",
+        "Technological": f"{inputs['technological']}/5",
+        "Aggregated ADQI": 4.0,
+        "Result Uncertainty pct": 14,
+    }
+
+
+@study_block("circularity")
+def _circularity(inputs, ctx):
+    # mock indicators
+    rng = ctx.rng("circularity")
+    return {
+        "Circularity Rate": round(float(rng.uniform(55, 70)), 2),
+        "Recyclability Rate": round(float(rng.uniform(75, 90)), 2),
+        "Recovery Efficiency": round(float(rng.uniform(80, 90)), 2),
+        "Secondary Material Content": round(float(rng.uniform(40, 60)), 2),
+        "Resource Efficiency": round(float(rng.uniform(80, 95)), 2),
+        "Extended Product Life": int(rng.integers(10, 21)),
+        "Reuse Potential": round(float(rng.uniform(35, 55)), 2),
+        "Material Recovery": round(float(rng.uniform(85, 95)), 2),
+        "Closed-loop Potential": round(float(rng.uniform(70, 85)), 2),
+        "Recycling Content": round(float(rng.uniform(40, 55)), 2),
+        "Landfill Rate": round(float(rng.uniform(5, 15)), 2),
+        "Energy Recovery": round(float(rng.uniform(1, 5)), 2),
+    }
+
+
+@study_block("impacts", fields=("material", "region", "ore_conc", "sec_material_content", "proceff", "transport_legs",
+                                "grid_elec_mix"))
+def _impacts(inputs, ctx):
+    # characterized process inventory (deterministic means)
+    return {
+        "categories": study_impacts(inputs),
+        "means": study_means(inputs),
+        "primary_vs_recycled": route_comparison(inputs),
+        "transport": study_impacts(inputs, demand(transport=transport_tkm(inputs))),
+        # no factors of the material's own: the means are the generic (steel) ones
+        "generic_factors": not default_store().has_material(inputs["material"]),
+    }
+
+
+@study_block("uncertainty", fields=("material", "region"), deps=("impacts",))
+def _uncertainty(inputs, ctx, impacts):
+    # Monte Carlo around the inventory means
+    means = impacts["means"]
+    scales = means * UNCERTAINTY_FRACTION
+    factor = cholesky_factor(inputs["material"], inputs["region"]) if ctx.correlated else None
+    num_runs, chunk_size, progress = ctx.num_runs, ctx.chunk_size, ctx.progress
+    if chunk_size is None and ctx.tolerance:
+        chunk_size = CONVERGENCE_CHUNK_SIZE
+    if chunk_size is None and num_runs > MAX_IN_MEMORY_RUNS:
+        chunk_size = DEFAULT_CHUNK_SIZE
+    runs_used = num_runs
+    if ctx.workers and ctx.workers > 1:
+        moments, sketch, preview = simulate_parallel(
+            means, scales, num_runs, ctx.workers, ctx.seed, chunk_size or DEFAULT_CHUNK_SIZE, progress=progress,
+            sampling=ctx.sampling, tolerance=ctx.tolerance, factor=factor)
+        summary = summarize_streaming(moments, sketch, preview, IMPACT_NAMES)
+        runs_used = moments.count
+    elif chunk_size:
+        moments, sketch, preview = simulate_chunked(
+            ctx.rng("uncertainty"), means, scales, num_runs, chunk_size, progress=progress,
+            sampling=ctx.sampling, tolerance=ctx.tolerance, factor=factor)
+        summary = summarize_streaming(moments, sketch, preview, IMPACT_NAMES)
+        runs_used = moments.count
+    else:
+        samples = draw_samples(ctx.rng("uncertainty"), means, scales, num_runs, ctx.sampling, factor)
+        summary = summarize_samples(samples, IMPACT_NAMES)
+        del samples
+        if progress:
+            progress(1.0)
+    return {
+        "summary": summary,
+        "num_runs": runs_used,
+        "sampling": {"method": ctx.sampling, "tolerance": ctx.tolerance, "run_budget": num_runs,
+                     "converged": bool(ctx.tolerance) and runs_used < num_runs, "correlated": bool(ctx.correlated)},
+    }
+
+
+@study_block("executive_summary", deps=("uncertainty",))
+def _executive_summary(inputs, ctx, uncertainty):
+    # mock representative metrics
+    summary = uncertainty["summary"]
+    return {
+        "Global Warming Potential": round(summary["Global Warming Potential"]["mean"], 2),
+        "Circularity Score": int(ctx.rng("executive_summary").integers(45, 71)),
+        "Particulate Matter": round(summary["Particulate Matter"]["mean"], 3),
+        "Water Consumption": round(summary["Water Consumption"]["mean"], 2),
+        "Overall Energy Demand": round(summary["Energy Demand"]["mean"], 2),
+    }
+
+
+@study_block("gwp_contribution", deps=("executive_summary", "impacts"))
+def _gwp_contribution(inputs, ctx, executive_summary, impacts):
+    # transport legs incl. grid power for electric legs; production is the rest (cradle-to-gate)
+    gwp = executive_summary["Global Warming Potential"]
+    transport = impacts["transport"]["Global Warming Potential"]
+    return {
+        "Production": round(gwp - transport, 2),
+        "Transport": round(transport, 2),
+    }
+
+
+@study_block("energy_breakdown")
+def _energy_breakdown(inputs, ctx):
+    return {
+        "Direct Fuel": 25000,
+        "Grid Electricity": 1450,
+        "Renewables": 1200,
+    }
+
+
+@study_block("interpretation", fields=("material", "region", "ore_conc"))
+def _interpretation(inputs, ctx):
+    return (
+        f"The {inputs['material']} lifecycle in {inputs['region']} shows that most environmental impact "
+        f"occurs during the production and ore processing phases. With an ore concentration of "
+        f"{inputs['ore_conc']}%, refining is the dominant contributor to GWP and energy demand. "
+        "Increasing recycled content and integrating renewable energy can reduce the total GWP by 50–60%. "
+        "Further improvements are possible through higher recovery efficiency and material reuse."
+    )
+
+
+@study_block("sensitivity", fields=("material", "region", "ore_conc", "sec_material_content", "proceff",
+                                   "transport_legs"))
+def _sensitivity(inputs, ctx):
+    # Sobol indices around this study's inputs, with its material / region factors
+    if not ctx.sensitivity:
+        return None
+    from sensitivity import sobol_indices  # lazy: it imports this module and SciPy
+    return sobol_indices(inputs, n_base=ctx.sensitivity, seed=ctx.seed, workers=ctx.workers)
+
+
+def assemble_results(inputs, blocks):
+    """The results dict read by results_page, from up-to-date block values."""
+    summary = blocks["uncertainty"]["summary"]
+
+    # impact assessment: characterized inventory, Monte Carlo means where sampled
+    impacts = dict(blocks["impacts"]["categories"])
+    for name, category in MONTE_CARLO_CATEGORIES.items():
+        impacts[category] = summary[name]["mean"]
+
+    results = {
+        "goal_scope": blocks["goal_scope"],
+        "executive_summary": blocks["executive_summary"],
+        "data_quality": blocks["data_quality"],
+        "circularity": blocks["circularity"],
+        "impacts": impacts,
+        "primary_vs_recycled": blocks["impacts"]["primary_vs_recycled"],
+        "ai_lifecycle_interpretation": blocks["interpretation"],
+        "uncertainty_dashboard": {
+            "GWP Uncertainty": summary["Global Warming Potential"]["samples"],
+            "Energy Uncertainty": summary["Energy Demand"]["samples"],
+            "Water Uncertainty": summary["Water Consumption"]["samples"],
+        },
+        # precomputed histograms + CI for the dashboard charts
+        "uncertainty_summary": {
+            "GWP": chart_summary(summary["Global Warming Potential"]),
+            "Energy": chart_summary(summary["Energy Demand"]),
+            "Water": chart_summary(summary["Water Consumption"]),
+        },
+        # full Monte Carlo statistics per impact (batch exports, reports)
+        "impact_statistics": {
+            impact: {k: v for k, v in stats.items() if k not in ("samples", "histogram")}
+            for impact, stats in summary.items()
+        },
+        "num_runs": blocks["uncertainty"]["num_runs"],
+        "sampling": blocks["uncertainty"]["sampling"],
+        "gwp_contribution_analysis": blocks["gwp_contribution"],
+        "energy_source_breakdown": blocks["energy_breakdown"],
+        "material": inputs["material"],
+        "generic_factors": blocks["impacts"]["generic_factors"],
+        "region": inputs["region"],
+        "ore_conc": inputs["ore_conc"],
+    }
+    if blocks["sensitivity"] is not None:
+        results["sensitivity"] = blocks["sensitivity"]
+    return results
+
+
+class StudyGraph:
+    """
+    A study that re-evaluates incrementally: after a form edit only the
+    blocks reading the changed fields (and their dependents) are recomputed.
+    One instance per set of run options; see simulate_study for the options.
+    """
+
+    def __init__(self, num_runs=1000, seed=None, **options):
+        self.ctx = StudyContext(num_runs, seed, **options)
+        self.graph = EvalGraph(STUDY_BLOCKS)
+
+    def stale(self, inputs, blocking=True):
+        """Blocks a call to evaluate(inputs) would recompute (None if busy and not blocking)."""
+        return self.graph.stale(normalize_inputs(inputs), blocking)
+
+    def estimated_seconds(self, inputs):
+        """
+        Expected cost of evaluate(inputs) from the stale blocks' last timings:
+        inf if a block never ran, or if another evaluation holds the graph.
+        Never waits for that evaluation to finish.
+        """
+        stale = self.stale(inputs, blocking=False)
+        if stale is None:
+            return float("inf")
+        return sum(self.graph.timings.get(name, float("inf")) for name in stale)
+
+    def evaluate(self, inputs, progress=None):
+        inputs = normalize_inputs(inputs)
+        # per-call context, so concurrent evaluations never share a progress callback
+        ctx = copy.copy(self.ctx)
+        ctx.progress = progress
+        blocks = self.graph.evaluate(inputs, ctx)
+        if progress:
+            progress(1.0)
+        return assemble_results(inputs, blocks)
+
+
+def simulate_study(inputs, num_runs=1000, seed=None, chunk_size=None, workers=None, progress=None,
+                   sensitivity=None, sampling=DEFAULT_SAMPLING, tolerance=None, correlated=True):
+    """
+    Mock Monte Carlo LCA simulation fully compatible with results_page.py.
+    Returns a structured 'results' dict with all expected keys and sample data.
+    Pass a seed to make the run reproducible. With chunk_size set (or when
+    num_runs exceeds MAX_IN_MEMORY_RUNS) samples are streamed in blocks and
+    memory use no longer grows with num_runs. workers > 1 spreads the runs
+    over a process pool; the returned dict has the same shape in every mode.
+    progress, if given, is called with the completed fraction (0..1).
+    sensitivity=N adds Sobol indices from N base samples (see sensitivity.py).
+    sampling picks one of SAMPLING_METHODS. With a tolerance (e.g. 0.005)
+    num_runs is a budget and the run stops once the 95% CI widths are
+    stable; results["num_runs"] is then the number of runs actually used.
+    Impacts are sampled jointly with the material/region correlation matrix
+    (see correlation_matrix) unless correlated=False.
+    One-shot evaluation of a fresh StudyGraph, so it matches an incremental
+    re-evaluation with the same options exactly.
+    Pure compute: no Streamlit calls, safe to run off the script thread.
+    """
+    graph = StudyGraph(num_runs, seed, chunk_size=chunk_size, workers=workers, sensitivity=sensitivity,
+                       sampling=sampling, tolerance=tolerance, correlated=correlated)
+    return graph.evaluate(inputs, progress)
+
+
+if __name__ == "__main__":
+    # Standalone benchmark: python lca_engine.py [num_runs] [workers]
+    import sys
+    import time
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = time.perf_counter()
+    simulate_study({}, num_runs=runs, seed=DEFAULT_SEED, workers=workers)
+    print(f"{runs:,} runs in {time.perf_counter() - start:.3f}s")
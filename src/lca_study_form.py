@@ -1,15 +1,23 @@
 import streamlit as st
-import time
+import pandas as pd
 import traceback
-from lca_simulation import run_simulation
+from job_runner import submit_simulation, get_job, get_study, job_progress
+from sensitivity import DEFAULT_BASE_SAMPLES as SENSITIVITY_SAMPLES
+from factor_store import MATERIALS, ORE_AUTOFILLS
+from lca_engine import DEFAULT_SAMPLING, SAMPLING_METHODS
+from transport import MODES as TRANSPORT_MODES, FUELS as TRANSPORT_FUELS
 from results_page import results_page
 
 
 # ------------------------------- CONSTANTS -------------------------------
-MATERIALS = [
-    "Steel", "Stainless Steel", "Aluminum", "Copper", "Zinc", "Lead",
-    "Chromium", "Nickel", "Magnesium", "Tin", "Titanium"
-]
+SAMPLING_LABELS = {
+    "random": "Monte Carlo (pseudo-random)",
+    "lhs": "Latin Hypercube",
+    "sobol": "Quasi-Monte Carlo (scrambled Sobol)",
+    "antithetic": "Antithetic variates",
+}
+MAX_RUNS = 200_000          # run budget when stopping at convergence
+CONVERGENCE_TOLERANCE = 0.005  # relative change in 95% CI width
 
 CATEGORY_APPS = [
     "Construction", "Automotive", "Aerospace", "Electrical & Electronics",
@@ -22,27 +30,6 @@ INDIA_REGIONS = [
     "Karnataka", "West Bengal", "Andhra Pradesh", "Rajasthan", "Punjab", "Uttar Pradesh", "Telangana"
 ]
 
-ORE_AUTOFILLS = {
-    "Odisha": {"concentration": 55, "type": "Hematite"},
-    "Maharashtra": {"concentration": 46, "type": "Magnetite"},
-    "Jharkhand": {"concentration": 60, "type": "Hematite"},
-    "Chhattisgarh": {"concentration": 62, "type": "Hematite"},
-    "Gujarat": {"concentration": 50, "type": "Magnetite"},
-    "Tamil Nadu": {"concentration": 48, "type": "Hematite"},
-    "Karnataka": {"concentration": 52, "type": "Magnetite"},
-    "West Bengal": {"concentration": 54, "type": "Goethite"},
-    "Andhra Pradesh": {"concentration": 49, "type": "Hematite"},
-    "Rajasthan": {"concentration": 45, "type": "Magnetite"},
-    "Punjab": {"concentration": 47, "type": "Hematite"},
-    "Uttar Pradesh": {"concentration": 44, "type": "Goethite"},
-    "Telangana": {"concentration": 53, "type": "Hematite"},
-    "North India": {"concentration": 41, "type": "Magnetite"},
-    "South India": {"concentration": 50, "type": "Hematite"},
-    "East India": {"concentration": 55, "type": "Hematite"},
-    "West India": {"concentration": 47, "type": "Magnetite"},
-    "Central India": {"concentration": 53, "type": "Hematite"},
-    "North-East India": {"concentration": 40, "type": "Goethite"},
-}
 
 
 # ------------------------------- PAGE FUNCTION -------------------------------
@@ -168,15 +155,18 @@ def full_lca_study_form():
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("<div class='section-card'><h3>🚚 Transportation Stages</h3>", unsafe_allow_html=True)
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            transport1_stage = st.text_input("Stage 1 Name", "Mine to Plant")
-        with col2:
-            transport1_mode = st.selectbox("Mode", ["Truck", "Train", "Ship"], 0)
-        with col3:
-            transport1_fuel = st.selectbox("Fuel Type", ["Diesel", "Electric"], 0)
-        with col4:
-            transport1_dist = st.number_input("Distance (km)", 0.0, 10000.0, 75.0)
+        st.caption("One row per leg; add rows for multi-leg chains. Payload is tons moved per ton of product.")
+        transport_legs = st.data_editor(
+            pd.DataFrame([{"stage": "Mine to Plant", "mode": "Truck", "fuel": "Diesel", "distance_km": 75.0, "payload_t": 1.0}]),
+            num_rows="dynamic", use_container_width=True, key="transport_legs_editor",
+            column_config={
+                "stage": st.column_config.TextColumn("Stage Name"),
+                "mode": st.column_config.SelectboxColumn("Mode", options=list(TRANSPORT_MODES), default="Truck", required=True),
+                "fuel": st.column_config.SelectboxColumn("Fuel Type", options=list(TRANSPORT_FUELS), default="Diesel", required=True),
+                "distance_km": st.column_config.NumberColumn("Distance (km)", min_value=0.0, max_value=20000.0),
+                "payload_t": st.column_config.NumberColumn("Payload (t)", min_value=0.0, default=1.0),
+            },
+        )
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("<div class='section-card'><h3>⚙️ Advanced Parameters</h3>", unsafe_allow_html=True)
@@ -185,6 +175,16 @@ def full_lca_study_form():
         proceff = st.number_input("Process Energy Efficiency (%)", 0.0, 100.0, 85.0)
         lifetime_ext = st.number_input("Product Lifetime Extension (Years)", 0, 200, 5)
         waste_method = st.selectbox("Waste Treatment Method", ["Recycling", "Landfill", "Incineration"], 0)
+        run_sensitivity = st.checkbox("Run global sensitivity analysis (Sobol indices)", value=False)
+        # defaults reproduce earlier (and cached) results; the other methods are opt-in
+        sampling = st.selectbox("Uncertainty Sampling Method", SAMPLING_METHODS,
+                                index=SAMPLING_METHODS.index(DEFAULT_SAMPLING), format_func=SAMPLING_LABELS.get,
+                                help="Changing the method changes the sampled numbers, so results will "
+                                     "differ slightly from studies run with simple random sampling.")
+        stop_at_convergence = st.checkbox("Stop Monte Carlo once the 95% CI is stable", value=False,
+                                          help=f"Runs up to {MAX_RUNS:,} samples and stops early once the "
+                                               f"95% CI widths change by less than {CONVERGENCE_TOLERANCE:.1%}. "
+                                               "The run count then varies from study to study.")
         st.markdown("</div>", unsafe_allow_html=True)
 
         st.markdown("<div class='section-card'><h3>📊 Data Quality Assessment</h3>", unsafe_allow_html=True)
@@ -199,7 +199,30 @@ def full_lca_study_form():
 
     # ------------------------------- SIMULATION -------------------------------
     if submitted:
-        form_data = locals().copy()
+        form_data = {
+            "intended_app": intended_app, "intended_audience": intended_audience,
+            "system_boundary": system_boundary, "comparative_assertion": comparative_assertion,
+            "study_limitations": study_limitations,
+            "project_name": project_name, "category": category,
+            "material": material, "region": region, "ore_conc": ore_conc, "ore_type": ore_type,
+            "coatings": coatings,
+            "functional_unit": functional_unit, "sec_material_content": sec_material_content,
+            "production_process": production_process, "use_duration": use_duration,
+            "end_life_scenario": end_life_scenario,
+            "transport_legs": transport_legs.to_dict("records"),
+            "grid_elec_mix": grid_elec_mix, "water_source": water_source, "proceff": proceff,
+            "lifetime_ext": lifetime_ext, "waste_method": waste_method,
+            "reliability": reliability, "completeness": completeness, "temporal": temporal,
+            "geographical": geographical, "technological": technological,
+        }
+
+        # first leg doubles as the legacy single-stage transport fields
+        first_leg = transport_legs.dropna(subset=["distance_km"]).head(1).to_dict("records")
+        if first_leg:
+            form_data.update({
+                "transport1_stage": first_leg[0].get("stage"), "transport1_mode": first_leg[0].get("mode"),
+                "transport1_fuel": first_leg[0].get("fuel"), "transport1_dist": first_leg[0].get("distance_km"),
+            })
 
         js_fill_script = """
         <script>
@@ -217,14 +240,29 @@ def full_lca_study_form():
         """
         st.markdown(js_fill_script, unsafe_allow_html=True)
 
-        try:
-            with st.spinner("Running LCA simulation..."):
-                results = run_simulation(form_data)
-                time.sleep(2)
-            st.success("✅ Simulation complete!")
-            st.markdown("<script>document.querySelector('#progressbar > div').style.width='100%';</script>", unsafe_allow_html=True)
-            ai_text = results.get("ai_lifecycle_interpretation", "")
-            results_page(results, ai_text)
-        except Exception as e:
-            st.error(f"❌ Simulation failed: {e}")
-            st.text(traceback.format_exc())
+        st.session_state["current_study_id"] = submit_simulation(
+            form_data, sensitivity=SENSITIVITY_SAMPLES if run_sensitivity else None, sampling=sampling,
+            **({"num_runs": MAX_RUNS, "tolerance": CONVERGENCE_TOLERANCE} if stop_at_convergence else {}))
+
+    # ------------------------------- RESULTS -------------------------------
+    study_id = st.session_state.get("current_study_id")
+    if study_id is None:
+        return
+    study = get_study(study_id)
+    if study is not None:
+        st.success("✅ Simulation complete!")
+        st.markdown("<script>document.querySelector('#progressbar > div').style.width='100%';</script>", unsafe_allow_html=True)
+        results = study["results"]
+        ai_text = results.get("ai_lifecycle_interpretation", "")
+        results_page(results, ai_text)
+        return
+
+    job = get_job(study_id)
+    if job is None:
+        return
+    if not job.done:
+        job_progress(job.job_id)
+    elif job.error:
+        err = job.error
+        st.error(f"❌ Simulation failed: {err}")
+        st.text("".join(traceback.format_exception(type(err), err, err.__traceback__)))
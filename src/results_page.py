@@ -16,7 +16,13 @@ import datetime
 import plotly.express as px
 import plotly.graph_objects as go
 import base64
-from typing import Optional, Any, Dict
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Dict
+
+from lca_engine import histogram_summary
+from factor_store import CATEGORY_UNITS, REFERENCE_PROCESS, default_store
 
 # Prefer local ai_recommendation module if available
 try:
@@ -36,6 +42,9 @@ HEADER = "#0b6b66"     # header color
 CARD_GLASS = "rgba(255,255,255,0.85)"  # glassy card background (light)
 CARD_BORDER = "rgba(3,120,115,0.08)"
 
+# ---------------- Impact category units ----------------
+IMPACT_UNITS = CATEGORY_UNITS
+
 # ---------------- Helpers ----------------
 def csv_download_link(df: pd.DataFrame, filename: str = "table.csv", label: str = "📥 Download CSV"):
     """
@@ -81,6 +90,44 @@ def plot_style(fig: go.Figure, title: Optional[str] = None, height: Optional[int
             pass
     return fig
 
+# ---------------- Figure cache ----------------
+# Serialized figure JSON keyed on (results digest, chart id). Shared across
+# sessions and reruns; widget interactions that don't change the results
+# reuse the stored JSON instead of rebuilding and re-styling figures.
+FIGURE_CACHE_SIZE = 256
+_figure_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+def _digest_default(obj: Any):
+    if isinstance(obj, np.ndarray):
+        return f"{obj.dtype}{obj.shape}:{hashlib.sha1(np.ascontiguousarray(obj).tobytes()).hexdigest()}"
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+def results_digest(r: dict) -> str:
+    """Stable content hash of a results dict (arrays hashed by their bytes)."""
+    blob = json.dumps(r, sort_keys=True, default=_digest_default)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def cached_figure(digest: str, chart_id: str, build: Callable[[], go.Figure]) -> dict:
+    """
+    Figure spec for (digest, chart_id); `build` only runs on a cache miss.
+    Returns a plain dict that st.plotly_chart accepts directly.
+    """
+    key = (digest, chart_id)
+    with _figure_cache_lock:
+        fig_json = _figure_cache.get(key)
+        if fig_json is not None:
+            _figure_cache.move_to_end(key)
+    if fig_json is None:
+        fig_json = build().to_json()
+        with _figure_cache_lock:
+            _figure_cache[key] = fig_json
+            while len(_figure_cache) > FIGURE_CACHE_SIZE:
+                _figure_cache.popitem(last=False)
+    return json.loads(fig_json)
+
 def ensure_ai_dict(ai_in: Optional[Any]):
     if ai_in is None:
         return None
@@ -139,6 +186,9 @@ def safe_results(results: Optional[dict]) -> dict:
         "Resource Efficiency": "92%", "Extended Product Life": "110%", "Reuse Potential": "40/50",
         "Material Recovery": "90%", "Closed-loop Potential": "75%", "Recycling Content": "10%", "Landfill Rate": "8%", "Energy Recovery": "2%"
     })
+    # Key impact profiles from the engine's characterized impacts when present
+    if "impact_list" not in r and isinstance(r.get("impacts"), dict):
+        r["impact_list"] = [(name, round(float(value), 4), IMPACT_UNITS.get(name, "")) for name, value in r["impacts"].items()]
     r.setdefault("impact_list", [
         ("Global Warming Potential", 2288.0, "kg CO₂-eq"),
         ("Energy Demand", 26626.0, "MJ"),
@@ -152,6 +202,11 @@ def safe_results(results: Optional[dict]) -> dict:
         ("Freshwater Ecotoxicity", 22.88, "CTUe"),
         ("Land Use", 228.77, "m²·year")
     ])
+    # engine breakdowns (transport from the leg model) take precedence over the mock split
+    if "gwp_breakdown" not in r and r.get("gwp_contribution_analysis"):
+        r["gwp_breakdown"] = r["gwp_contribution_analysis"]
+    if "energy_breakdown" not in r and r.get("energy_source_breakdown"):
+        r["energy_breakdown"] = r["energy_source_breakdown"]
     r.setdefault("gwp_breakdown", {"Production": 66, "Transport": 25, "Use Phase": 9})
     r.setdefault("energy_breakdown", {"Direct Fuel": 24794.84, "Grid Electricity": 1831.00})
     r.setdefault("primary_vs_recycled", [
@@ -161,13 +216,19 @@ def safe_results(results: Optional[dict]) -> dict:
         {"Metric": "Acidification (kg SO2-eq)", "Primary": 4.40, "Recycled": 1.35},
         {"Metric": "Eutrophication (kg PO4-eq)", "Primary": 1.24, "Recycled": 0.30},
     ])
-    # Monte Carlo arrays for uncertainty dashboard
+    # Monte Carlo arrays for uncertainty dashboard (float32, passed through as-is)
+    if "uncertainty" not in r and "uncertainty_dashboard" in r:
+        ud = r["uncertainty_dashboard"]
+        r["uncertainty"] = {"GWP": ud.get("GWP Uncertainty"), "Energy": ud.get("Energy Uncertainty"), "Water": ud.get("Water Uncertainty")}
     if "uncertainty" not in r:
         rng = np.random.default_rng(123)
-        gwp_arr = rng.normal(loc=r["executive_summary"]["Global Warming Potential"], scale=100, size=1000)
-        energy_arr = rng.normal(loc=r["executive_summary"]["Overall Energy Demand"], scale=1500, size=1000)
-        water_arr = rng.normal(loc=r["executive_summary"]["Water Consumption"], scale=0.4, size=1000)
-        r["uncertainty"] = {"GWP": gwp_arr.tolist(), "Energy": energy_arr.tolist(), "Water": water_arr.tolist()}
+        gwp_arr = rng.standard_normal(1000, dtype=np.float32) * 100 + r["executive_summary"]["Global Warming Potential"]
+        energy_arr = rng.standard_normal(1000, dtype=np.float32) * 1500 + r["executive_summary"]["Overall Energy Demand"]
+        water_arr = rng.standard_normal(1000, dtype=np.float32) * 0.4 + r["executive_summary"]["Water Consumption"]
+        r["uncertainty"] = {"GWP": gwp_arr, "Energy": energy_arr, "Water": water_arr}
+    # Bin edges / counts / CI are computed once per simulation; only fall back for raw arrays
+    if "uncertainty_summary" not in r:
+        r["uncertainty_summary"] = {k: histogram_summary(v if v is not None else []) for k, v in r["uncertainty"].items()}
     # ensure primary_vs_recycled is present in a shape we expect
     if "primary_vs_recycled" not in r or not isinstance(r["primary_vs_recycled"], list):
         r["primary_vs_recycled"] = [
@@ -177,168 +238,10 @@ def safe_results(results: Optional[dict]) -> dict:
         ]
     return r
 
-# ---------------- Main rendering function ----------------
-def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
-    st.set_page_config(layout="wide", page_title="MetalliQ — Final LCA Report")
-    # Accent header progress bar (faint, static as requested)
-    st.markdown(f"""
-    <style>
-    .top-accent {{
-        height: 6px;
-        width: 100%;
-        background: linear-gradient(90deg, rgba(0,231,255,0.12) 0%, rgba(0,184,204,0.12) 40%, rgba(2,195,154,0.12) 70%);
-        border-radius: 4px;
-        margin-bottom: 12px;
-        box-shadow: 0 2px 12px rgba(2,195,154,0.04) inset;
-    }}
-    </style>
-    <div class="top-accent"></div>
-    """, unsafe_allow_html=True)
-
-    # Page CSS for glass cards and fonts
-    st.markdown(f"""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@600&family=Poppins:wght@300;400;600&display=swap');
-    body, .stApp {{
-        background: linear-gradient(180deg, #F7FEFF 0%, #FFFFFF 100%) !important;
-        color: {TEXT} !important;
-        font-family: 'Poppins', sans-serif;
-    }}
-    h1,h2,h3,h4 {{
-        font-family: 'Orbitron', sans-serif;
-        color: {HEADER} !important;
-    }}
-    .card-override {{
-        background: {CARD_GLASS} !important;
-        border-radius: 12px !important;
-        border: 1px solid {CARD_BORDER} !important;
-        padding: 12px !important;
-        box-shadow: 0 6px 20px rgba(2,195,154,0.06) !important;
-    }}
-    .metric-number {{
-        color: {ACCENT_2} !important;
-        font-weight:700;
-        font-size:20px;
-    }}
-    .plotly .main-svg text {{
-        fill: {TEXT} !important;
-    }}
-    /* Make table headers readable */
-    .stDataFrame table th {{
-        background: rgba(2,195,154,0.06) !important;
-        color: {TEXT} !important;
-        font-weight:600;
-    }}
-    </style>
-    """, unsafe_allow_html=True)
-
-    # prepare results safely
-    r = safe_results(results)
-    ai_data = ensure_ai_dict(ai_text)
-    # if no ai_data passed, fallback to imported example or default
-    if not ai_data:
-        if ai_data_example:
-            ai_data = ai_data_example
-        else:
-            ai_data = {"summary": "Production phase dominates GWP; consider recycled content and supplier energy mix.",
-                       "findings": [], "ore_warning": {"text": "Ore grade variability detected: low-grade ores may increase processing emissions.", "severity": "Warning"},
-                       "ev_charging": {"text": "Recommend off-peak charging during renewable supply windows.", "priority": "Advisory"}}
-
-    # ---------- Header ----------
-    st.markdown(f"""
-        <div class="card-override" style="display:flex;justify-content:space-between;align-items:center;">
-            <div>
-                <h1 style="margin:0">{r.get('title','LCA Final Report')}</h1>
-                <div style="color:rgba(3,60,57,0.8);font-size:13px;margin-top:6px">Generated on {r.get('generated_on')} by {r.get('generated_by')}</div>
-            </div>
-            <div style="display:flex;gap:10px;align-items:center;">
-                <button style="background:linear-gradient(90deg,{ACCENT_1},{ACCENT_2});border:none;color:white;padding:8px 12px;border-radius:8px;font-weight:700;">Export PDF (dummy)</button>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("---")
-
-    # ---------- ISO Conformance ----------
-    st.markdown(f"""
-        <div class="card-override" style="padding:14px;">
-            <strong style="color:{ACCENT_3}">ISO 14044 Conformance</strong>
-            <div style="color:rgba(3,60,57,0.8);margin-top:8px">
-                This is a screening-level LCA broadly consistent with ISO 14044 principles for internal decision-making. For public comparative statements, a formal critical review is required.
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("")
-
-    # ---------- Executive Summary cards ----------
-    exec_vals = r.get("executive_summary", {})
-    c1, c2, c3, c4 = st.columns([1.6, 1, 1, 1])
-    c1.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Global Warming Potential</div><div class='metric-number'>{exec_vals.get('Global Warming Potential',0):.0f} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>kg CO₂-eq</span></div></div>", unsafe_allow_html=True)
-    c2.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Circularity Score</div><div class='metric-number'>{exec_vals.get('Circularity Score',0)} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>%</span></div></div>", unsafe_allow_html=True)
-    c3.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Particulate Matter</div><div class='metric-number'>{exec_vals.get('Particulate Matter',0):.3g} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>kg PM2.5-eq</span></div></div>", unsafe_allow_html=True)
-    c4.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Water Consumption</div><div class='metric-number'>{exec_vals.get('Water Consumption',0)} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>m³</span></div></div>", unsafe_allow_html=True)
-
-    st.markdown("")
-
-    # ---------- Goal & Scope ----------
-    st.markdown("<h3 style='margin:6px 0'>Goal & Scope (ISO 14044)</h3>", unsafe_allow_html=True)
-    gs = r.get("goal_scope", {})
-    left, right = st.columns(2)
-    with left:
-        intended_app_text = gs.get("Intended Application", "Screening assessment for internal R&D")
-        st.markdown(f"**Intended Application**  \n{intended_app_text}")
-        system_boundary_text = gs.get("System Boundary", "Cradle-to-Gate")
-        st.markdown(f"**System Boundary**  \n{system_boundary_text}")
-    with right:
-        intended_audience_text = gs.get("Intended Audience", "Internal engineering and sustainability departments")
-        st.markdown(f"**Intended Audience**  \n{intended_audience_text}")
-        comp_assertion = gs.get("Comparative Assertion for Public", gs.get("comparative_assertion", "No"))
-        st.markdown(f"**Comparative Assertion for Public**  \n{comp_assertion}")
-    st.markdown("---")
-
-    # ---------- Data Quality & Uncertainty (ADQI) ----------
-    st.markdown("<h3 style='margin:6px 0'>Data Quality & Uncertainty</h3>", unsafe_allow_html=True)
-    dq = r.get("data_quality", {})
-    # read values with defaults if missing
-    rel = dq.get("Reliability", dq.get("reliability", "4/5"))
-    comp = dq.get("Completeness", dq.get("completeness", "4/5"))
-    temp = dq.get("Temporal", dq.get("temporal", "4/5"))
-    geo = dq.get("Geographical", dq.get("geographical", "4/5"))
-    tech = dq.get("Technological", dq.get("technological", "4/5"))
-
-    agg_adqi = dq.get("Aggregated ADQI", dq.get("aggregated_adqi", None))
-    if agg_adqi is None:
-        def parse_score(s):
-            try:
-                if isinstance(s, str) and "/" in s:
-                    return float(s.split("/")[0])
-                return float(s)
-            except Exception:
-                return None
-        parts = [parse_score(x) for x in (rel, comp, temp, geo, tech)]
-        nums = [p for p in parts if p is not None]
-        if nums:
-            agg_adqi = round(sum(nums) / len(nums), 2)
-        else:
-            agg_adqi = 4.0
-
-    uncertainty_pct = dq.get("Result Uncertainty pct", dq.get("result_uncertainty_pct", dq.get("uncertainty_pct", 14)))
-    a, b = st.columns([2,1])
-    with a:
-        st.markdown(f"**Reliability Score:** {rel}  \n**Completeness Score:** {comp}  \n**Temporal Score:** {temp}  \n**Geographical Score:** {geo}  \n**Technological Score:** {tech}")
-    with b:
-        st.markdown(
-            f"<div class='card-override' style='text-align:center'>"
-            f"<div style='color:rgba(3,60,57,0.75)'>Aggregated Data Quality</div>"
-            f"<div style='font-size:28px;color:{ACCENT_2};font-weight:700'>{agg_adqi}</div>"
-            f"<div style='color:rgba(3,60,57,0.6);margin-top:6px'>Result Uncertainty<br><strong>±{uncertainty_pct}%</strong></div>"
-            f"</div>", unsafe_allow_html=True
-        )
-
-    st.markdown("---")
-
-    # ---------- Supply Chain Hotspots ----------
+# ---------------- Report sections ----------------
+# Each section renders independently; only the selected one is built.
+def _section_hotspots(r: dict, ai_data: dict, digest: str):
+    """Supply Chain Hotspots."""
     st.markdown("<h3 style='margin:6px 0'>Supply Chain Hotspots</h3>", unsafe_allow_html=True)
     for i, item in enumerate(r.get("supply_chain_hotspots", [])):
         border = f"border:2px solid rgba(3,120,115,0.12);background:linear-gradient(90deg, rgba(255,255,255,0.95), rgba(255,255,255,0.90));" if i == 0 else f"background:transparent;border:1px solid {CARD_BORDER};"
@@ -347,9 +250,9 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
                     f"<div style='font-weight:800;color:{ACCENT_2}'>{item['share_pct']}%<div style='color:rgba(3,60,57,0.6);font-size:12px'>of GWP Impact</div></div></div>",
                     unsafe_allow_html=True)
 
-    st.markdown("---")
-
-    # ---------- Interactive Process Lifecycle ----------
+@st.fragment
+def _section_lifecycle(r: dict, ai_data: dict, digest: str):
+    """Interactive Process Lifecycle (own fragment: the stage selectbox reruns only this section)."""
     st.markdown("<h3 style='margin:6px 0'>Interactive Process Lifecycle</h3>", unsafe_allow_html=True)
     mf_labels = r["material_flow"]["labels"]
     st.markdown(f"<div class='card-override' style='padding:12px;margin-bottom:8px'></div>", unsafe_allow_html=True)
@@ -363,9 +266,8 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
     stage_metrics = {"GWP": round(total_gwp * stage_share, 1), "Energy": round(r["executive_summary"]["Overall Energy Demand"] * stage_share, 1), "Water": round(r["executive_summary"]["Water Consumption"] * stage_share, 3)}
     st.markdown(f"<div class='card-override'><strong>{sel}</strong> — GWP: <strong>{stage_metrics['GWP']}</strong> kg CO₂-eq • Energy: <strong>{stage_metrics['Energy']}</strong> MJ • Water: <strong>{stage_metrics['Water']}</strong> m³</div>", unsafe_allow_html=True)
 
-    st.markdown("---")
-
-    # ---------- AI-Generated Life Cycle Interpretation ----------
+def _section_interpretation(r: dict, ai_data: dict, digest: str):
+    """AI-Generated Life Cycle Interpretation."""
     st.markdown("<h3 style='margin:6px 0'>AI-Generated Life Cycle Interpretation</h3>", unsafe_allow_html=True)
     ai_lifecycle_text = ai_data.get("lifecycle_interpretation", None) or ai_data.get("summary", "")
     if not ai_lifecycle_text or len(ai_lifecycle_text.strip()) < 20:
@@ -376,17 +278,17 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
         )
     st.markdown(f"<div class='card-override' style='padding:16px;color:rgba(3,60,57,0.9)'>{ai_lifecycle_text}</div>", unsafe_allow_html=True)
 
-    st.markdown("---")
-
-    # ---------- Circularity Analysis + Sankey ----------
+def _section_circularity(r: dict, ai_data: dict, digest: str):
+    """Circularity Analysis + Sankey."""
     st.markdown("<h3 style='margin:6px 0'>Circularity Analysis & Material Flow</h3>", unsafe_allow_html=True)
     left, right = st.columns([1,1.4])
     with left:
         circ = r["circularity"]
-        fig_gauge = go.Figure(data=[go.Pie(labels=["Circular", "Remaining"], values=[circ["Circularity Rate"], 100-circ["Circularity Rate"]], hole=0.66, marker=dict(colors=[ACCENT_2, "rgba(200,200,200,0.25)"]), textinfo='none')])
-        fig_gauge.add_annotation(dict(text=f"<b>{circ['Circularity Rate']}%</b><br><span style='font-size:12px;color:rgba(3,60,57,0.8)'>Circularity</span>", x=0.5, y=0.5, showarrow=False))
-        plot_style(fig_gauge, height=320)
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        def build_gauge():
+            fig_gauge = go.Figure(data=[go.Pie(labels=["Circular", "Remaining"], values=[circ["Circularity Rate"], 100-circ["Circularity Rate"]], hole=0.66, marker=dict(colors=[ACCENT_2, "rgba(200,200,200,0.25)"]), textinfo='none')])
+            fig_gauge.add_annotation(dict(text=f"<b>{circ['Circularity Rate']}%</b><br><span style='font-size:12px;color:rgba(3,60,57,0.8)'>Circularity</span>", x=0.5, y=0.5, showarrow=False))
+            return plot_style(fig_gauge, height=320)
+        st.plotly_chart(cached_figure(digest, "circularity_gauge", build_gauge), use_container_width=True)
         st.markdown(f"<div class='card-override' style='padding:10px'>"
                     f"<div>Recyclability Rate: <strong>{circ['Recyclability Rate']}%</strong></div>"
                     f"<div>Recovery Efficiency: <strong>{circ['Recovery Efficiency']}%</strong></div>"
@@ -396,18 +298,18 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
     with right:
         mf = r["material_flow"]
         try:
-            node = dict(label=mf["labels"], pad=15, thickness=14, color=[ACCENT_4]*len(mf["labels"]))
-            link = dict(source=mf["source"], target=mf["target"], value=mf["value"], color="rgba(7,170,170,0.25)")
-            sankey = go.Figure(go.Sankey(node=node, link=link))
-            plot_style(sankey, title="Material Flow Sankey", height=380)
-            st.plotly_chart(sankey, use_container_width=True)
+            def build_sankey():
+                node = dict(label=mf["labels"], pad=15, thickness=14, color=[ACCENT_4]*len(mf["labels"]))
+                link = dict(source=mf["source"], target=mf["target"], value=mf["value"], color="rgba(7,170,170,0.25)")
+                sankey = go.Figure(go.Sankey(node=node, link=link))
+                return plot_style(sankey, title="Material Flow Sankey", height=380)
+            st.plotly_chart(cached_figure(digest, "material_flow_sankey", build_sankey), use_container_width=True)
         except Exception as e:
             st.error("Sankey failed to render")
             st.write(e)
 
-    st.markdown("---")
-
-    # ---------- Extended Circularity Metrics ----------
+def _section_extended_metrics(r: dict, ai_data: dict, digest: str):
+    """Extended Circularity Metrics."""
     st.markdown("<h3 style='margin:6px 0'>Extended Circularity Metrics</h3>", unsafe_allow_html=True)
     metrics = r["extended_metrics"]
     cols = st.columns(4)
@@ -415,19 +317,20 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
     for i, k in enumerate(keys):
         cols[i % 4].markdown(f"<div class='card-override' style='text-align:center'><div style='color:rgba(3,60,57,0.8)'>{k}</div><div style='font-size:20px;color:{ACCENT_2};font-weight:700'>{metrics[k]}</div></div>", unsafe_allow_html=True)
 
-    st.markdown("---")
-
-    # ---------- Key Impact Profiles ----------
+def _section_impacts(r: dict, ai_data: dict, digest: str):
+    """Key Impact Profiles."""
     st.markdown("<h3 style='margin:6px 0'>Key Impact Profiles</h3>", unsafe_allow_html=True)
     impact_df = pd.DataFrame(r["impact_list"], columns=["Impact Metric", "Value", "Unit"])
-    top_keys = ["Global Warming Potential", "Energy Demand", "Water Consumption", "Eutrophication", "Acidification"]
+    top_keys = ["Global Warming Potential", "Energy Demand", "Water Consumption", "Eutrophication", "Eutrophication Demand",
+                "Acidification", "Acidification Potential"]
     df_bar = impact_df[impact_df["Impact Metric"].isin(top_keys)]
     if df_bar.empty:
         df_bar = impact_df.head(5)
-    fig_bar = px.bar(df_bar, x="Impact Metric", y="Value", text="Value", color="Impact Metric",
-                     color_discrete_sequence=[ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_4, ACCENT_2])
-    plot_style(fig_bar, height=360)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    def build_impact_bar():
+        fig_bar = px.bar(df_bar, x="Impact Metric", y="Value", text="Value", color="Impact Metric",
+                         color_discrete_sequence=[ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_4, ACCENT_2])
+        return plot_style(fig_bar, height=360)
+    st.plotly_chart(cached_figure(digest, "key_impacts_bar", build_impact_bar), use_container_width=True)
 
     st.markdown("---")
 
@@ -436,14 +339,16 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
     col_a, col_b = st.columns([1,1])
     with col_a:
         df_gwp = pd.DataFrame(list(r["gwp_breakdown"].items()), columns=["Category", "Share"])
-        pie = px.pie(df_gwp, names="Category", values="Share", hole=0.4, color_discrete_sequence=[ACCENT_1, ACCENT_2, ACCENT_3])
-        plot_style(pie, "GWP Contribution Analysis", height=300)
-        st.plotly_chart(pie, use_container_width=True)
+        def build_gwp_pie():
+            pie = px.pie(df_gwp, names="Category", values="Share", hole=0.4, color_discrete_sequence=[ACCENT_1, ACCENT_2, ACCENT_3])
+            return plot_style(pie, "GWP Contribution Analysis", height=300)
+        st.plotly_chart(cached_figure(digest, "gwp_contribution_pie", build_gwp_pie), use_container_width=True)
     with col_b:
         df_energy = pd.DataFrame(list(r["energy_breakdown"].items()), columns=["Source", "Value"])
-        bar = px.bar(df_energy, x="Value", y="Source", orientation="h", text="Value", color="Source", color_discrete_sequence=[ACCENT_3, ACCENT_2])
-        plot_style(bar, "Energy Source Breakdown (MJ)", height=300)
-        st.plotly_chart(bar, use_container_width=True)
+        def build_energy_bar():
+            bar = px.bar(df_energy, x="Value", y="Source", orientation="h", text="Value", color="Source", color_discrete_sequence=[ACCENT_3, ACCENT_2])
+            return plot_style(bar, "Energy Source Breakdown (MJ)", height=300)
+        st.plotly_chart(cached_figure(digest, "energy_source_bar", build_energy_bar), use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
     st.markdown("---")
@@ -467,80 +372,79 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
         "Human Toxicity (Non-Cancer)",
         "Land Use"
     ]
-    mock_values = {
-        "Global Warming Potential": 2288.0,
-        "Acidification Potential": 4.11,
-        "Photochemical Ozone Creation": 2.29,
-        "Abiotic Depletion (Fossil)": 29288.0,
-        "Fresh Water Ecotoxicity": 22.88,
-        "Energy Demand": 26626.0,
-        "Eutrophication Demand": 1.14,
-        "Particulate Matter Formation": 0.763,
-        "Human Toxicity (Cancer)": 0.012,
-        "Ionizing Radiation": 0.00035,
-        "Water Consumption": 4.7,
-        "Ozone Depletion Potential": 0.00005,
-        "Abiotic Depletion (Elements)": 0.0012,
-        "Human Toxicity (Non-Cancer)": 2.29,
-        "Land Use": 228.77
-    }
-    units = {
-        "Global Warming Potential": "kg CO₂-eq",
-        "Acidification Potential": "kg SO₂-eq",
-        "Photochemical Ozone Creation": "kg NMVOC-eq",
-        "Abiotic Depletion (Fossil)": "MJ",
-        "Fresh Water Ecotoxicity": "CTUe",
-        "Energy Demand": "MJ",
-        "Eutrophication Demand": "kg PO₄-eq",
-        "Particulate Matter Formation": "kg PM2.5-eq",
-        "Human Toxicity (Cancer)": "CTUh",
-        "Ionizing Radiation": "kBq U235-eq",
-        "Water Consumption": "m³",
-        "Ozone Depletion Potential": "kg CFC-11-eq",
-        "Abiotic Depletion (Elements)": "kg Sb-eq",
-        "Human Toxicity (Non-Cancer)": "CTUh",
-        "Land Use": "m²·year"
-    }
+    # reference results for the study's material and region, from the factor store
+    store = default_store()
+    material, region = r.get("material", "Steel"), r.get("region", "India")
+    mock_values = {name: store.get(material, region, REFERENCE_PROCESS, name, 0.0) for name in impact_names}
     impact_rows = []
     for name in impact_names:
-        val = mock_values.get(name, 0.0)
-        unit = units.get(name, "")
+        val = r.get("impacts", {}).get(name, mock_values.get(name, 0.0))
+        unit = IMPACT_UNITS.get(name, "")
         impact_rows.append({"Impact Metric": name, "Value": val, "Unit": unit})
     impact_df = pd.DataFrame(impact_rows)
     impact_df["ValueNum"] = pd.to_numeric(impact_df["Value"], errors="coerce")
     impact_df_sorted = impact_df.sort_values("ValueNum", ascending=True)
-    fig_imp = px.bar(impact_df_sorted, x="ValueNum", y="Impact Metric", orientation="h", text="ValueNum", color="Impact Metric",
-                     color_discrete_sequence=[ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_4, ACCENT_2, ACCENT_3, ACCENT_1, ACCENT_4, ACCENT_2, ACCENT_3, ACCENT_1, ACCENT_4, ACCENT_2, ACCENT_3, ACCENT_1])
-    plot_style(fig_imp, height=480)
-    st.plotly_chart(fig_imp, use_container_width=True)
+    def build_detailed_impacts():
+        fig_imp = px.bar(impact_df_sorted, x="ValueNum", y="Impact Metric", orientation="h", text="ValueNum", color="Impact Metric",
+                         color_discrete_sequence=[ACCENT_1, ACCENT_2, ACCENT_3, ACCENT_4, ACCENT_2, ACCENT_3, ACCENT_1, ACCENT_4, ACCENT_2, ACCENT_3, ACCENT_1, ACCENT_4, ACCENT_2, ACCENT_3, ACCENT_1])
+        return plot_style(fig_imp, height=480)
+    st.plotly_chart(cached_figure(digest, "detailed_impacts_bar", build_detailed_impacts), use_container_width=True)
     st.dataframe(impact_df.drop(columns=["ValueNum"]), use_container_width=True, height=260)
     csv_download_link(impact_df.drop(columns=["ValueNum"]), filename="detailed_impacts_mock.csv", label="📥 Download Detailed Impacts CSV")
 
-    st.markdown("---")
-
-    # ---------- Uncertainty Dashboard ----------
+def _section_uncertainty(r: dict, ai_data: dict, digest: str):
+    """Uncertainty Dashboard."""
     st.markdown("<h3 style='margin:6px 0'>Uncertainty Dashboard</h3>", unsafe_allow_html=True)
-    unc = r["uncertainty"]
+    unc = r["uncertainty_summary"]
     col_g, col_e, col_w = st.columns(3)
-    def hist_col(col, arr, label, unit):
-        arr = np.array(arr)
-        mean = np.mean(arr)
-        ci = np.percentile(arr, [2.5, 97.5])
-        fig = go.Figure()
-        fig.add_trace(go.Histogram(x=arr, nbinsx=30, marker=dict(color=ACCENT_1)))
-        fig.add_vline(x=mean, line_color=ACCENT_2, line_width=2)
-        fig.add_vline(x=ci[0], line_dash="dash", line_color=ACCENT_2)
-        fig.add_vline(x=ci[1], line_dash="dash", line_color=ACCENT_2)
-        plot_style(fig, title=f"{label} distribution", height=300)
-        col.plotly_chart(fig, use_container_width=True)
+    def hist_col(col, summary, label, unit):
+        edges = np.asarray(summary["edges"], dtype=float)
+        counts = np.asarray(summary["counts"])
+        mean = summary["mean"]
+        ci = (summary["ci_95_lower"], summary["ci_95_upper"])
+        def build_hist():
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), marker=dict(color=ACCENT_1)))
+            fig.update_layout(bargap=0)
+            fig.add_vline(x=mean, line_color=ACCENT_2, line_width=2)
+            fig.add_vline(x=ci[0], line_dash="dash", line_color=ACCENT_2)
+            fig.add_vline(x=ci[1], line_dash="dash", line_color=ACCENT_2)
+            return plot_style(fig, title=f"{label} distribution", height=300)
+        col.plotly_chart(cached_figure(digest, f"uncertainty_{label}", build_hist), use_container_width=True)
         col.markdown(f"**Mean:** {mean:.2f} {unit}  •  **95% CI:** [{ci[0]:.2f}, {ci[1]:.2f}]")
-    hist_col(col_g, unc.get("GWP", []), "Global Warming Potential", "kg CO₂-eq")
-    hist_col(col_e, unc.get("Energy", []), "Energy Demand", "MJ")
-    hist_col(col_w, unc.get("Water", []), "Water Consumption", "m³")
-
-    st.markdown("---")
-
-    # ---------- AI-Powered Insights & Recommendations ----------
+    hist_col(col_g, unc["GWP"], "Global Warming Potential", "kg CO₂-eq")
+    hist_col(col_e, unc["Energy"], "Energy Demand", "MJ")
+    hist_col(col_w, unc["Water"], "Water Consumption", "m³")
+    sampling = r.get("sampling")
+    if sampling:
+        note = f"{r.get('num_runs', 0):,} runs, {sampling['method']} sampling"
+        if sampling.get("tolerance"):
+            note += " (stopped at convergence)" if sampling.get("converged") else " (run budget reached)"
+        st.caption(note)
+
+@st.fragment
+def _section_sensitivity(r: dict, ai_data: dict, digest: str):
+    """Global Sensitivity (Sobol) tornado chart; the impact selector reruns only this section."""
+    st.markdown("<h3 style='margin:6px 0'>Global Sensitivity Analysis</h3>", unsafe_allow_html=True)
+    sens = r.get("sensitivity")
+    if not sens:
+        st.info("Enable 'Run global sensitivity analysis' in the study form to see which inputs drive each impact.")
+        return
+    impact = st.selectbox("Impact category", list(sens["total_order"]), index=0, key="sensitivity_impact")
+    def build_tornado():
+        df = pd.DataFrame({"Parameter": sens["parameters"],
+                           "First-order": sens["first_order"][impact],
+                           "Total-order": sens["total_order"][impact]}).sort_values("Total-order")
+        fig = go.Figure()
+        fig.add_trace(go.Bar(y=df["Parameter"], x=df["Total-order"], orientation="h", name="Total-order (Sₜ)", marker=dict(color=ACCENT_2)))
+        fig.add_trace(go.Bar(y=df["Parameter"], x=df["First-order"], orientation="h", name="First-order (S₁)", marker=dict(color=ACCENT_4)))
+        fig.update_layout(barmode="overlay", xaxis_title="Share of variance", margin=dict(l=180, r=30, t=40, b=40))
+        return plot_style(fig, title=f"{impact} — variance drivers", height=340)
+    st.plotly_chart(cached_figure(digest, f"sensitivity_{impact}", build_tornado), use_container_width=True)
+    st.caption(f"Sobol indices from {sens['evaluations']:,} model evaluations ({sens['base_samples']:,} base samples).")
+
+def _section_ai_insights(r: dict, ai_data: dict, digest: str):
+    """AI-Powered Insights & Recommendations."""
     st.markdown("<h3 style='margin:6px 0'>AI-Powered Insights & Recommendations</h3>", unsafe_allow_html=True)
     try:
         extra_ctx = {"executive_summary": r["executive_summary"], "supply_chain_hotspots": r["supply_chain_hotspots"]}
@@ -585,9 +489,8 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
         st.error("Failed to render AI recommendations.")
         st.write(str(e))
 
-    st.markdown("---")
-
-    # ---------- Primary vs. Recycled Scenario Comparison ----------
+def _section_primary_vs_recycled(r: dict, ai_data: dict, digest: str):
+    """Primary vs. Recycled Scenario Comparison."""
     st.markdown("<h3 style='margin:6px 0'>Primary vs. Recycled Route Comparison</h3>", unsafe_allow_html=True)
     df_pvr = pd.DataFrame(r.get("primary_vs_recycled", []))
     # normalize columns gracefully
@@ -634,25 +537,224 @@ def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
 
     # Chart group
     try:
-        df_melt = df_pvr.melt(id_vars=["Metric", "Savings"], value_vars=["Primary", "Recycled"], var_name="Scenario", value_name="Value")
-        fig_cmp = px.bar(df_melt, x="Metric", y="Value", color="Scenario", barmode="group", text="Value",
-                         color_discrete_map={"Primary": ACCENT_3, "Recycled": ACCENT_1})
-        fig_cmp.update_traces(texttemplate="%{text:.2s}", textposition="outside")
-        fig_cmp.update_layout(height=380, legend=dict(title="", orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1), xaxis_tickangle=-20, margin=dict(l=40, r=30, t=40, b=80))
-        plot_style(fig_cmp, height=380)
-        st.plotly_chart(fig_cmp, use_container_width=True)
-
-        df_vis = df_pvr.sort_values("Primary", ascending=False)
-        fig_vis = go.Figure()
-        fig_vis.add_trace(go.Bar(y=df_vis["Metric"], x=df_vis["Primary"], orientation='h', name='Primary Route', marker=dict(color=ACCENT_3), hovertemplate='%{y}<br>Primary: %{x}<extra></extra>'))
-        fig_vis.add_trace(go.Bar(y=df_vis["Metric"], x=df_vis["Recycled"], orientation='h', name='Recycled Route', marker=dict(color=ACCENT_1), hovertemplate='%{y}<br>Recycled: %{x}<extra></extra>'))
-        fig_vis.update_layout(barmode='group', height=360, margin=dict(l=150, r=40, t=30, b=30))
-        plot_style(fig_vis, height=360)
-        st.plotly_chart(fig_vis, use_container_width=True)
+        def build_route_comparison():
+            df_melt = df_pvr.melt(id_vars=["Metric", "Savings"], value_vars=["Primary", "Recycled"], var_name="Scenario", value_name="Value")
+            fig_cmp = px.bar(df_melt, x="Metric", y="Value", color="Scenario", barmode="group", text="Value",
+                             color_discrete_map={"Primary": ACCENT_3, "Recycled": ACCENT_1})
+            fig_cmp.update_traces(texttemplate="%{text:.2s}", textposition="outside")
+            fig_cmp.update_layout(height=380, legend=dict(title="", orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1), xaxis_tickangle=-20, margin=dict(l=40, r=30, t=40, b=80))
+            return plot_style(fig_cmp, height=380)
+        st.plotly_chart(cached_figure(digest, "route_comparison_bar", build_route_comparison), use_container_width=True)
+
+        def build_route_horizontal():
+            df_vis = df_pvr.sort_values("Primary", ascending=False)
+            fig_vis = go.Figure()
+            fig_vis.add_trace(go.Bar(y=df_vis["Metric"], x=df_vis["Primary"], orientation='h', name='Primary Route', marker=dict(color=ACCENT_3), hovertemplate='%{y}<br>Primary: %{x}<extra></extra>'))
+            fig_vis.add_trace(go.Bar(y=df_vis["Metric"], x=df_vis["Recycled"], orientation='h', name='Recycled Route', marker=dict(color=ACCENT_1), hovertemplate='%{y}<br>Recycled: %{x}<extra></extra>'))
+            fig_vis.update_layout(barmode='group', height=360, margin=dict(l=150, r=40, t=30, b=30))
+            return plot_style(fig_vis, height=360)
+        st.plotly_chart(cached_figure(digest, "route_comparison_horizontal", build_route_horizontal), use_container_width=True)
     except Exception as e:
         st.error("Comparison chart failed to render")
         st.write(str(e))
 
+REPORT_SECTIONS = {
+    "🔥 Hotspots": _section_hotspots,
+    "🔄 Lifecycle": _section_lifecycle,
+    "🧠 Interpretation": _section_interpretation,
+    "♻️ Circularity & Flow": _section_circularity,
+    "📐 Extended Metrics": _section_extended_metrics,
+    "🌍 Impacts": _section_impacts,
+    "🎲 Uncertainty": _section_uncertainty,
+    "🌪️ Sensitivity": _section_sensitivity,
+    "🤖 AI Insights": _section_ai_insights,
+    "⚖️ Primary vs Recycled": _section_primary_vs_recycled,
+}
+FULL_REPORT = "📄 Full report"
+
+@st.fragment
+def _report_sections(r: dict, ai_data: dict, digest: str):
+    """
+    Section navigator. Switching sections reruns only this fragment, and
+    only the selected section is rendered (the full report on request).
+    """
+    choice = st.radio("Report section", list(REPORT_SECTIONS) + [FULL_REPORT], horizontal=True,
+                      key="report_section", label_visibility="collapsed")
+    chosen = list(REPORT_SECTIONS.values()) if choice == FULL_REPORT else [REPORT_SECTIONS[choice]]
+    for i, section in enumerate(chosen):
+        if i:
+            st.markdown("---")
+        section(r, ai_data, digest)
+
+# ---------------- Main rendering function ----------------
+def results_page(results: Optional[dict] = None, ai_text: Optional[Any] = None):
+    st.set_page_config(layout="wide", page_title="MetalliQ — Final LCA Report")
+    # Accent header progress bar (faint, static as requested)
+    st.markdown(f"""
+    <style>
+    .top-accent {{
+        height: 6px;
+        width: 100%;
+        background: linear-gradient(90deg, rgba(0,231,255,0.12) 0%, rgba(0,184,204,0.12) 40%, rgba(2,195,154,0.12) 70%);
+        border-radius: 4px;
+        margin-bottom: 12px;
+        box-shadow: 0 2px 12px rgba(2,195,154,0.04) inset;
+    }}
+    </style>
+    <div class="top-accent"></div>
+    """, unsafe_allow_html=True)
+
+    # Page CSS for glass cards and fonts
+    st.markdown(f"""
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Orbitron:wght@600&family=Poppins:wght@300;400;600&display=swap');
+    body, .stApp {{
+        background: linear-gradient(180deg, #F7FEFF 0%, #FFFFFF 100%) !important;
+        color: {TEXT} !important;
+        font-family: 'Poppins', sans-serif;
+    }}
+    h1,h2,h3,h4 {{
+        font-family: 'Orbitron', sans-serif;
+        color: {HEADER} !important;
+    }}
+    .card-override {{
+        background: {CARD_GLASS} !important;
+        border-radius: 12px !important;
+        border: 1px solid {CARD_BORDER} !important;
+        padding: 12px !important;
+        box-shadow: 0 6px 20px rgba(2,195,154,0.06) !important;
+    }}
+    .metric-number {{
+        color: {ACCENT_2} !important;
+        font-weight:700;
+        font-size:20px;
+    }}
+    .plotly .main-svg text {{
+        fill: {TEXT} !important;
+    }}
+    /* Make table headers readable */
+    .stDataFrame table th {{
+        background: rgba(2,195,154,0.06) !important;
+        color: {TEXT} !important;
+        font-weight:600;
+    }}
+    </style>
+    """, unsafe_allow_html=True)
+
+    # prepare results safely
+    r = safe_results(results)
+    digest = results_digest(r)
+    ai_data = ensure_ai_dict(ai_text)
+    # if no ai_data passed, fallback to imported example or default
+    if not ai_data:
+        if ai_data_example:
+            ai_data = ai_data_example
+        else:
+            ai_data = {"summary": "Production phase dominates GWP; consider recycled content and supplier energy mix.",
+                       "findings": [], "ore_warning": {"text": "Ore grade variability detected: low-grade ores may increase processing emissions.", "severity": "Warning"},
+                       "ev_charging": {"text": "Recommend off-peak charging during renewable supply windows.", "priority": "Advisory"}}
+
+    # ---------- Header ----------
+    st.markdown(f"""
+        <div class="card-override" style="display:flex;justify-content:space-between;align-items:center;">
+            <div>
+                <h1 style="margin:0">{r.get('title','LCA Final Report')}</h1>
+                <div style="color:rgba(3,60,57,0.8);font-size:13px;margin-top:6px">Generated on {r.get('generated_on')} by {r.get('generated_by')}</div>
+            </div>
+            <div style="display:flex;gap:10px;align-items:center;">
+                <button style="background:linear-gradient(90deg,{ACCENT_1},{ACCENT_2});border:none;color:white;padding:8px 12px;border-radius:8px;font-weight:700;">Export PDF (dummy)</button>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("---")
+
+    if r.get("generic_factors"):
+        st.warning(f"The factor store has no {r.get('material')}-specific factors: impacts in this report "
+                   "use the generic (steel) production processes.")
+
+    # ---------- ISO Conformance ----------
+    st.markdown(f"""
+        <div class="card-override" style="padding:14px;">
+            <strong style="color:{ACCENT_3}">ISO 14044 Conformance</strong>
+            <div style="color:rgba(3,60,57,0.8);margin-top:8px">
+                This is a screening-level LCA broadly consistent with ISO 14044 principles for internal decision-making. For public comparative statements, a formal critical review is required.
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("")
+
+    # ---------- Executive Summary cards ----------
+    exec_vals = r.get("executive_summary", {})
+    c1, c2, c3, c4 = st.columns([1.6, 1, 1, 1])
+    c1.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Global Warming Potential</div><div class='metric-number'>{exec_vals.get('Global Warming Potential',0):.0f} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>kg CO₂-eq</span></div></div>", unsafe_allow_html=True)
+    c2.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Circularity Score</div><div class='metric-number'>{exec_vals.get('Circularity Score',0)} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>%</span></div></div>", unsafe_allow_html=True)
+    c3.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Particulate Matter</div><div class='metric-number'>{exec_vals.get('Particulate Matter',0):.3g} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>kg PM2.5-eq</span></div></div>", unsafe_allow_html=True)
+    c4.markdown(f"<div class='card-override'><div style='font-size:13px;color:rgba(3,60,57,0.75)'>Water Consumption</div><div class='metric-number'>{exec_vals.get('Water Consumption',0)} <span style='font-size:12px;color:rgba(3,60,57,0.6)'>m³</span></div></div>", unsafe_allow_html=True)
+
+    st.markdown("")
+
+    # ---------- Goal & Scope ----------
+    st.markdown("<h3 style='margin:6px 0'>Goal & Scope (ISO 14044)</h3>", unsafe_allow_html=True)
+    gs = r.get("goal_scope", {})
+    left, right = st.columns(2)
+    with left:
+        intended_app_text = gs.get("Intended Application", "Screening assessment for internal R&D")
+        st.markdown(f"**Intended Application**  \n{intended_app_text}")
+        system_boundary_text = gs.get("System Boundary", "Cradle-to-Gate")
+        st.markdown(f"**System Boundary**  \n{system_boundary_text}")
+    with right:
+        intended_audience_text = gs.get("Intended Audience", "Internal engineering and sustainability departments")
+        st.markdown(f"**Intended Audience**  \n{intended_audience_text}")
+        comp_assertion = gs.get("Comparative Assertion for Public", gs.get("comparative_assertion", "No"))
+        st.markdown(f"**Comparative Assertion for Public**  \n{comp_assertion}")
+    st.markdown("---")
+
+    # ---------- Data Quality & Uncertainty (ADQI) ----------
+    st.markdown("<h3 style='margin:6px 0'>Data Quality & Uncertainty</h3>", unsafe_allow_html=True)
+    dq = r.get("data_quality", {})
+    # read values with defaults if missing
+    rel = dq.get("Reliability", dq.get("reliability", "4/5"))
+    comp = dq.get("Completeness", dq.get("completeness", "4/5"))
+    temp = dq.get("Temporal", dq.get("temporal", "4/5"))
+    geo = dq.get("Geographical", dq.get("geographical", "4/5"))
+    tech = dq.get("Technological", dq.get("technological", "4/5"))
+
+    agg_adqi = dq.get("Aggregated ADQI", dq.get("aggregated_adqi", None))
+    if agg_adqi is None:
+        def parse_score(s):
+            try:
+                if isinstance(s, str) and "/" in s:
+                    return float(s.split("/")[0])
+                return float(s)
+            except Exception:
+                return None
+        parts = [parse_score(x) for x in (rel, comp, temp, geo, tech)]
+        nums = [p for p in parts if p is not None]
+        if nums:
+            agg_adqi = round(sum(nums) / len(nums), 2)
+        else:
+            agg_adqi = 4.0
+
+    uncertainty_pct = dq.get("Result Uncertainty pct", dq.get("result_uncertainty_pct", dq.get("uncertainty_pct", 14)))
+    a, b = st.columns([2,1])
+    with a:
+        st.markdown(f"**Reliability Score:** {rel}  \n**Completeness Score:** {comp}  \n**Temporal Score:** {temp}  \n**Geographical Score:** {geo}  \n**Technological Score:** {tech}")
+    with b:
+        st.markdown(
+            f"<div class='card-override' style='text-align:center'>"
+            f"<div style='color:rgba(3,60,57,0.75)'>Aggregated Data Quality</div>"
+            f"<div style='font-size:28px;color:{ACCENT_2};font-weight:700'>{agg_adqi}</div>"
+            f"<div style='color:rgba(3,60,57,0.6);margin-top:6px'>Result Uncertainty<br><strong>±{uncertainty_pct}%</strong></div>"
+            f"</div>", unsafe_allow_html=True
+        )
+
+    st.markdown("---")
+
+    # ---------- Report sections (lazy, fragment-based) ----------
+    _report_sections(r, ai_data, digest)
+
     st.markdown("---")
     st.markdown("<div style='color:rgba(3,60,57,0.6);font-size:12px'>Generated by MetalliQ · Screening-level LCA. For formal comparative reporting follow ISO 14044 critical review processes.</div>", unsafe_allow_html=True)
 
@@ -0,0 +1,170 @@
+"""
+Scenario comparison: every material × route × application in one batched
+evaluation of the simulation core.
+
+Mean impacts of all scenarios come from a single impact_model call (one
+stacked np.linalg.solve with per-row material factors). The Monte Carlo
+uses common random numbers: one standard-normal draw matrix is shared by
+every scenario, correlated per material with its Cholesky factor and
+scaled per scenario. A scenario's statistics are therefore affine maps of
+its material's draw statistics, so comparing six materials costs about
+the same as one. Differences between scenarios are taken run by run, so
+their confidence intervals carry only the real difference and not two
+independent sampling errors.
+"""
+
+from itertools import combinations, product
+
+import numpy as np
+import pandas as pd
+
+from factor_store import MATERIALS, WILDCARD
+from inventory import GRID_INTENSITY, factor_matrices
+from lca_engine import (
+    DEFAULT_SAMPLING,
+    IMPACT_NAMES,
+    PERCENTILES,
+    STUDY_DEFAULTS,
+    UNCERTAINTY_FRACTION,
+    cholesky_factor,
+    impact_model,
+    standard_normal,
+)
+
+# --- Scenario axes: name -> impact_model parameters ---
+# Production route: secondary (scrap) content and the grid supplying it
+ROUTES = {
+    "Primary Route": {"sec_material_content": 0.0, "grid_elec_mix": "India - Grid Average"},
+    "Recycled Route": {"sec_material_content": 100.0, "grid_elec_mix": "India - Grid Average"},
+    "Alternative Route": {"sec_material_content": 50.0, "grid_elec_mix": "India - Southern"},
+}
+# Application: fabrication efficiency (%) and delivery transport (t·km per t)
+APPLICATIONS = {
+    "Automotive": {"proceff": 85.0, "transport_dist": 75.0},
+    "Building": {"proceff": 88.0, "transport_dist": 150.0},
+    "Aerospace": {"proceff": 72.0, "transport_dist": 900.0},
+}
+SCENARIO_FIELDS = ("Material", "Route", "Application")
+
+COMPARE_RUNS = 5000
+PAIR_CHUNK = 16        # scenario pairs differenced per block
+
+
+def scenario_grid(materials, routes=("Primary Route",), applications=("Automotive",)):
+    """
+    One row per material × route × application with its model parameters.
+    Raises ValueError for materials outside factor_store.MATERIALS.
+    """
+    unknown = sorted(set(materials) - set(MATERIALS))
+    if unknown:
+        raise ValueError(f"Unknown material: {', '.join(unknown)}")
+    rows = []
+    for material, route, application in product(materials, routes, applications):
+        rows.append({"Material": material, "Route": route, "Application": application,
+                     **ROUTES[route], **APPLICATIONS[application]})
+    return pd.DataFrame(rows, columns=list(SCENARIO_FIELDS) + list(ROUTES["Primary Route"])
+                        + list(APPLICATIONS["Automotive"]))
+
+
+def _material_codes(grid):
+    # distinct materials and each scenario's index into them
+    return np.unique(grid["Material"].to_numpy(), return_inverse=True)
+
+
+def scenario_means(grid, region=WILDCARD, ore_conc=STUDY_DEFAULTS["ore_conc"]):
+    """(n_scenarios, n_impacts) mean impacts per ton, all scenarios in one impact_model call."""
+    materials, codes = _material_codes(grid)
+    matrices = np.stack([factor_matrices(m, region)[2] for m in materials])
+    grid_intensity = grid["grid_elec_mix"].map(GRID_INTENSITY).to_numpy(dtype=float)
+    return impact_model(ore_conc, grid["sec_material_content"].to_numpy(dtype=float),
+                        grid["proceff"].to_numpy(dtype=float), grid["transport_dist"].to_numpy(dtype=float),
+                        grid_intensity, matrices[codes])
+
+
+def material_draws(materials, num_runs=COMPARE_RUNS, seed=None, region=WILDCARD, sampling=DEFAULT_SAMPLING):
+    """
+    (n_materials, n_impacts, num_runs) correlated standard-normal draws, all
+    materials driven by the same draws (common random numbers). A scenario's
+    samples are means + scales * draws[material]: no per-scenario sampling.
+    """
+    z = standard_normal(np.random.default_rng(seed), (num_runs, len(IMPACT_NAMES)), sampling)
+    factors = np.stack([cholesky_factor(m, region) for m in materials])
+    return np.einsum("mij,rj->mir", factors, z)   # L @ z.T per material, runs contiguous
+
+
+def affine_interval(means, scales, lower, upper):
+    """CI of means + scales * w from the CI (lower, upper) of w; a negative scale swaps the bounds."""
+    a, b = means + scales * lower, means + scales * upper
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def _long_frame(keys, columns):
+    """Key columns × IMPACT_NAMES rows from {name: (n, n_impacts) array} value columns."""
+    n = len(next(iter(keys.values())))
+    frame = {name: np.repeat(np.asarray(values), len(IMPACT_NAMES)) for name, values in keys.items()}
+    frame["Impact"] = np.tile(IMPACT_NAMES, n)
+    frame.update((name, np.asarray(values).reshape(n * len(IMPACT_NAMES))) for name, values in columns.items())
+    return pd.DataFrame(frame)
+
+
+def material_pairs(grid):
+    """Index pairs (i, j), i < j, of scenarios sharing a route and application."""
+    pairs = []
+    for _, rows in grid.groupby(["Route", "Application"], sort=False):
+        pairs += list(combinations(rows.index, 2))
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def pairwise_differences(grid, means, draws, codes, pairs):
+    """
+    Run-by-run differences A - B for scenario index pairs, with their mean,
+    95% CI and the probability that A has the lower impact.
+    """
+    scales = means * UNCERTAINTY_FRACTION
+    n_pairs = len(pairs)
+    stats = {name: np.empty((n_pairs, len(IMPACT_NAMES)))
+             for name in ("Mean Difference", "CI Lower", "CI Upper", "P(A < B)")}
+    for start in range(0, n_pairs, PAIR_CHUNK):
+        i, j = pairs[start:start + PAIR_CHUNK].T
+        diff = scales[i][..., None] * draws[codes[i]]
+        diff -= scales[j][..., None] * draws[codes[j]]
+        diff += (means[i] - means[j])[..., None]
+        rows = slice(start, start + len(i))
+        stats["Mean Difference"][rows] = diff.mean(axis=-1)
+        stats["CI Lower"][rows], stats["CI Upper"][rows] = np.percentile(
+            diff, (PERCENTILES[0], PERCENTILES[-1]), axis=-1)
+        stats["P(A < B)"][rows] = (diff < 0).mean(axis=-1)
+    keys = {"Route": grid["Route"].to_numpy()[pairs[:, 0]],
+            "Application": grid["Application"].to_numpy()[pairs[:, 0]],
+            "Material A": grid["Material"].to_numpy()[pairs[:, 0]],
+            "Material B": grid["Material"].to_numpy()[pairs[:, 1]]}
+    return _long_frame(keys, stats)
+
+
+def compare_scenarios(materials, routes=("Primary Route",), applications=("Automotive",), region=WILDCARD,
+                      num_runs=COMPARE_RUNS, seed=None, sampling=DEFAULT_SAMPLING):
+    """
+    Compare every material × route × application. Returns
+    {"scenarios": one row per scenario and impact (mean, std dev, 95% CI),
+     "differences": material pairs within each route / application,
+     "num_runs", "sampling"}.
+    """
+    grid = scenario_grid(materials, routes, applications)
+    means = scenario_means(grid, region)
+    scales = means * UNCERTAINTY_FRACTION
+    materials, codes = _material_codes(grid)
+    draws = material_draws(materials, num_runs, seed, region, sampling)
+    lower, upper = np.percentile(draws, (PERCENTILES[0], PERCENTILES[-1]), axis=-1)
+    ci_lower, ci_upper = affine_interval(means, scales, lower[codes], upper[codes])
+    scenarios = _long_frame({field: grid[field].to_numpy() for field in SCENARIO_FIELDS}, {
+        "Mean": means + scales * draws.mean(axis=-1)[codes],
+        "Std Dev": np.abs(scales) * draws.std(axis=-1)[codes],
+        "CI Lower": ci_lower,
+        "CI Upper": ci_upper,
+    })
+    return {
+        "scenarios": scenarios,
+        "differences": pairwise_differences(grid, means, draws, codes, material_pairs(grid)),
+        "num_runs": num_runs,
+        "sampling": sampling,
+    }
@@ -0,0 +1,334 @@
+"""
+Scenario matrix sweeps: material × region × production process ×
+end-of-life scenario × secondary content, thousands of scenarios per run.
+
+The grid is split into material × region blocks. A process pool evaluates
+them with the batched scenario core, and every finished task is written
+straight to a Parquet part of the sweep's result cube under
+SWEEP_DIR/<key>.partial-*, so memory stays flat and progress shows while
+the pool runs. The complete cube is renamed to SWEEP_DIR/<key>. Keys hash
+the grid, the run options, the factor store digest and the correlation
+matrices, so re-running a sweep, or slicing one into heatmaps and pivot
+tables, reads the cube instead of recomputing. Never imports Streamlit.
+
+    python scenario_sweep.py --materials Steel Aluminium --workers 8
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from factor_store import DATA_DIR, MATERIALS, ORE_AUTOFILLS, canonical_material, default_store
+from inventory import GRID_INTENSITY, factor_matrices
+from lca_engine import (
+    DEFAULT_SAMPLING,
+    DEFAULT_SEED,
+    IMPACT_NAMES,
+    PERCENTILES,
+    SAMPLING_METHODS,
+    STUDY_DEFAULTS,
+    UNCERTAINTY_FRACTION,
+    correlation_matrix,
+    impact_model,
+)
+from scenario_compare import affine_interval, material_draws
+
+SWEEP_DIR = Path(os.environ.get("METALLIQ_SWEEP_DIR", DATA_DIR / "sweeps"))
+SWEEP_VERSION = 1       # bump when sweep results change so existing cubes are not reused
+MANIFEST = "_manifest.json"   # leading underscore: skipped when the cube is read as a Parquet dataset
+
+# --- Sweep axes: option -> model parameters ---
+PRODUCTION_PROCESSES = {   # process energy efficiency (%) of the route's main operations
+    "Primary Route (BF-BOF)": 85.0,
+    "Secondary Route (EAF)": 92.0,
+    "Smelting": 78.0,
+    "Casting": 88.0,
+}
+END_OF_LIFE = {            # share of the product recovered as scrap at end of life
+    "90% Recycled": 0.9,
+    "50/50 Landfill": 0.5,
+    "100% Landfill": 0.0,
+}
+SECONDARY_CONTENTS = (0.0, 25.0, 50.0, 75.0, 100.0)   # %
+REGIONAL_GRIDS = {         # region -> grid mix; other regions use the national average
+    "South India": "India - Southern",
+    "Tamil Nadu": "India - Southern",
+    "Karnataka": "India - Southern",
+    "Andhra Pradesh": "India - Southern",
+    "Telangana": "India - Southern",
+    "West India": "India - Western",
+    "Maharashtra": "India - Western",
+    "Gujarat": "India - Western",
+    "Chhattisgarh": "India - Western",
+    "Central India": "India - Western",
+}
+DIMENSIONS = ("Material", "Region", "Process", "End of Life", "Secondary Content")
+VALUES = ("Mean", "CI Lower", "CI Upper")
+
+SWEEP_RUNS = 2000
+TASKS_PER_WORKER = 4    # pool tasks (= cube parts) per worker, for load balancing
+
+
+def sweep_spec(materials, regions=None, processes=None, end_of_life=None,
+               secondary_contents=SECONDARY_CONTENTS, num_runs=SWEEP_RUNS, seed=DEFAULT_SEED,
+               sampling=DEFAULT_SAMPLING):
+    """
+    Canonical sweep definition; None means every option of that axis.
+    Options are put in a fixed order so equal grids get the same cube.
+    Raises ValueError for unknown materials, regions, processes or scenarios
+    and for an empty axis, which would give a cube with no rows.
+    """
+    def pick(selected, options, axis):
+        selected = list(options) if selected is None else list(selected)
+        unknown = sorted(set(selected) - set(options))
+        if unknown:
+            raise ValueError(f"Unknown {axis}: {', '.join(map(str, unknown))}")
+        if not selected:
+            raise ValueError(f"Select at least one {axis}")
+        return [o for o in options if o in selected]
+
+    if sampling not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method {sampling!r}; expected one of {SAMPLING_METHODS}")
+    if not len(secondary_contents):
+        raise ValueError("Select at least one secondary content level")
+    return {
+        "materials": pick([canonical_material(m) for m in materials], MATERIALS, "material"),
+        "regions": pick(regions, ORE_AUTOFILLS, "region"),
+        "processes": pick(processes, PRODUCTION_PROCESSES, "production process"),
+        "end_of_life": pick(end_of_life, END_OF_LIFE, "end-of-life scenario"),
+        "secondary_contents": sorted({float(np.clip(c, 0.0, 100.0)) for c in secondary_contents}),
+        "num_runs": int(num_runs),
+        "seed": seed,
+        "sampling": sampling,
+    }
+
+
+def scenario_count(spec):
+    """Number of scenarios in a sweep."""
+    return int(np.prod([len(spec[axis]) for axis in
+                        ("materials", "regions", "processes", "end_of_life", "secondary_contents")]))
+
+
+def sweep_key(spec):
+    """Hash of everything that determines a sweep's cube."""
+    payload = {
+        "version": SWEEP_VERSION,
+        "spec": spec,
+        "factors": default_store().meta["digest"],
+        # matrices can be registered at runtime, so key on the values themselves
+        "correlation": [correlation_matrix(m, r).round(6).tolist()
+                        for m, r in product(spec["materials"], spec["regions"])],
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:24]
+
+
+# --- Evaluation ---
+@lru_cache(maxsize=1024)
+def _draw_interval(material, region, num_runs, seed, sampling):
+    # 95% interval of the material's correlated draws; one shared z for the whole sweep
+    draws = material_draws([material], num_runs, seed, region, sampling)[0]
+    return tuple(np.percentile(draws, (PERCENTILES[0], PERCENTILES[-1]), axis=-1))
+
+
+def evaluate_block(material, region, spec):
+    """
+    Cube rows of one material and region: every process × end of life ×
+    secondary content × impact. End-of-life recycling earns the avoided
+    primary production of the net scrap, max(recovered - content, 0).
+    """
+    processes, content = spec["processes"], np.asarray(spec["secondary_contents"])
+    n_p, n_s = len(processes), len(content)
+    efficiency = np.array([PRODUCTION_PROCESSES[p] for p in processes])
+    # gate impacts of every process × content, then each process's pure primary / secondary route
+    sec = np.concatenate([np.tile(content, n_p), np.zeros(n_p), np.full(n_p, 100.0)])
+    proceff = np.concatenate([np.repeat(efficiency, n_s), efficiency, efficiency])
+    grid = GRID_INTENSITY[REGIONAL_GRIDS.get(region, "India - Grid Average")]
+    h = impact_model(float(ORE_AUTOFILLS[region]["concentration"]), sec, proceff, STUDY_DEFAULTS["transport1_dist"],
+                     grid, factor_matrices(material, region)[2])
+    gate = h[:n_p * n_s].reshape(n_p, n_s, -1)
+    avoided = h[n_p * n_s:n_p * n_s + n_p] - h[n_p * n_s + n_p:]
+    recovered = np.array([END_OF_LIFE[e] for e in spec["end_of_life"]])
+    net_scrap = np.maximum(recovered[:, None] - content[None, :] / 100.0, 0.0)
+    mean = gate[:, None] - net_scrap[None, :, :, None] * avoided[:, None, None, :]   # (process, eol, content, impact)
+
+    lower, upper = _draw_interval(material, region, spec["num_runs"], spec["seed"], spec["sampling"])
+    ci_lower, ci_upper = affine_interval(mean, mean * UNCERTAINTY_FRACTION, lower, upper)
+    p, e, s, i = np.indices(mean.shape).reshape(4, -1)
+    return pd.DataFrame({
+        "Material": material,
+        "Region": region,
+        "Process": np.asarray(processes)[p],
+        "End of Life": np.asarray(spec["end_of_life"])[e],
+        "Secondary Content": content[s],
+        "Impact": np.asarray(IMPACT_NAMES)[i],
+        "Mean": mean.ravel(),
+        "CI Lower": ci_lower.ravel(),
+        "CI Upper": ci_upper.ravel(),
+    })
+
+
+def _evaluate_task(args):
+    """Process-pool entry point: one cube part from a run of blocks."""
+    blocks, spec = args
+    return pd.concat([evaluate_block(m, r, spec) for m, r in blocks], ignore_index=True)
+
+
+def _write_part(frame, path):
+    categorical = {dim: "category" for dim in DIMENSIONS if dim != "Secondary Content"}
+    frame.astype({**categorical, "Impact": "category"}).to_parquet(path, index=False)
+
+
+# --- Result cubes ---
+def cube_path(key, directory=None):
+    return Path(directory or SWEEP_DIR) / key
+
+
+def load_manifest(key, directory=None):
+    """Manifest of a complete cube, or None if it has not been built."""
+    try:
+        return json.loads((cube_path(key, directory) / MANIFEST).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def run_sweep(spec, workers=None, progress=None, directory=None):
+    """
+    Build the result cube of a sweep_spec and return its manifest. Blocks
+    are fanned out over a process pool (workers > 1) and every finished
+    task is written as its own part. An existing cube is returned as is.
+    progress, if given, is called with the completed fraction (0..1).
+    """
+    key = sweep_key(spec)
+    manifest = load_manifest(key, directory)
+    if manifest is None:
+        manifest = _build_cube(spec, key, workers, progress, Path(directory or SWEEP_DIR))
+    if progress:
+        progress(1.0)
+    return manifest
+
+
+def _build_cube(spec, key, workers, progress, directory):
+    start = time.perf_counter()
+    blocks = list(product(spec["materials"], spec["regions"]))
+    workers = workers or os.cpu_count() or 1
+    bounds = np.linspace(0, len(blocks), min(len(blocks), workers * TASKS_PER_WORKER) + 1).astype(int)
+    tasks = [(blocks[lo:hi], spec) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    staging = directory / f"{key}.partial-{uuid.uuid4().hex[:8]}"   # one per concurrent build
+    staging.mkdir(parents=True)
+    try:
+        rows = 0
+        if workers == 1 or len(tasks) == 1:
+            results = ((i, _evaluate_task(task)) for i, task in enumerate(tasks))
+            for done, (i, frame) in enumerate(results, 1):
+                _write_part(frame, staging / f"part-{i:05d}.parquet")
+                rows += len(frame)
+                if progress:
+                    progress(done / len(tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_evaluate_task, task): i for i, task in enumerate(tasks)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    frame = future.result()
+                    _write_part(frame, staging / f"part-{futures[future]:05d}.parquet")
+                    rows += len(frame)
+                    if progress:
+                        progress(done / len(tasks))
+        manifest = {
+            "key": key,
+            "spec": spec,
+            "scenarios": scenario_count(spec),
+            "rows": rows,
+            "parts": len(tasks),
+            "workers": workers,
+            "seconds": round(time.perf_counter() - start, 3),
+            "created_at": time.time(),
+        }
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        try:
+            staging.rename(cube_path(key, directory))
+        except OSError:
+            # an identical sweep finished first; keep its cube
+            shutil.rmtree(staging)
+            return load_manifest(key, directory) or manifest
+        return manifest
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+@lru_cache(maxsize=8)
+def _read_cube(path):
+    return pd.read_parquet(path)
+
+
+def load_cube(key, directory=None):
+    """Every row of a complete cube (cached per process: cubes never change once built)."""
+    if load_manifest(key, directory) is None:
+        raise FileNotFoundError(f"No complete scenario sweep {key}")
+    return _read_cube(str(cube_path(key, directory)))
+
+
+def cube_slice(key, impact=None, filters=None, directory=None):
+    """Cube rows for one impact (or all) where each filtered dimension takes one of the given values."""
+    cube = load_cube(key, directory)
+    mask = np.ones(len(cube), dtype=bool)
+    if impact is not None:
+        mask &= (cube["Impact"] == impact).to_numpy()
+    for dim, values in (filters or {}).items():
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        mask &= cube[dim].isin(values).to_numpy()
+    return cube[mask]
+
+
+def cube_pivot(key, index, columns, impact, value="Mean", filters=None, directory=None):
+    """
+    index × columns table of one impact, e.g. Region × Material for a
+    heatmap. Dimensions that are neither on an axis nor filtered to a
+    single value are averaged over.
+    """
+    rows = cube_slice(key, impact, filters, directory)
+    table = rows.pivot_table(index=index, columns=columns, values=value, aggfunc="mean", observed=True)
+    # plain axis labels: categorical axes do not survive Arrow round trips (st.dataframe)
+    table.index, table.columns = (pd.Index(list(axis), name=axis.name) for axis in (table.index, table.columns))
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep a scenario grid into a Parquet result cube.")
+    parser.add_argument("--materials", nargs="+", default=["Steel"], help=f"materials to sweep: {', '.join(MATERIALS)}")
+    parser.add_argument("--regions", nargs="+", default=None, help="regions (default: all ore regions)")
+    parser.add_argument("--processes", nargs="+", default=None, help="production processes (default: all)")
+    parser.add_argument("--end-of-life", nargs="+", default=None, help="end-of-life scenarios (default: all)")
+    parser.add_argument("--contents", nargs="+", type=float, default=SECONDARY_CONTENTS,
+                        help="secondary material contents in %%")
+    parser.add_argument("--runs", type=int, default=SWEEP_RUNS, help="Monte Carlo runs for the intervals")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = sweep_spec(args.materials, args.regions, args.processes, args.end_of_life, args.contents,
+                          args.runs, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    manifest = run_sweep(spec, workers=args.workers)
+    print(f"{manifest['scenarios']:,} scenarios ({manifest['rows']:,} rows, {manifest['parts']} parts) "
+          f"in {manifest['seconds']:.1f}s -> {cube_path(manifest['key'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
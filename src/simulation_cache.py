@@ -0,0 +1,142 @@
+"""
+Content-addressed cache for simulation results.
+
+Keys are a SHA-256 of the normalized study inputs (only the fields
+simulate_study reads), the impact correlation matrix, the factor store
+digest, the seed, num_runs and the sampling options.
+Two tiers:
+- an in-process LRU shared by every session of this server
+- an on-disk store that survives restarts, evicted oldest-first by size
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from factor_store import default_store
+from lca_engine import DEFAULT_SEED, correlation_matrix, normalize_inputs, simulate_study
+
+# Bump when the simulation output changes so stale disk entries are ignored.
+CACHE_VERSION = 13
+
+CACHE_DIR = Path(os.environ.get("METALLIQ_CACHE_DIR", Path(__file__).parent / ".cache" / "simulations"))
+MEMORY_ENTRIES = 64
+DISK_MAX_BYTES = 256 * 1024 * 1024
+
+
+def study_key(inputs, num_runs, seed, **options):
+    """Canonical hash of everything that determines a simulation result."""
+    inputs = normalize_inputs(inputs)
+    payload = {
+        "version": CACHE_VERSION,
+        "inputs": inputs,
+        # matrices can be registered at runtime, so key on the values themselves
+        "correlation": correlation_matrix(inputs["material"], inputs["region"]).round(6).tolist(),
+        "factors": default_store().meta["digest"],
+        "num_runs": int(num_runs),
+        "seed": seed,
+        "options": {k: v for k, v in options.items() if v is not None},
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SimulationCache:
+    """Two-tier (memory LRU + disk) store of results dicts keyed by study_key."""
+
+    def __init__(self, directory=CACHE_DIR, memory_entries=MEMORY_ENTRIES, disk_max_bytes=DISK_MAX_BYTES):
+        self.directory = Path(directory)
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._evict()
+        except OSError:
+            pass  # disk tier is best-effort; memory tier still holds the entry
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+simulation_cache = SimulationCache()
+
+
+def cached_simulation(inputs, num_runs=1000, seed=DEFAULT_SEED, progress=None, graph=None, **options):
+    """
+    simulate_study with caching. Unseeded runs are not reproducible and
+    therefore never cached. Callers get a private copy of the result.
+    A StudyGraph built with the same options may be passed to compute
+    misses incrementally; its results equal simulate_study's.
+    """
+    def compute():
+        if graph is not None:
+            return graph.evaluate(inputs, progress)
+        return simulate_study(inputs, num_runs=num_runs, seed=seed, progress=progress, **options)
+
+    if seed is None:
+        return compute()
+    key = study_key(inputs, num_runs, seed, **options)
+    results = simulation_cache.get(key)
+    if results is None:
+        results = compute()
+        simulation_cache.put(key, results)
+    elif progress:
+        progress(1.0)
+    return copy.deepcopy(results)
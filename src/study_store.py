@@ -0,0 +1,391 @@
+"""
+Persistent store for studies, result summaries, sample blobs and comments.
+
+One embedded SQLite database in WAL mode, so the Streamlit script thread,
+job threads and other server processes can read while a study is being
+written. Each thread gets its own connection. Tables:
+- studies: one row per study (workspace entry or completed simulation),
+  with indexed author, material, created_at and gwp columns, the inputs,
+  a JSON result summary and a stable integer search_id for the FTS index
+- samples: Monte Carlo preview arrays as raw float32 blobs
+- comments: workspace discussion threads
+- studies_fts / comments_fts: FTS5 indexes over study titles, goal & scope
+  text, AI interpretations and comments, updated in the same transaction
+  as every save, for ranked search() with highlighted snippets
+Never imports Streamlit.
+"""
+
+import html
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+DB_PATH = Path(os.environ.get("METALLIQ_DB_PATH", Path(__file__).parent / "data" / "metalliq.db"))
+BUSY_TIMEOUT_MS = 5000
+SCHEMA_VERSION = 4
+PAGE_SIZE = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS studies (
+    study_id   TEXT PRIMARY KEY,
+    title      TEXT NOT NULL,
+    author     TEXT NOT NULL DEFAULT '',
+    material   TEXT,
+    region     TEXT,
+    status     TEXT NOT NULL DEFAULT 'Completed',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    gwp        REAL,
+    inputs     TEXT NOT NULL DEFAULT '{}',
+    summary    TEXT,
+    search_id  INTEGER
+);
+-- study_id completes every index so keyset pages never need a sort step
+CREATE INDEX IF NOT EXISTS studies_author   ON studies(author, created_at, study_id);
+CREATE INDEX IF NOT EXISTS studies_material ON studies(material, created_at, study_id);
+CREATE INDEX IF NOT EXISTS studies_created  ON studies(created_at, study_id);
+CREATE INDEX IF NOT EXISTS studies_gwp      ON studies(gwp, study_id);
+CREATE UNIQUE INDEX IF NOT EXISTS studies_search ON studies(search_id);
+
+CREATE TABLE IF NOT EXISTS samples (
+    study_id TEXT NOT NULL REFERENCES studies(study_id) ON DELETE CASCADE,
+    name     TEXT NOT NULL,
+    dtype    TEXT NOT NULL,
+    data     BLOB NOT NULL,
+    PRIMARY KEY (study_id, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id INTEGER PRIMARY KEY,
+    study_id   TEXT NOT NULL REFERENCES studies(study_id) ON DELETE CASCADE,
+    author     TEXT NOT NULL,
+    body       TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS comments_study ON comments(study_id, created_at);
+
+-- full-text indexes; rowid = studies.search_id / comments.comment_id (explicit keys: VACUUM may
+-- renumber the implicit rowid of studies, whose primary key is TEXT)
+CREATE VIRTUAL TABLE IF NOT EXISTS studies_fts USING fts5(
+    title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4');
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+    body, tokenize='unicode61 remove_diacritics 2', prefix='2 3 4');
+"""
+
+# Statements run before SCHEMA when upgrading from an older user_version
+MIGRATIONS = {
+    2: """
+    DROP INDEX IF EXISTS studies_author;
+    DROP INDEX IF EXISTS studies_material;
+    DROP INDEX IF EXISTS studies_created;
+    DROP INDEX IF EXISTS studies_gwp;
+    """,
+    3: "",  # search tables are created by SCHEMA and filled by _reindex
+    4: """
+    ALTER TABLE studies ADD COLUMN search_id INTEGER;
+    UPDATE studies SET search_id = rowid;
+    """,
+}
+
+# Report listing orders: name -> (column, descending)
+SORT_ORDERS = {
+    "newest": ("created_at", True),
+    "oldest": ("created_at", False),
+    "gwp_high": ("gwp", True),
+    "gwp_low": ("gwp", False),
+}
+
+# Input fields indexed for search alongside the title, goal & scope and AI interpretation
+SEARCH_INPUT_FIELDS = (
+    "intended_app", "intended_audience", "system_boundary", "study_limitations", "functional_unit",
+    "production_process", "end_life_scenario", "material", "region",
+)
+SEARCH_LIMIT = 20
+SNIPPET_TOKENS = 16
+STUDY_RANK = "bm25(5.0, 1.0)"   # study ranking function: titles weigh 5x the body
+MIN_PREFIX = 2
+# Snippet highlight markers, swapped for <mark> after HTML-escaping
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+# Result keys kept in the JSON summary (sample arrays go to the samples table)
+SUMMARY_KEYS = (
+    "goal_scope", "executive_summary", "data_quality", "circularity", "impacts",
+    "primary_vs_recycled", "ai_lifecycle_interpretation", "impact_statistics",
+    "num_runs", "sampling", "gwp_contribution_analysis", "energy_source_breakdown",
+)
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialized = set()
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def connection(path=None):
+    """This thread's connection to the store, creating the schema on first use."""
+    path = Path(path or DB_PATH)
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get(path)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        with _schema_lock:
+            if path not in _initialized:
+                _migrate(conn)
+                _initialized.add(path)
+        conns[path] = conn
+    return conn
+
+
+def _migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target in sorted(MIGRATIONS):
+        if 0 < version < target:
+            conn.executescript(MIGRATIONS[target])
+    conn.executescript(SCHEMA)
+    if 0 < version < 4:
+        _reindex(conn)
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+# --- Studies ---
+def save_study(study_id, inputs, results=None, author="", title=None, status="Completed", path=None):
+    """
+    Insert or replace a study with its inputs, result summary and sample
+    previews; returns the study id. created_at is kept on updates.
+    """
+    now = time.time()
+    inputs = dict(inputs or {})
+    title = title or inputs.get("project_name") or f"{inputs.get('material', 'LCA')} Study"
+    gwp, summary = None, None
+    if results:
+        gwp = results.get("impacts", {}).get("Global Warming Potential")
+        summary = json.dumps({k: results[k] for k in SUMMARY_KEYS if k in results}, default=_jsonable)
+    conn = connection(path)
+    with conn:
+        conn.execute(
+            """INSERT INTO studies (study_id, title, author, material, region, status, created_at, updated_at,
+                                    gwp, inputs, summary, search_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(search_id), 0) + 1 FROM studies))
+               ON CONFLICT(study_id) DO UPDATE SET
+                   title=excluded.title, author=excluded.author, material=excluded.material,
+                   region=excluded.region, status=excluded.status, updated_at=excluded.updated_at,
+                   gwp=COALESCE(excluded.gwp, gwp), inputs=excluded.inputs,
+                   summary=COALESCE(excluded.summary, summary)""",
+            (study_id, title, author or "", inputs.get("material"), inputs.get("region"), status, now, now,
+             None if gwp is None else float(gwp), json.dumps(inputs, default=_jsonable), summary),
+        )
+        _index_study(conn, study_id)
+        if results:
+            conn.executemany(
+                "INSERT OR REPLACE INTO samples (study_id, name, dtype, data) VALUES (?, ?, ?, ?)",
+                [(study_id, name, np.asarray(values).dtype.str, np.ascontiguousarray(values).tobytes())
+                 for name, values in results.get("uncertainty_dashboard", {}).items()],
+            )
+    return study_id
+
+
+def create_study(title, author, status="Active", path=None):
+    """A new workspace study without results; returns its id."""
+    return save_study(uuid.uuid4().hex[:12], {}, title=title, author=author, status=status, path=path)
+
+
+def set_status(study_id, status, path=None):
+    conn = connection(path)
+    with conn:
+        conn.execute("UPDATE studies SET status=?, updated_at=? WHERE study_id=?", (status, time.time(), study_id))
+
+
+def _study_row(row, full=False):
+    study = {k: row[k] for k in ("study_id", "title", "author", "material", "region", "status",
+                                 "created_at", "updated_at", "gwp")}
+    if full:
+        study["inputs"] = json.loads(row["inputs"])
+        study["summary"] = json.loads(row["summary"]) if row["summary"] else None
+    return study
+
+
+def get_study(study_id, path=None):
+    """A stored study with inputs, summary and sample arrays, or None."""
+    conn = connection(path)
+    row = conn.execute("SELECT * FROM studies WHERE study_id=?", (study_id,)).fetchone()
+    if row is None:
+        return None
+    study = _study_row(row, full=True)
+    study["samples"] = {
+        s["name"]: np.frombuffer(s["data"], dtype=s["dtype"])
+        for s in conn.execute("SELECT name, dtype, data FROM samples WHERE study_id=?", (study_id,))
+    }
+    return study
+
+
+def list_studies(limit=100, with_results=False, path=None):
+    """Most recent studies first (no inputs or summaries)."""
+    return query_studies(limit=limit, with_results=with_results, path=path)[0]
+
+
+def query_studies(author=None, material=None, since=None, until=None, gwp_min=None, gwp_max=None,
+                  sort="newest", after=None, limit=PAGE_SIZE, with_results=True, path=None):
+    """
+    One page of studies matching the filters, in SORT_ORDERS[sort] order,
+    as (studies, cursor). since / until bound created_at (unix seconds,
+    until exclusive). Pass the returned cursor as `after` for the next page;
+    it is None on the last page. Keyset pagination: every page is an index
+    range scan of `limit` rows, however deep it is.
+    """
+    column, descending = SORT_ORDERS[sort]
+    clauses, params = [], []
+    for sql, value in (("author = ?", author), ("material = ?", material), ("created_at >= ?", since),
+                       ("created_at < ?", until), ("gwp >= ?", gwp_min), ("gwp <= ?", gwp_max)):
+        if value is not None:
+            clauses.append(sql)
+            params.append(value)
+    if with_results:
+        clauses.append("summary IS NOT NULL")
+    if column == "gwp":
+        clauses.append("gwp IS NOT NULL")
+    if after is not None:
+        clauses.append(f"({column}, study_id) {'<' if descending else '>'} (?, ?)")
+        params += list(after)
+    direction = "DESC" if descending else "ASC"
+    rows = connection(path).execute(
+        f"SELECT study_id, title, author, material, region, status, created_at, updated_at, gwp FROM studies"
+        f"{' WHERE ' + ' AND '.join(clauses) if clauses else ''}"
+        f" ORDER BY {column} {direction}, study_id {direction} LIMIT ?",
+        params + [int(limit) + 1],
+    ).fetchall()
+    studies = [_study_row(row) for row in rows[:limit]]
+    cursor = (studies[-1][column], studies[-1]["study_id"]) if len(rows) > limit else None
+    return studies, cursor
+
+
+def distinct_values(column, path=None):
+    """Sorted distinct authors or materials, for filter choices (reads only the index)."""
+    if column not in ("author", "material"):
+        raise ValueError(f"Unknown filter column {column!r}")
+    rows = connection(path).execute(f"SELECT DISTINCT {column} FROM studies WHERE {column} IS NOT NULL "
+                                    f"AND {column} != '' ORDER BY {column}")
+    return [row[0] for row in rows]
+
+
+def count_studies(path=None):
+    return connection(path).execute("SELECT COUNT(*) FROM studies").fetchone()[0]
+
+
+# --- Comments ---
+def add_comment(study_id, author, body, path=None):
+    conn = connection(path)
+    with conn:
+        cur = conn.execute("INSERT INTO comments (study_id, author, body, created_at) VALUES (?, ?, ?, ?)",
+                           (study_id, author, body, time.time()))
+        conn.execute("INSERT INTO comments_fts (rowid, body) VALUES (?, ?)", (cur.lastrowid, f"{author}\n{body}"))
+        conn.execute("UPDATE studies SET updated_at=? WHERE study_id=?", (time.time(), study_id))
+    return cur.lastrowid
+
+
+def list_comments(study_id, path=None):
+    """A study's comments, oldest first."""
+    rows = connection(path).execute(
+        "SELECT comment_id, author, body, created_at FROM comments WHERE study_id=? ORDER BY created_at, comment_id",
+        (study_id,))
+    return [dict(row) for row in rows]
+
+
+# --- Full-text search ---
+def _search_text(row):
+    """Searchable body of a studies row: inputs, goal & scope, AI interpretation, author."""
+    inputs = json.loads(row["inputs"] or "{}")
+    summary = json.loads(row["summary"]) if row["summary"] else {}
+    parts = [row["author"]] + [str(inputs[k]) for k in SEARCH_INPUT_FIELDS if inputs.get(k)]
+    parts += [str(v) for v in (summary.get("goal_scope") or {}).values()]
+    interpretation = summary.get("ai_lifecycle_interpretation")
+    if interpretation:
+        parts.append(interpretation if isinstance(interpretation, str) else json.dumps(interpretation))
+    return "\n".join(parts)
+
+
+def _index_study(conn, study_id):
+    row = conn.execute("SELECT search_id, title, author, inputs, summary FROM studies WHERE study_id=?",
+                       (study_id,)).fetchone()
+    conn.execute("INSERT OR REPLACE INTO studies_fts (rowid, title, body) VALUES (?, ?, ?)",
+                 (row["search_id"], row["title"], _search_text(row)))
+
+
+def _reindex(conn):
+    """Rebuild both search indexes from the base tables."""
+    conn.execute("DELETE FROM studies_fts")
+    conn.execute("DELETE FROM comments_fts")
+    conn.executemany("INSERT INTO studies_fts (rowid, title, body) VALUES (?, ?, ?)",
+                     ((row["search_id"], row["title"], _search_text(row))
+                      for row in conn.execute("SELECT search_id, title, author, inputs, summary FROM studies")))
+    conn.execute("INSERT INTO comments_fts (rowid, body) SELECT comment_id, author || char(10) || body FROM comments")
+    conn.commit()
+
+
+def rebuild_search_index(path=None):
+    _reindex(connection(path))
+
+
+def fts_query(text):
+    """
+    FTS5 MATCH expression for free text: every word must match, words of
+    MIN_PREFIX+ characters as a prefix ("recycl" finds recycled, recycling).
+    None if there are no words.
+    """
+    words = re.findall(r"\w+", text or "")
+    return " ".join(f'"{w}"*' if len(w) >= MIN_PREFIX else f'"{w}"' for w in words) or None
+
+
+def _highlight(snippet):
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search(text, limit=SEARCH_LIMIT, path=None):
+    """
+    Studies and comments matching `text`. Each table is ranked by BM25 over
+    every match (study titles weigh 5x) and the two rankings are
+    interleaved, since BM25 scores from different indexes are not
+    comparable. Each hit has kind ("study" / "comment"), the study fields
+    and an HTML-safe snippet with <mark> highlights.
+    """
+    match = fts_query(text)
+    if match is None:
+        return []
+    marks = (_MARK_START, _MARK_END, "…", SNIPPET_TOKENS)
+    # ORDER BY rank LIMIT is FTS5's top-N sort over the full match set; snippets
+    # are built for the returned rows only
+    rows = connection(path).execute(
+        """WITH top_studies AS (
+               SELECT rowid, rank AS score, snippet(studies_fts, -1, ?, ?, ?, ?) AS snippet
+               FROM studies_fts WHERE studies_fts MATCH ? AND rank MATCH ? ORDER BY rank LIMIT ?),
+           top_comments AS (
+               SELECT rowid, rank AS score, snippet(comments_fts, 0, ?, ?, ?, ?) AS snippet
+               FROM comments_fts WHERE comments_fts MATCH ? ORDER BY rank LIMIT ?)
+           SELECT 'study' AS kind, s.study_id, s.title, s.author, s.material, s.created_at, s.gwp,
+                  t.score AS score, t.snippet AS snippet, ROW_NUMBER() OVER (ORDER BY t.score) AS position
+           FROM top_studies t JOIN studies s ON s.search_id = t.rowid
+           UNION ALL
+           SELECT 'comment', s.study_id, s.title, c.author, s.material, c.created_at, s.gwp, t.score, t.snippet,
+                  ROW_NUMBER() OVER (ORDER BY t.score)
+           FROM top_comments t JOIN comments c ON c.comment_id = t.rowid JOIN studies s ON s.study_id = c.study_id
+           ORDER BY position, kind DESC LIMIT ?""",
+        (*marks, match, STUDY_RANK, limit, *marks, match, limit, limit),
+    ).fetchall()
+    return [dict(row, snippet=_highlight(row["snippet"])) for row in rows]
@@ -0,0 +1,122 @@
+"""
+Multi-leg transport model.
+
+A study's transport chain is a list of legs (mode, fuel, distance, payload).
+Per-t·km factors live in one table indexed [mode, fuel, column]; every leg
+of a chain, however many, is evaluated with a single fancy-indexed lookup
+and multiply. Electric legs draw grid electricity (handled by the inventory
+as a technosphere input); diesel legs emit combustion flows directly.
+NumPy only.
+"""
+
+import json
+from functools import lru_cache
+
+import numpy as np
+
+MODES = ("Truck", "Train", "Ship")
+FUELS = ("Diesel", "Electric")
+MODE_INDEX = {name: i for i, name in enumerate(MODES)}
+FUEL_INDEX = {name: i for i, name in enumerate(FUELS)}
+
+# Normalized leg: (mode, fuel, distance_km, payload_t); payload is tons moved per ton of product.
+LEG_FIELDS = ("mode", "fuel", "distance_km", "payload_t")
+DEFAULT_LEG = ("Truck", "Diesel", 75.0, 1.0)
+
+# --- Energy use per t·km, [mode, fuel] ---
+DIESEL_MJ_PER_TKM = np.array([
+    [1.45, 0.0],    # Truck
+    [0.25, 0.0],    # Train
+    [0.12, 0.0],    # Ship
+])
+ELECTRICITY_KWH_PER_TKM = np.array([
+    [0.0, 0.12],
+    [0.0, 0.045],
+    [0.0, 0.03],
+])
+# --- Direct combustion flows per MJ of fuel burned, per mode ---
+COMBUSTION_FLOWS = ("Carbon dioxide, fossil", "Nitrogen oxides", "Sulfur dioxide",
+                    "Particulates, < 2.5 um", "Energy, fossil")
+COMBUSTION_PER_MJ = np.array([
+    [0.0724, 0.000483, 0.0, 0.0000138, 1.0],    # Truck, road diesel
+    [0.0724, 0.0010, 0.0, 0.00003, 1.0],        # Train, rail diesel
+    [0.0770, 0.0015, 0.0005, 0.0001, 1.0],      # Ship, marine fuel
+])
+
+# One indexed table: [mode, fuel, column] per t·km, columns = TABLE_COLUMNS.
+TABLE_COLUMNS = ("Electricity",) + COMBUSTION_FLOWS
+FACTOR_TABLE = np.concatenate([
+    ELECTRICITY_KWH_PER_TKM[..., None],
+    DIESEL_MJ_PER_TKM[..., None] * COMBUSTION_PER_MJ[:, None, :],
+], axis=2)
+
+
+def _leg_value(leg, i):
+    """Field i of a leg dict or sequence; None when missing, None or NaN."""
+    if isinstance(leg, dict):
+        value = leg.get(LEG_FIELDS[i])
+    else:
+        value = leg[i] if i < len(leg) else None
+    return None if value is None or value != value else value
+
+
+def normalize_legs(legs):
+    """
+    Canonical, hashable tuple of (mode, fuel, distance_km, payload_t) legs.
+    Accepts a list of dicts or sequences, a DataFrame, or a JSON string.
+    Rows without a distance (e.g. blank editor rows) are dropped, a missing
+    payload means 1 t; unknown modes or fuels and negative or non-finite
+    distances or payloads raise ValueError.
+    """
+    if legs is None:
+        return ()
+    if isinstance(legs, str):
+        legs = json.loads(legs) if legs.strip() else []
+    if hasattr(legs, "to_dict"):
+        legs = legs.to_dict("records")
+    out = []
+    for i, leg in enumerate(legs):
+        distance = _leg_value(leg, 2)
+        if distance is None:
+            continue
+        mode = str(_leg_value(leg, 0) or DEFAULT_LEG[0]).strip()
+        fuel = str(_leg_value(leg, 1) or DEFAULT_LEG[1]).strip()
+        if mode not in MODE_INDEX or fuel not in FUEL_INDEX:
+            raise ValueError(f"Unknown transport leg {mode!r}/{fuel!r}; modes {MODES}, fuels {FUELS}")
+        payload = _leg_value(leg, 3)
+        distance, payload = float(distance), 1.0 if payload is None else float(payload)
+        if not (0.0 <= distance < np.inf and 0.0 <= payload < np.inf):
+            raise ValueError(f"Transport leg {i + 1}: distance ({distance:g} km) and payload ({payload:g} t) "
+                             "must be finite and not negative")
+        out.append((mode, fuel, distance, payload))
+    return tuple(out)
+
+
+def leg_arrays(legs):
+    """Column arrays (mode index, fuel index, t·km) of normalized legs."""
+    if not legs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    modes, fuels, distance, payload = zip(*legs)
+    mode_idx = np.fromiter((MODE_INDEX[m] for m in modes), dtype=np.int64, count=len(legs))
+    fuel_idx = np.fromiter((FUEL_INDEX[f] for f in fuels), dtype=np.int64, count=len(legs))
+    return mode_idx, fuel_idx, np.asarray(distance, dtype=float) * np.asarray(payload, dtype=float)
+
+
+def leg_burdens(legs):
+    """(n_legs, len(TABLE_COLUMNS)) electricity use and direct flows of every leg, in one lookup."""
+    mode_idx, fuel_idx, tkm = leg_arrays(legs)
+    return FACTOR_TABLE[mode_idx, fuel_idx] * tkm[:, None]
+
+
+@lru_cache(maxsize=1024)
+def chain_totals(legs):
+    """
+    Totals over a normalized leg chain: (t·km, kWh per t·km, {flow: amount per t·km}).
+    Per-t·km values are what the inventory's transport process needs.
+    """
+    _, _, tkm = leg_arrays(legs)
+    total_tkm = float(tkm.sum())
+    if total_tkm <= 0:
+        return 0.0, 0.0, dict(zip(COMBUSTION_FLOWS, FACTOR_TABLE[0, 0, 1:].tolist()))
+    per_tkm = leg_burdens(legs).sum(axis=0) / total_tkm
+    return total_tkm, float(per_tkm[0]), dict(zip(COMBUSTION_FLOWS, per_tkm[1:].tolist()))
@@ -1,7 +1,50 @@
 import streamlit as st
-import pandas as pd
 import datetime
-import random
+import html
+import time
+
+from study_store import PAGE_SIZE, distinct_values, query_studies, search
+
+ALL = "All"
+SORT_LABELS = {
+    "newest": "Newest first",
+    "oldest": "Oldest first",
+    "gwp_high": "Highest GWP",
+    "gwp_low": "Lowest GWP",
+}
+REPORT_CARD = """
+<div class="report-card">
+    <div class="report-header">
+        <div class="report-title">{Report Title}</div>
+        <div class="report-meta">{Date & Time}</div>
+    </div>
+    <div class="report-meta">
+        Author: <b>{Author}</b> &nbsp;|&nbsp;
+        Material: <b>{Material}</b> &nbsp;|&nbsp;
+        GWP: <b>{GWP}</b>
+    </div>
+    <div class="report-buttons">
+        <button class="btn-open">Open</button>
+        <button class="btn-comment">💬 Comments</button>
+    </div>
+</div>
+"""
+SEARCH_CARD = """
+<div class="report-card">
+    <div class="report-header">
+        <div class="report-title">{title}</div>
+        <div class="report-meta">{kind} · {date}</div>
+    </div>
+    <div class="report-meta">Author: <b>{author}</b> &nbsp;|&nbsp; Material: <b>{material}</b></div>
+    <div class="report-snippet">{snippet}</div>
+</div>
+"""
+SEARCH_CSS = """
+<style>
+.report-snippet { color: #24393b; font-size: 0.92rem; margin-top: 8px; }
+.report-snippet mark { background: #c9f5ee; color: #00494D; padding: 0 2px; border-radius: 3px; }
+</style>
+"""
 
 
 def view_reports_page():
@@ -38,28 +81,50 @@ def view_reports_page():
     </div>
     """, unsafe_allow_html=True)
 
-    # ======= DATA GENERATION =======
-    authors = ["John Doe", "Sarah Singh", "Alice Brown", "David Kumar", "Priya Patel", "Alex Wang"]
-    materials = ["Steel", "Aluminium", "Copper", "Cement", "Polymers (PET)"]
+    # ======= SEARCH =======
+    query = st.text_input("🔎 Search reports, goal & scope, AI interpretations and comments",
+                          key="reports_search", placeholder="e.g. chassis recycled content")
+    if query.strip():
+        _search_results(query)
+        return
+
+    # ======= FILTERS =======
+    f1, f2, f3, f4, f5 = st.columns([2, 2, 3, 2, 2])
+    with f1:
+        author = st.selectbox("Author", [ALL] + distinct_values("author"), key="reports_author")
+    with f2:
+        material = st.selectbox("Material", [ALL] + distinct_values("material"), key="reports_material")
+    with f3:
+        dates = st.date_input("Date range", value=(), key="reports_dates")
+    with f4:
+        gwp_max = st.number_input("Max GWP (kg CO₂-eq)", min_value=0.0, value=0.0, step=100.0,
+                                  help="0 = no limit", key="reports_gwp_max")
+    with f5:
+        sort = st.selectbox("Sort by", list(SORT_LABELS), format_func=SORT_LABELS.get, key="reports_sort")
 
-    def random_date():
-        base = datetime.datetime(2025, 9, 15)
-        days = random.randint(0, 20)
-        dt = base + datetime.timedelta(days=days)
-        time = datetime.time(random.randint(8, 18), random.choice([0, 15, 30, 45]))
-        return dt.replace(hour=time.hour, minute=time.minute)
+    since, until = _date_bounds(dates)
+    filters = {
+        "author": None if author == ALL else author,
+        "material": None if material == ALL else material,
+        "since": since, "until": until,
+        "gwp_max": gwp_max or None,
+        "sort": sort,
+    }
+    # keyset pagination: a stack of page-start cursors, reset when the filters change
+    if st.session_state.get("reports_filters") != filters:
+        st.session_state["reports_filters"] = filters
+        st.session_state["reports_cursors"] = [None]
+    cursors = st.session_state["reports_cursors"]
 
-    reports = []
-    for i in range(15):
-        reports.append({
-            "Sr No": i + 1,
-            "Report Title": f"LCA Study #{i + 1}",
-            "Author": random.choice(authors),
-            "Date & Time": random_date().strftime("%d/%m/%Y %H:%M"),
-            "Material": random.choice(materials),
-            "GWP": f"{random.randint(600, 3000)} kg CO₂-eq"
-        })
-    df = pd.DataFrame(reports)
+    # ======= DATA (one indexed page from the study store) =======
+    studies, next_cursor = query_studies(after=cursors[-1], limit=PAGE_SIZE, **filters)
+    reports = [{
+        "Report Title": html.escape(study["title"]),
+        "Author": html.escape(study["author"] or "—"),
+        "Date & Time": datetime.datetime.fromtimestamp(study["created_at"]).strftime("%d/%m/%Y %H:%M"),
+        "Material": html.escape(study["material"] or "—"),
+        "GWP": f"{study['gwp']:,.0f} kg CO₂-eq" if study["gwp"] is not None else "—",
+    } for study in studies]
 
     # ======= INLINE CSS =======
     st.markdown("""
@@ -126,22 +191,51 @@ def view_reports_page():
     </style>
     """, unsafe_allow_html=True)
 
-    # ======= REPORT CARDS =======
-    for _, row in df.iterrows():
-        st.markdown(f"""
-        <div class="report-card">
-            <div class="report-header">
-                <div class="report-title">{row['Report Title']}</div>
-                <div class="report-meta">{row['Date & Time']}</div>
-            </div>
-            <div class="report-meta">
-                Author: <b>{row['Author']}</b> &nbsp;|&nbsp; 
-                Material: <b>{row['Material']}</b> &nbsp;|&nbsp; 
-                GWP: <b>{row['GWP']}</b>
-            </div>
-            <div class="report-buttons">
-                <button class="btn-open">Open</button>
-                <button class="btn-comment">💬 Comments</button>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    # ======= REPORT CARDS (one markdown element per page) =======
+    if not reports:
+        st.info("No reports match these filters." if len(cursors) > 1 or any(
+            filters[k] for k in ("author", "material", "since", "gwp_max")) else
+            "No reports yet. Completed LCA studies appear here.")
+    else:
+        st.markdown("".join(REPORT_CARD.format(**row) for row in reports), unsafe_allow_html=True)
+
+    # ======= PAGINATION =======
+    p1, p2, p3 = st.columns([1, 2, 1])
+    with p1:
+        if st.button("← Previous", disabled=len(cursors) == 1, key="reports_prev"):
+            cursors.pop()
+            st.rerun()
+    with p2:
+        st.caption(f"Page {len(cursors)} · {len(reports)} reports")
+    with p3:
+        if st.button("Next →", disabled=next_cursor is None, key="reports_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+
+def _search_results(query):
+    """Ranked full-text hits with highlighted snippets, instead of the listing."""
+    start = time.perf_counter()
+    hits = search(query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    st.caption(f"{len(hits)} best matches in {elapsed_ms:.0f} ms")
+    if not hits:
+        st.info("No reports or comments match your search.")
+        return
+    st.markdown(SEARCH_CSS + "".join(SEARCH_CARD.format(
+        title=html.escape(hit["title"]),
+        kind="💬 Comment" if hit["kind"] == "comment" else "📄 Study",
+        author=html.escape(hit["author"] or "—"),
+        date=datetime.datetime.fromtimestamp(hit["created_at"]).strftime("%d/%m/%Y %H:%M"),
+        material=html.escape(hit["material"] or "—"),
+        snippet=hit["snippet"],  # escaped by the store, <mark> highlights only
+    ) for hit in hits), unsafe_allow_html=True)
+
+
+def _date_bounds(dates):
+    """created_at bounds (unix seconds, end exclusive) of a date_input selection."""
+    if not dates:
+        return None, None
+    start = datetime.datetime.combine(dates[0], datetime.time()).timestamp()
+    end = dates[1] if len(dates) > 1 else dates[0]
+    return start, datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time()).timestamp()